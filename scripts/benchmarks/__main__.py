@@ -0,0 +1,118 @@
+"""
+运行所有基准测试并与基线比较
+
+用法（在 scripts/ 目录下）:
+    uv run python -m benchmarks                     # 运行并与基线比较，回退时返回 1
+    uv run python -m benchmarks --quick             # 使用较小的数据量
+    uv run python -m benchmarks --only hash parsers # 只运行名称包含关键字的用例
+    uv run python -m benchmarks --save-baseline     # 将本次结果写入基线
+"""
+
+import argparse
+import importlib
+import sys
+import tempfile
+from contextlib import ExitStack
+from pathlib import Path
+
+from benchmarks.harness import (
+    DEFAULT_BASELINE,
+    Case,
+    Result,
+    compare,
+    load_baseline,
+    machine_info,
+    run_case,
+    save_baseline,
+)
+
+MODULES: tuple[str, ...] = (
+    "benchmarks.bench_downloader",
+    "benchmarks.bench_hash",
+    "benchmarks.bench_pkgbuild",
+    "benchmarks.bench_versions",
+    "benchmarks.bench_config",
+    "benchmarks.bench_parsers",
+    "benchmarks.bench_startup",
+)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="运行基准测试并与基线比较")
+    parser.add_argument("--quick", action="store_true", help="使用较小的数据量")
+    parser.add_argument(
+        "--only", nargs="+", metavar="KEYWORD", help="只运行名称包含关键字的用例"
+    )
+    parser.add_argument(
+        "--baseline", type=Path, default=DEFAULT_BASELINE, help="基线文件路径"
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="允许的耗时增长比例（默认 0.25，即慢 25%% 以内不视为回退）",
+    )
+    parser.add_argument(
+        "--save-baseline", action="store_true", help="将本次结果写入基线文件"
+    )
+    args = parser.parse_args()
+
+    results: list[Result] = []
+    with tempfile.TemporaryDirectory() as tmp, ExitStack() as stack:
+        for module_name in MODULES:
+            module = importlib.import_module(module_name)
+            workdir = Path(tmp) / module_name.rsplit(".", 1)[1]
+            workdir.mkdir()
+
+            cases: list[Case] = module.cases(stack, workdir, args.quick)
+            for case in cases:
+                if args.only and not any(keyword in case.name for keyword in args.only):
+                    continue
+                result = run_case(case)
+                results.append(result)
+
+                throughput = (
+                    f"  {result.throughput:8.1f} MiB/s" if result.throughput else ""
+                )
+                print(
+                    f"{result.name:<60} {result.median * 1000:10.2f} ms"
+                    f"  (最快 {result.best * 1000:.2f} ms){throughput}"
+                )
+
+    if args.save_baseline:
+        save_baseline(args.baseline, results)
+        print(f"\n已将 {len(results)} 个用例的结果写入基线: {args.baseline}")
+        return 0
+
+    baseline = load_baseline(args.baseline)
+    comparisons = compare(results, baseline, args.tolerance)
+    if not comparisons:
+        print(f"\n基线 {args.baseline} 中没有对应的用例，使用 --save-baseline 创建基线")
+        return 0
+
+    if baseline.get("machine") and baseline["machine"] != machine_info():
+        print("\n注意: 基线来自不同的运行环境，比较结果仅供参考")
+
+    print(f"\n与基线比较（容差 {args.tolerance:.0%}）:")
+    regressions = [comparison for comparison in comparisons if comparison.regressed]
+    for comparison in comparisons:
+        status = "性能回退" if comparison.regressed else "正常"
+        print(
+            f"  {comparison.name:<60} {comparison.ratio:6.2f}x  {status}"
+        )
+
+    if regressions:
+        print(f"\n错误: {len(regressions)} 个用例性能回退超过 {args.tolerance:.0%}:")
+        for comparison in regressions:
+            print(
+                f"  - {comparison.name}: {comparison.baseline * 1000:.2f} ms → "
+                f"{comparison.current * 1000:.2f} ms"
+            )
+        return 1
+
+    print("\n所有用例均未超出基线容差")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
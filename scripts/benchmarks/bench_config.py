@@ -0,0 +1,47 @@
+"""配置加载基准：包含数百个包的 config.yaml 的完整解析与缓存读取"""
+
+from contextlib import ExitStack
+from pathlib import Path
+
+import yaml
+
+from benchmarks.harness import Case
+from loaders.config_loader import ConfigLoader
+
+
+def generate_config(path: Path, count: int) -> Path:
+    """生成包含 count 个包的配置文件"""
+    packages = {
+        f"package-{index}": {
+            "name": f"package-{index}",
+            "source": "https://example.com",
+            "fetch_url": f"https://example.com/{index}/release",
+            "upstream": "https://example.com",
+            "parser": "QQParser" if index % 2 else "NavicatPremiumCSParser",
+            "pkgbuild": f"packages/package-{index}/PKGBUILD",
+            "arch": ["x86_64", "aarch64", "loong64"],
+        }
+        for index in range(count)
+    }
+    path.write_text(
+        yaml.safe_dump({"settings": {}, "packages": packages}), encoding="utf-8"
+    )
+    return path
+
+
+def cases(stack: ExitStack, workdir: Path, quick: bool) -> list[Case]:
+    """回归用例：不使用缓存的完整加载，以及命中配置缓存的加载"""
+    count = 100 if quick else 500
+    path = str(generate_config(workdir / "config.yaml", count))
+    # 预先生成缓存
+    ConfigLoader.load_from_yaml(path)
+    return [
+        Case(
+            f"config.load[{count} packages]",
+            lambda: ConfigLoader.load_from_yaml(path, use_cache=False),
+        ),
+        Case(
+            f"config.load_cached[{count} packages]",
+            lambda: ConfigLoader.load_from_yaml(path),
+        ),
+    ]
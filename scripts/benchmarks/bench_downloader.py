@@ -0,0 +1,99 @@
+"""
+下载器吞吐量基准
+
+通过本地 HTTP 服务器并发下载多个文件，测量 Downloader.download_all 的吞吐量
+（包括边下载边计算 SHA512 的开销），以及不同进度显示方式下每 GiB 消耗的 CPU 时间。
+"""
+
+import asyncio
+import io
+import os
+import time
+from contextlib import ExitStack, redirect_stdout
+from pathlib import Path
+
+import httpx
+
+from benchmarks.harness import Case, format_size, parse_size
+from benchmarks.local_server import LocalServer
+from constants.constants import ProgressModeEnum
+from utils.downloader import Downloader
+
+ARCHS: tuple[str, ...] = ("x86_64", "aarch64", "loong64")
+
+
+class _NullTerminal(io.TextIOBase):
+    """丢弃输出但报告为终端，使 Rich 按交互终端渲染进度条"""
+
+    def write(self, text: str) -> int:
+        return len(text)
+
+    def isatty(self) -> bool:
+        return True
+
+
+async def download_all(
+    server: LocalServer,
+    workdir: Path,
+    progress_mode: ProgressModeEnum = ProgressModeEnum.NONE,
+) -> None:
+    """下载所有架构的文件，任一失败时抛出异常"""
+    async with httpx.AsyncClient() as client:
+        downloader = Downloader(
+            client, progress_mode=progress_mode, max_concurrent=len(ARCHS)
+        )
+        downloads = {
+            arch: (server.url(f"/{arch}.deb"), workdir / f"{arch}.deb") for arch in ARCHS
+        }
+        results = await downloader.download_all(downloads)
+
+    for arch, result in results.items():
+        if not result.success:
+            raise RuntimeError(f"{arch} 下载失败: {result.error}")
+        # 删除文件，确保每轮都是完整下载而非断点续传
+        downloads[arch][1].unlink()
+
+
+def cpu_per_gib(
+    server: LocalServer, workdir: Path, progress_mode: ProgressModeEnum, size: int
+) -> float:
+    """
+    下载所有架构的文件，返回每 GiB 消耗的进程 CPU 时间（秒）
+
+    进度输出写入 _NullTerminal，只计算渲染开销；CPU 时间包含本进程中本地服务器线程的开销，
+    各进度显示方式下相同，可直接比较。
+    """
+    start = time.process_time()
+    with redirect_stdout(_NullTerminal()):
+        asyncio.run(download_all(server, workdir, progress_mode))
+    return (time.process_time() - start) / (size / 1024**3)
+
+
+def cases(stack: ExitStack, workdir: Path, quick: bool) -> list[Case]:
+    """回归用例：并发下载 3 个架构的文件，以及各进度显示方式下每 GiB 的 CPU 时间"""
+    size = parse_size("8M" if quick else "64M")
+    body = os.urandom(size)
+    server = stack.enter_context(
+        LocalServer({f"/{arch}.deb": body for arch in ARCHS})
+    )
+    target = workdir / "downloads"
+    target.mkdir()
+    return [
+        Case(
+            f"downloader.download_all[{len(ARCHS)}x{format_size(size)}]",
+            lambda: asyncio.run(download_all(server, target)),
+            size=size * len(ARCHS),
+        ),
+        *(
+            Case(
+                f"downloader.cpu_per_gib"
+                f"[{len(ARCHS)}x{format_size(size)},progress={mode.value}]",
+                lambda mode=mode: cpu_per_gib(server, target, mode, size * len(ARCHS)),
+                rounds=5,
+                self_timed=True,
+                # CPU 时间受线程调度影响较大，用于发现逐块刷新进度这类数量级的回退
+                tolerance=0.5,
+            )
+            for mode in (ProgressModeEnum.NONE, ProgressModeEnum.LOG, ProgressModeEnum.RICH)
+        ),
+    ]
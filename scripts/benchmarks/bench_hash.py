@@ -0,0 +1,111 @@
+"""
+哈希计算微基准
+
+cases() 提供 calculate_file_hash 和 calculate_multiple_hashes 的回归用例（python -m benchmarks）；
+直接运行本模块时对比旧实现（每种算法各读一遍文件、4 KiB 读取）与单次读取多摘要实现
+（不同读取块大小的 readinto）在 100 MB 和 1 GB 文件上的耗时。
+
+用法（在 scripts/ 目录下）:
+    uv run python -m benchmarks.bench_hash
+    uv run python -m benchmarks.bench_hash --sizes 100M 1G --rounds 3
+"""
+
+import argparse
+import hashlib
+import statistics
+import tempfile
+import time
+from collections.abc import Callable
+from contextlib import ExitStack
+from pathlib import Path
+
+from benchmarks.harness import Case, create_sample_file, format_size, parse_size
+from utils.hash import calculate_file_hash, calculate_multiple_hashes
+
+ALGORITHMS: list[str] = ["sha256", "sha512"]
+
+
+def legacy_multiple_hashes(file_path: Path, algorithms: list[str]) -> dict[str, str]:
+    """旧实现：每种算法单独读取一遍文件，每次读取 4096 字节"""
+    results: dict[str, str] = {}
+    for algorithm in algorithms:
+        hash_func = hashlib.new(algorithm)
+        with open(file_path, "rb") as f:
+            for chunk in iter(lambda: f.read(4096), b""):
+                hash_func.update(chunk)
+        results[algorithm] = hash_func.hexdigest()
+    return results
+
+
+def cases(stack: ExitStack, workdir: Path, quick: bool) -> list[Case]:
+    """回归用例：大文件上的单算法和多算法哈希"""
+    size = parse_size("16M" if quick else "256M")
+    file_path = create_sample_file(workdir / f"hash-{size}.bin", size)
+    label = format_size(size)
+    return [
+        Case(
+            f"hash.calculate_file_hash[sha512,{label}]",
+            lambda: calculate_file_hash(file_path, "sha512"),
+            size=size,
+        ),
+        Case(
+            f"hash.calculate_multiple_hashes[sha256+sha512,{label}]",
+            lambda: calculate_multiple_hashes(file_path, ALGORITHMS),
+            size=size,
+        ),
+    ]
+
+
+def measure(func: Callable[[], object], rounds: int) -> float:
+    """多轮测量，返回耗时中位数（秒）"""
+    timings: list[float] = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def candidates(file_path: Path) -> dict[str, Callable[[], dict[str, str]]]:
+    """参与对比的实现"""
+    return {
+        "legacy (4 KiB, per-algorithm)": lambda: legacy_multiple_hashes(
+            file_path, ALGORITHMS
+        ),
+        "single-pass readinto (64 KiB)": lambda: calculate_multiple_hashes(
+            file_path, ALGORITHMS, read_size=64 * 1024
+        ),
+        "single-pass readinto (1 MiB)": lambda: calculate_multiple_hashes(
+            file_path, ALGORITHMS
+        ),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="哈希计算微基准")
+    parser.add_argument("--sizes", nargs="+", default=["100M", "1G"], help="测试文件大小")
+    parser.add_argument("--rounds", type=int, default=3, help="每种实现的测量轮数")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for size_text in args.sizes:
+            size = parse_size(size_text)
+            file_path = create_sample_file(Path(tmp) / f"sample-{size}.bin", size)
+            print(f"\n文件大小: {size_text} ({size} 字节)，算法: {', '.join(ALGORITHMS)}")
+
+            expected: dict[str, str] | None = None
+            for name, func in candidates(file_path).items():
+                result = func()
+                if expected is None:
+                    expected = result
+                assert result == expected, f"{name} 的结果与旧实现不一致"
+
+                seconds = measure(func, args.rounds)
+                throughput = size / seconds / 1024**2
+                print(f"  {name:<32} {seconds:8.3f} s  {throughput:8.1f} MiB/s")
+
+            file_path.unlink()
+
+
+if __name__ == "__main__":
+    main()
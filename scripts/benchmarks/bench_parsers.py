@@ -0,0 +1,38 @@
+"""解析器基准：在保存的版本页样本上一次性解析版本号和所有架构的下载 URL（parse_release）"""
+
+from contextlib import ExitStack
+from pathlib import Path
+
+from benchmarks.harness import Case
+from parsers.base_parser import BaseParser
+from parsers.navicat import NavicatPremiumCSParser
+from parsers.qq import QQParser
+
+SAMPLES_DIR = Path(__file__).parent / "samples"
+
+
+def parse_all(parser: BaseParser, response_data: str, repeat: int) -> None:
+    """重复解析版本号和所有架构的 URL"""
+    for _ in range(repeat):
+        if parser.parse_release(response_data).version is None:
+            raise RuntimeError(f"{type(parser).__name__} 无法解析样本中的版本号")
+
+
+def cases(stack: ExitStack, workdir: Path, quick: bool) -> list[Case]:
+    """回归用例：QQ 和 Navicat 版本页样本"""
+    repeat = 20 if quick else 200
+    samples: dict[str, tuple[BaseParser, str]] = {
+        "qq": (QQParser(), "qq_linuxConfig.js"),
+        "navicat": (NavicatPremiumCSParser(), "navicat_release_note.html"),
+    }
+
+    def make_case(name: str, parser: BaseParser, sample: str) -> Case:
+        response_data = (SAMPLES_DIR / sample).read_text(encoding="utf-8")
+        return Case(
+            f"parsers.{name}[x{repeat}]",
+            lambda: parse_all(parser, response_data, repeat),
+        )
+
+    return [
+        make_case(name, parser, sample) for name, (parser, sample) in samples.items()
+    ]
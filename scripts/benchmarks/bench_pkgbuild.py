@@ -0,0 +1,62 @@
+"""PKGBUILD 编辑基准：在大型 PKGBUILD 上执行 PKGBUILDEditor.update_all"""
+
+from contextlib import ExitStack
+from pathlib import Path
+
+from benchmarks.harness import Case
+from updater.pkgbuild_editor import PKGBUILDEditor
+
+ARCHS: tuple[str, ...] = ("x86_64", "aarch64", "loong64")
+CHECKSUM = "0" * 128
+
+
+def generate_pkgbuild(extra_arrays: int, function_lines: int) -> str:
+    """生成包含大量多行数组和长 package() 函数的 PKGBUILD"""
+    lines = [
+        "pkgname=linuxqq-nt",
+        "pkgver=3.2.22_251203",
+        "pkgrel=1",
+        "epoch=5",
+        "arch=('x86_64' 'aarch64' 'loong64')",
+    ]
+    for arch in ARCHS:
+        lines.append(f"source_{arch}=('https://example.com/QQ_3.2.22_251203_{arch}.deb')")
+        lines.append(f"sha512sums_{arch}=('{'f' * 128}')")
+    for index in range(extra_arrays):
+        lines.append(f"_extra_{index}=(")
+        lines.extend(f"  'item-{index}-{item}'  # comment {item}" for item in range(8))
+        lines.append(")")
+    lines.append("package() {")
+    lines.extend(
+        f'\tinstall -Dm644 "file-{index}" "${{pkgdir}}/usr/share/{index}"'
+        for index in range(function_lines)
+    )
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def update_all(pkgbuild_path: Path) -> str:
+    editor = PKGBUILDEditor(pkgbuild_path)
+    editor.update_all(
+        "3.2.23_260108",
+        {arch: CHECKSUM for arch in ARCHS},
+        {arch: f"https://example.com/QQ_3.2.23_260108_{arch}.deb" for arch in ARCHS},
+        new_pkgrel=1,
+        new_epoch=5,
+    )
+    return editor.content
+
+
+def cases(stack: ExitStack, workdir: Path, quick: bool) -> list[Case]:
+    """回归用例：加载、修改并渲染大型 PKGBUILD"""
+    extra_arrays, function_lines = (200, 2_000) if quick else (2_000, 20_000)
+    pkgbuild_path = workdir / "PKGBUILD"
+    pkgbuild_path.write_text(
+        generate_pkgbuild(extra_arrays, function_lines), encoding="utf-8"
+    )
+    return [
+        Case(
+            f"pkgbuild.update_all[{extra_arrays}arrays,{function_lines}lines]",
+            lambda: update_all(pkgbuild_path),
+        )
+    ]
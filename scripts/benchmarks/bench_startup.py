@@ -0,0 +1,65 @@
+"""
+启动开销基准：用 python -X importtime 测量命令行入口导入模块的耗时
+
+只统计入口自身触发的导入（解释器启动时 site 等模块的导入不计入），
+避免 --list 等只读命令重新引入 httpx、rich、pydantic 等重量级依赖。
+"""
+
+import subprocess
+import sys
+from contextlib import ExitStack
+from pathlib import Path
+
+from benchmarks.harness import Case
+
+SCRIPTS_DIR = Path(__file__).parent.parent
+
+
+def _top_level_imports(args: list[str]) -> dict[str, int]:
+    """运行 python -X importtime，返回顶层导入的 {模块: 累计耗时（微秒）}"""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        cwd=SCRIPTS_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    imports: dict[str, int] = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        # 顶层导入没有缩进，被其他模块导入的模块名前有空格
+        if not cumulative.strip().isdigit() or name.startswith("  "):
+            continue
+        imports[name.strip()] = int(cumulative)
+    return imports
+
+
+def import_time(args: list[str], baseline: set[str]) -> float:
+    """命令自身触发的导入耗时（秒）"""
+    imports = _top_level_imports(args)
+    return sum(
+        cumulative for name, cumulative in imports.items() if name not in baseline
+    ) / 1_000_000
+
+
+def cases(stack: ExitStack, workdir: Path, quick: bool) -> list[Case]:
+    """回归用例：--list 和 --help 的导入耗时，以及更新流程模块的导入耗时（作为对照）"""
+    rounds = 3 if quick else 5
+    # 空解释器启动时就会导入的模块
+    baseline = set(_top_level_imports(["-c", "pass"]))
+    commands: dict[str, list[str]] = {
+        "main --list": ["main.py", "--list"],
+        "main --help": ["main.py", "--help"],
+        "import core.package_updater": ["-c", "import core.package_updater"],
+    }
+    return [
+        Case(
+            f"startup.imports[{name}]",
+            lambda args=args: import_time(args, baseline),
+            rounds=rounds,
+            self_timed=True,
+        )
+        for name, args in commands.items()
+    ]
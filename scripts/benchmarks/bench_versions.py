@@ -0,0 +1,32 @@
+"""版本比较基准：用 compare_versions 对大量版本号排序"""
+
+from contextlib import ExitStack
+from functools import cmp_to_key
+from pathlib import Path
+
+from benchmarks.harness import Case
+from utils.version_utils import compare_versions
+
+
+def generate_versions(count: int) -> list[str]:
+    """生成 QQ（3.2.22_251203）和 Navicat（17.3.5）两种格式混合的版本号"""
+    versions: list[str] = []
+    for index in range(count):
+        if index % 2:
+            versions.append(f"3.{index % 7}.{index % 97}_{250101 + index % 1231}")
+        else:
+            versions.append(f"v{index % 19}.{index % 11}.{index % 101}")
+    # 打乱顺序但保持可重复
+    return versions[::3] + versions[1::3] + versions[2::3]
+
+
+def cases(stack: ExitStack, workdir: Path, quick: bool) -> list[Case]:
+    """回归用例：对版本号列表排序"""
+    count = 2_000 if quick else 20_000
+    versions = generate_versions(count)
+    return [
+        Case(
+            f"versions.sort[{count}]",
+            lambda: sorted(versions, key=cmp_to_key(compare_versions)),
+        )
+    ]
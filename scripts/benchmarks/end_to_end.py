@@ -0,0 +1,232 @@
+"""
+端到端基准：PackageUpdater.update_all_packages 对本地模拟上游
+
+每个场景在独立的临时目录中运行：复制 PKGBUILD 并将 pkgver 置为 0（触发完整的版本更新流程），
+由 LocalServer 提供录制的版本页样本和合成的大文件，所有请求通过 Fetcher 的 URL 改写
+路由到本地服务器，结束后核对 PKGBUILD 中的校验和。
+
+用法（在 scripts/ 目录下）:
+    uv run python -m benchmarks.end_to_end
+    uv run python -m benchmarks.end_to_end --artifact-size 256M --jobs 1 2 --scenario clean flaky
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import shutil
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from benchmarks.harness import parse_size
+from benchmarks.local_server import (
+    Content,
+    LocalServer,
+    NetworkConditions,
+    SyntheticArtifact,
+    route,
+)
+from constants.constants import HTTP_CACHE_FILE, ParserEnum
+from core.package_updater import PackageUpdater, create_fetcher
+from fetcher.http_cache import HttpMetadataCache
+from loaders.config_loader import ConfigLoader
+from parsers.navicat import NavicatPremiumCSParser
+from parsers.qq import QQParser
+from updater.pkgbuild_editor import PKGBUILDEditor
+
+SCRIPTS_DIR = Path(__file__).parent.parent
+SAMPLES_DIR = Path(__file__).parent / "samples"
+
+# 解析器对应的版本页样本
+SAMPLES: dict[str, tuple[type[QQParser] | type[NavicatPremiumCSParser], str]] = {
+    ParserEnum.QQ.value: (QQParser, "qq_linuxConfig.js"),
+    ParserEnum.NAVICAT_PREMIUM_CS.value: (
+        NavicatPremiumCSParser,
+        "navicat_release_note.html",
+    ),
+}
+
+
+def scenarios(artifact_size: int) -> dict[str, NetworkConditions]:
+    """预置的网络场景（作用于合成文件，停顿和断开位置按文件大小计算）"""
+    return {
+        "clean": NetworkConditions(),
+        "slow": NetworkConditions(latency=0.05, bandwidth=50 * 1024**2),
+        "flaky": NetworkConditions(
+            latency=0.02,
+            stall_after=artifact_size // 4,
+            stall_seconds=0.5,
+            disconnect_after=artifact_size // 2,
+        ),
+    }
+
+
+@dataclass
+class Standin:
+    """一次端到端运行所需的工作区"""
+
+    workdir: Path
+    config: ConfigLoader
+    files: dict[str, Content]
+    # {PKGBUILD 路径: {架构: 期望的 SHA512}}
+    expected: dict[Path, dict[str, str]]
+
+    @property
+    def artifact_paths(self) -> list[str]:
+        """合成文件在模拟服务器上的路径"""
+        return [
+            path
+            for path, content in self.files.items()
+            if isinstance(content, SyntheticArtifact)
+        ]
+
+
+def prepare_standin(
+    workdir: Path,
+    artifact_size: int,
+    config: ConfigLoader | None = None,
+) -> Standin:
+    """
+    准备工作区：复制 PKGBUILD、生成上游文件映射和期望的校验和
+
+    Args:
+        workdir: 工作目录（缓存、下载文件和校验和账本都写入此目录）
+        artifact_size: 每个合成文件的大小（字节）
+        config: 基础配置，None 时读取 scripts/config.yaml
+    """
+    config = config or ConfigLoader.load_from_yaml(str(SCRIPTS_DIR / "config.yaml"))
+    config = config.model_copy(deep=True)
+    config.settings.cache.dir = str(workdir / ".cache")
+    config.settings.download.show_progress = False
+
+    files: dict[str, Content] = {}
+    expected: dict[Path, dict[str, str]] = {}
+    seed = 0
+    for name, package_config in config.packages.items():
+        if not package_config.enable or package_config.parser not in SAMPLES:
+            package_config.enable = False
+            continue
+
+        source = Path(package_config.pkgbuild)
+        if not source.is_absolute():
+            source = SCRIPTS_DIR.parent / source
+        pkgbuild = workdir / "packages" / name / "PKGBUILD"
+        pkgbuild.parent.mkdir(parents=True)
+        shutil.copy(source, pkgbuild)
+        editor = PKGBUILDEditor(pkgbuild)
+        editor.update_pkgver("0")
+        editor.save()
+        package_config.pkgbuild = str(pkgbuild)
+
+        parser_class, sample = SAMPLES[package_config.parser]
+        page = (SAMPLES_DIR / sample).read_bytes()
+        files[route(package_config.fetch_url)] = page
+
+        release = parser_class().parse_release(page.decode("utf-8"))
+        expected[pkgbuild] = {}
+        for arch in package_config.get_supported_archs():
+            url = release.url(arch)
+            if not url:
+                continue
+            artifact = SyntheticArtifact(artifact_size, seed=seed)
+            seed += 1
+            files[route(url)] = artifact
+            expected[pkgbuild][arch.value] = artifact.digest()
+
+    return Standin(workdir=workdir, config=config, files=files, expected=expected)
+
+
+async def run_update(
+    standin: Standin, server: LocalServer, jobs: int, *, http_cache: bool = False
+) -> PackageUpdater:
+    """
+    在工作区中对模拟上游执行 update_all_packages
+
+    Args:
+        http_cache: 是否使用工作区缓存目录中的版本页条件请求缓存
+    """
+    cache = (
+        HttpMetadataCache(Path(standin.config.settings.cache.dir) / HTTP_CACHE_FILE)
+        if http_cache
+        else None
+    )
+    fetcher = create_fetcher(
+        standin.config.settings, cache, rewrite_base_url=server.base_url
+    )
+    updater = PackageUpdater(max_jobs=jobs, config=standin.config, fetcher=fetcher)
+    try:
+        # 下载目录和校验和账本使用相对路径，切换到工作区以免写入仓库
+        with contextlib.chdir(standin.workdir):
+            await updater.update_all_packages()
+    finally:
+        await fetcher.aclose()
+        updater.hash_executor.shutdown()
+    return updater
+
+
+def verify(standin: Standin) -> list[str]:
+    """核对 PKGBUILD 中的校验和，返回不一致的描述"""
+    errors: list[str] = []
+    for pkgbuild, checksums in standin.expected.items():
+        editor = PKGBUILDEditor(pkgbuild)
+        for arch, checksum in checksums.items():
+            if editor.get_checksum(arch) != checksum:
+                errors.append(f"{pkgbuild.parent.name} {arch} 校验和不一致")
+    return errors
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="对本地模拟上游运行完整更新流程")
+    parser.add_argument(
+        "--artifact-size", default="64M", help="每个合成文件的大小（默认 64M）"
+    )
+    parser.add_argument(
+        "--jobs", type=int, nargs="+", default=[1, 2], help="同时处理的包数量"
+    )
+    parser.add_argument(
+        "--scenario",
+        nargs="+",
+        default=["clean", "slow", "flaky"],
+        help="网络场景: clean / slow / flaky",
+    )
+    parser.add_argument("--verbose", action="store_true", help="显示更新流程的输出")
+    args = parser.parse_args()
+
+    artifact_size = parse_size(args.artifact_size)
+    conditions = scenarios(artifact_size)
+
+    print(f"{'场景':<8} {'jobs':>4} {'耗时':>9} {'请求':>5} {'Range':>6} {'传输':>10}  结果")
+    for scenario in args.scenario:
+        for jobs in args.jobs:
+            with tempfile.TemporaryDirectory() as tmp:
+                standin = prepare_standin(Path(tmp), artifact_size)
+                artifact_conditions = conditions[scenario]
+                # 版本页只施加延迟（Fetcher 对版本页不重试）
+                with LocalServer(
+                    standin.files,
+                    NetworkConditions(latency=artifact_conditions.latency),
+                    overrides=dict.fromkeys(standin.artifact_paths, artifact_conditions),
+                ) as server:
+                    output = (
+                        contextlib.nullcontext()
+                        if args.verbose
+                        else contextlib.redirect_stdout(io.StringIO())
+                    )
+                    start = time.perf_counter()
+                    with output:
+                        asyncio.run(run_update(standin, server, jobs))
+                    elapsed = time.perf_counter() - start
+
+                errors = verify(standin)
+                ranges = sum(1 for request in server.requests if request.range)
+                print(
+                    f"{scenario:<8} {jobs:>4} {elapsed:>8.2f}s {len(server.requests):>5} "
+                    f"{ranges:>6} {server.bytes_sent() / 1024**2:>8.1f}MiB  "
+                    f"{'通过' if not errors else '; '.join(errors)}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+"""
+基准测试框架
+
+每个 bench_*.py 模块提供 cases(stack, workdir, quick) 函数，返回待测量的 Case 列表；
+测量结果保存为 JSON 基线，之后的运行与基线比较，最快一轮的耗时超出容差的用例视为性能回退
+（最快一轮受系统噪声影响最小）。
+
+单次调用很快的用例在每轮内重复调用，直到一轮耗时不少于 MIN_ROUND_TIME，记录的是单次调用的平均耗时；
+耗时增长不足 MIN_REGRESSION_DELTA 的用例不视为回退（亚毫秒级的差异主要来自计时噪声）。
+"""
+
+import json
+import math
+import os
+import platform
+import statistics
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+BASELINE_DIR = Path(__file__).parent / "baselines"
+DEFAULT_BASELINE = BASELINE_DIR / "default.json"
+SIZE_UNITS: dict[str, int] = {"K": 1024, "M": 1024**2, "G": 1024**3}
+# 每轮的最短耗时（秒），单次调用更快的用例在一轮内重复调用
+MIN_ROUND_TIME = 0.05
+# 单次调用耗时至少增加这么多（秒）才可能视为性能回退
+MIN_REGRESSION_DELTA = 0.001
+
+
+def parse_size(text: str) -> int:
+    """解析 100M / 1G 形式的大小"""
+    unit = text[-1].upper()
+    if unit in SIZE_UNITS:
+        return int(float(text[:-1]) * SIZE_UNITS[unit])
+    return int(text)
+
+
+def format_size(size: int) -> str:
+    """将字节数格式化为 64MiB 形式（用于用例名称）"""
+    for unit, factor in sorted(SIZE_UNITS.items(), key=lambda item: -item[1]):
+        if size >= factor and size % factor == 0:
+            return f"{size // factor}{unit}iB"
+    return f"{size}B"
+
+
+def create_sample_file(path: Path, size: int) -> Path:
+    """生成指定大小的随机数据文件"""
+    block = os.urandom(1024 * 1024)
+    with path.open("wb") as f:
+        remaining = size
+        while remaining > 0:
+            remaining -= f.write(block[: min(remaining, len(block))])
+    return path
+
+
+@dataclass(frozen=True)
+class Case:
+    """一个基准测试用例"""
+
+    name: str
+    func: Callable[[], object]
+    rounds: int = 5
+    # 每轮处理的数据量（字节），用于计算吞吐量
+    size: int | None = None
+    # 为 True 时 func 返回本轮耗时（秒），用于在子进程中自行计时的用例
+    self_timed: bool = False
+    # 本用例允许的耗时增长比例，None 时使用命令行指定的容差
+    tolerance: float | None = None
+
+
+@dataclass(frozen=True)
+class Result:
+    """用例的测量结果"""
+
+    name: str
+    median: float
+    best: float
+    rounds: int
+    size: int | None = None
+    # 每轮调用 func 的次数
+    loops: int = 1
+    tolerance: float | None = None
+
+    @property
+    def throughput(self) -> float | None:
+        """吞吐量（MiB/s）"""
+        if self.size is None or self.median <= 0:
+            return None
+        return self.size / self.median / 1024**2
+
+
+@dataclass(frozen=True)
+class Comparison:
+    """测量结果与基线的比较"""
+
+    name: str
+    baseline: float
+    current: float
+    tolerance: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current / self.baseline if self.baseline > 0 else 1.0
+
+    @property
+    def regressed(self) -> bool:
+        return (
+            self.ratio > 1 + self.tolerance
+            and self.current - self.baseline >= MIN_REGRESSION_DELTA
+        )
+
+
+def _time_loops(func: Callable[[], object], loops: int) -> float:
+    start = time.perf_counter()
+    for _ in range(loops):
+        func()
+    return time.perf_counter() - start
+
+
+def calibrate_loops(func: Callable[[], object]) -> int:
+    """逐步增加调用次数，返回一轮耗时不少于 MIN_ROUND_TIME 的每轮调用次数"""
+    loops = 1
+    while (elapsed := _time_loops(func, loops)) < MIN_ROUND_TIME:
+        if elapsed <= 0:
+            loops *= 10
+        else:
+            loops = max(loops * 2, math.ceil(loops * MIN_ROUND_TIME / elapsed))
+    return loops
+
+
+def run_case(case: Case, warmup: int = 1) -> Result:
+    """预热后多轮测量，返回单次调用耗时的中位数和最小值"""
+    for _ in range(warmup):
+        case.func()
+
+    loops = 1 if case.self_timed else calibrate_loops(case.func)
+    timings: list[float] = []
+    for _ in range(case.rounds):
+        if case.self_timed:
+            timings.append(float(case.func()))  # type: ignore[arg-type]
+        else:
+            timings.append(_time_loops(case.func, loops) / loops)
+
+    return Result(
+        name=case.name,
+        median=statistics.median(timings),
+        best=min(timings),
+        rounds=case.rounds,
+        size=case.size,
+        loops=loops,
+        tolerance=case.tolerance,
+    )
+
+
+def machine_info() -> dict[str, str]:
+    """记录在基线中的运行环境信息"""
+    return {
+        "python": platform.python_version(),
+        "system": platform.system(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpus": str(os.cpu_count()),
+    }
+
+
+def load_baseline(path: Path) -> dict[str, Any]:
+    """读取基线文件，不存在时返回空基线"""
+    if not path.exists():
+        return {"machine": {}, "results": {}}
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def save_baseline(path: Path, results: list[Result]) -> None:
+    """将测量结果合并写入基线文件（保留未运行用例的已有基线）"""
+    baseline = load_baseline(path)
+    baseline["machine"] = machine_info()
+    for result in results:
+        baseline["results"][result.name] = {
+            "median": round(result.median, 6),
+            "best": round(result.best, 6),
+            "rounds": result.rounds,
+            "loops": result.loops,
+        }
+    baseline["results"] = dict(sorted(baseline["results"].items()))
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(
+        json.dumps(baseline, ensure_ascii=False, indent=2) + "\n", encoding="utf-8"
+    )
+
+
+def compare(
+    results: list[Result], baseline: dict[str, Any], tolerance: float
+) -> list[Comparison]:
+    """
+    与基线比较（按最快一轮的耗时），返回有基线记录的用例的比较结果
+
+    用例设置了 tolerance 时使用用例自己的容差。
+    """
+    recorded: dict[str, dict[str, float]] = baseline.get("results", {})
+    return [
+        Comparison(
+            name=result.name,
+            baseline=recorded[result.name]["best"],
+            current=result.best,
+            tolerance=tolerance if result.tolerance is None else result.tolerance,
+        )
+        for result in results
+        if result.name in recorded
+    ]
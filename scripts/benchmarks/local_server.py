@@ -0,0 +1,384 @@
+"""
+本地上游模拟服务器
+
+在后台线程的事件循环中运行的 HTTP/1.1 服务器，用于在不访问腾讯、Navicat 等上游的情况下
+端到端地测量更新流程：
+1. 提供录制的版本页样本和按需生成的大体积合成文件（不占用内存）
+2. 支持 GET / HEAD、ETag / Last-Modified、If-None-Match（304）、Range 和 If-Range
+3. 可注入首字节延迟、带宽上限、传输中途停顿和断开连接
+
+配合 Fetcher(rewrite_base_url=server.base_url) 使用时，所有请求按 /<原主机名>/<原路径>
+路由到本服务器，可通过 route(url) 计算原 URL 对应的路径。
+"""
+
+import asyncio
+import hashlib
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from email.utils import formatdate
+from typing import Self
+from urllib.parse import urlsplit
+
+# 每次写入套接字的数据块大小
+WRITE_SIZE = 256 * 1024
+# 合成文件的重复数据块大小
+SYNTHETIC_BLOCK_SIZE = 1024 * 1024
+
+
+@dataclass(frozen=True)
+class NetworkConditions:
+    """模拟的网络状况（作用于每个请求）"""
+
+    # 首字节前的延迟（秒）
+    latency: float = 0.0
+    # 每个连接的带宽上限（字节/秒），None 表示不限速
+    bandwidth: int | None = None
+    # 响应体发送该字节数后停顿 stall_seconds 秒
+    stall_after: int | None = None
+    stall_seconds: float = 0.0
+    # 响应体发送该字节数后断开连接
+    disconnect_after: int | None = None
+    # 每个路径只有前 N 个请求会被断开（之后正常），模拟瞬时故障
+    disconnect_count: int = 1
+
+
+class SyntheticArtifact:
+    """按需生成的确定性合成文件（由重复的随机数据块组成）"""
+
+    def __init__(self, size: int, seed: int = 0) -> None:
+        self.size = size
+        self.seed = seed
+        self._block = random.Random(seed).randbytes(SYNTHETIC_BLOCK_SIZE)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def read(self, start: int, end: int) -> bytes:
+        """读取 [start, end) 区间的内容"""
+        parts: list[bytes] = []
+        position = start
+        while position < end:
+            offset = position % SYNTHETIC_BLOCK_SIZE
+            length = min(SYNTHETIC_BLOCK_SIZE - offset, end - position)
+            parts.append(self._block[offset : offset + length])
+            position += length
+        return b"".join(parts)
+
+    def digest(self, algorithm: str = "sha512") -> str:
+        """完整内容的摘要（用于校验下载结果）"""
+        hasher = hashlib.new(algorithm)
+        for start in range(0, self.size, SYNTHETIC_BLOCK_SIZE):
+            hasher.update(self.read(start, min(start + SYNTHETIC_BLOCK_SIZE, self.size)))
+        return hasher.hexdigest()
+
+
+type Content = bytes | SyntheticArtifact
+
+
+@dataclass
+class RequestLog:
+    """服务器收到的一个请求"""
+
+    method: str
+    path: str
+    status: int
+    range: str | None = None
+    # 实际发送的响应体字节数
+    sent: int = 0
+
+
+@dataclass
+class _Resource:
+    content: Content
+    etag: str
+    last_modified: str
+    disconnects: int = field(default=0)
+
+    def read(self, start: int, end: int) -> bytes:
+        if isinstance(self.content, SyntheticArtifact):
+            return self.content.read(start, end)
+        return self.content[start:end]
+
+
+def route(url: str) -> str:
+    """原 URL 在模拟服务器上的路径（/<主机名>/<路径>）"""
+    parts = urlsplit(url)
+    return f"/{parts.hostname}{parts.path}"
+
+
+def _parse_range(value: str, size: int) -> tuple[int, int] | None:
+    """解析单个 bytes=a-b 范围，返回 [start, end)；无法满足时返回 None"""
+    unit, _, spec = value.partition("=")
+    if unit.strip() != "bytes" or "," in spec:
+        return None
+    first, _, last = spec.strip().partition("-")
+    if not first:
+        # 后缀范围 bytes=-N
+        length = int(last)
+        return (max(0, size - length), size) if length > 0 else None
+    start = int(first)
+    end = min(int(last) + 1, size) if last else size
+    return (start, end) if start < end else None
+
+
+class LocalServer:
+    """后台线程中运行的本地上游模拟服务器（作为上下文管理器使用）"""
+
+    def __init__(
+        self,
+        files: dict[str, Content],
+        conditions: NetworkConditions | None = None,
+        *,
+        overrides: dict[str, NetworkConditions] | None = None,
+        host: str = "127.0.0.1",
+    ) -> None:
+        """
+        Args:
+            files: {路径: 内容}，路径以 / 开头
+            conditions: 所有请求默认的网络状况
+            overrides: 按路径覆盖的网络状况
+            host: 监听地址
+        """
+        self.host = host
+        self.port = 0
+        self.conditions = conditions or NetworkConditions()
+        self.overrides = overrides or {}
+        self.requests: list[RequestLog] = []
+        last_modified = formatdate(time.time(), usegmt=True)
+        self._resources = {
+            path: _Resource(
+                content=content,
+                etag=self._etag(content),
+                last_modified=last_modified,
+            )
+            for path, content in files.items()
+        }
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._server: asyncio.Server | None = None
+        self._thread: threading.Thread | None = None
+        self._ready = threading.Event()
+
+    @staticmethod
+    def _etag(content: Content) -> str:
+        if isinstance(content, SyntheticArtifact):
+            return f'"synthetic-{content.seed}-{content.size}"'
+        return f'"{hashlib.sha256(content).hexdigest()[:16]}"'
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def url(self, path: str) -> str:
+        """路径的完整 URL"""
+        return f"{self.base_url}{path}"
+
+    def set_content(self, path: str, content: Content) -> None:
+        """替换路径的内容（ETag 随之变化，模拟上游发布新版本）"""
+        self._resources[path] = _Resource(
+            content=content,
+            etag=self._etag(content),
+            last_modified=formatdate(time.time(), usegmt=True),
+        )
+
+    def bytes_sent(self) -> int:
+        """已发送的响应体总字节数"""
+        return sum(request.sent for request in self.requests)
+
+    def __enter__(self) -> Self:
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self) -> None:
+        self._loop = asyncio.new_event_loop()
+        self._server = self._loop.run_until_complete(
+            asyncio.start_server(self._handle, self.host, 0)
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._ready.set()
+        try:
+            self._loop.run_forever()
+        finally:
+            self._server.close()
+            self._loop.run_until_complete(self._close_connections())
+            self._loop.close()
+
+    @staticmethod
+    async def _close_connections() -> None:
+        """取消仍在等待下一个请求的连接，避免关闭事件循环时留下未完成的协程"""
+        current = asyncio.current_task()
+        pending = [task for task in asyncio.all_tasks() if task is not current]
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    async def _handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """处理一个连接上的所有请求"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers: dict[str, str] = {}
+                while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                keep_alive = await self._respond(
+                    writer, method, path.split("?", 1)[0], headers
+                )
+                if not keep_alive or headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(
+        self,
+        writer: asyncio.StreamWriter,
+        method: str,
+        path: str,
+        headers: dict[str, str],
+    ) -> bool:
+        """发送响应，返回连接是否可以继续复用"""
+        conditions = self.overrides.get(path, self.conditions)
+        if conditions.latency:
+            await asyncio.sleep(conditions.latency)
+
+        log = RequestLog(method=method, path=path, status=200, range=headers.get("range"))
+        self.requests.append(log)
+
+        resource = self._resources.get(path)
+        if resource is None:
+            log.status = 404
+            await self._write_head(writer, 404, {"Content-Length": "0"})
+            return True
+
+        size = len(resource.content)
+        validators = {"ETag": resource.etag, "Last-Modified": resource.last_modified}
+
+        if headers.get("if-none-match") == resource.etag:
+            log.status = 304
+            await self._write_head(writer, 304, validators)
+            return True
+
+        start, end = 0, size
+        status = 200
+        extra: dict[str, str] = {}
+        if log.range and headers.get("if-range") in (
+            None,
+            resource.etag,
+            resource.last_modified,
+        ):
+            byte_range = _parse_range(log.range, size)
+            if byte_range is None:
+                log.status = 416
+                await self._write_head(
+                    writer, 416, {"Content-Range": f"bytes */{size}", "Content-Length": "0"}
+                )
+                return True
+            start, end = byte_range
+            status = 206
+            extra["Content-Range"] = f"bytes {start}-{end - 1}/{size}"
+
+        log.status = status
+        await self._write_head(
+            writer,
+            status,
+            {
+                "Content-Type": "application/octet-stream",
+                "Content-Length": str(end - start),
+                "Accept-Ranges": "bytes",
+                **validators,
+                **extra,
+            },
+        )
+        if method == "HEAD":
+            return True
+
+        return await self._write_body(writer, resource, start, end, conditions, log)
+
+    @staticmethod
+    async def _write_head(
+        writer: asyncio.StreamWriter, status: int, headers: dict[str, str]
+    ) -> None:
+        reasons = {
+            200: "OK",
+            206: "Partial Content",
+            304: "Not Modified",
+            404: "Not Found",
+            416: "Range Not Satisfiable",
+        }
+        lines = [f"HTTP/1.1 {status} {reasons[status]}"]
+        lines.extend(f"{name}: {value}" for name, value in headers.items())
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+        await writer.drain()
+
+    async def _write_body(
+        self,
+        writer: asyncio.StreamWriter,
+        resource: _Resource,
+        start: int,
+        end: int,
+        conditions: NetworkConditions,
+        log: RequestLog,
+    ) -> bool:
+        """按网络状况分块发送响应体，断开连接时返回 False"""
+        write_size = WRITE_SIZE
+        if conditions.bandwidth:
+            # 每次写入约 1/20 秒的数据量，使限速更平滑
+            write_size = max(1024, min(WRITE_SIZE, conditions.bandwidth // 20))
+
+        disconnect_at: int | None = None
+        if (
+            conditions.disconnect_after is not None
+            and resource.disconnects < conditions.disconnect_count
+        ):
+            disconnect_at = conditions.disconnect_after
+        stalled = False
+
+        paced_from = time.perf_counter()
+        position = start
+        while position < end:
+            chunk_end = min(position + write_size, end)
+            if disconnect_at is not None:
+                chunk_end = min(chunk_end, start + disconnect_at)
+            if not stalled and conditions.stall_after is not None:
+                chunk_end = min(chunk_end, max(position + 1, start + conditions.stall_after))
+
+            writer.write(resource.read(position, chunk_end))
+            await writer.drain()
+            log.sent += chunk_end - position
+            position = chunk_end
+
+            if disconnect_at is not None and position - start >= disconnect_at:
+                resource.disconnects += 1
+                writer.transport.abort()
+                return False
+            if (
+                not stalled
+                and conditions.stall_after is not None
+                and position - start >= conditions.stall_after
+            ):
+                stalled = True
+                await asyncio.sleep(conditions.stall_seconds)
+                paced_from += conditions.stall_seconds
+            if conditions.bandwidth:
+                delay = paced_from + (position - start) / conditions.bandwidth
+                delay -= time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+        return True
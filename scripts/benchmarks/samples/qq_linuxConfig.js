@@ -0,0 +1,5 @@
+;(function () {
+  var publicPath = "https://cdn-go.cn/qq-web/im.qq.com_new/latest/";
+  window.__LINUX_QQ_CONFIG_LOADED__ = true;
+})();
+var params= {"baseVersion":"3.2.23","version":"3.2.23-260108","updateDate":"2026-01-08","size":"142.1MB","x64DownloadUrl":{"rpm":"https://dldir1v6.qq.com/qqfile/qq/QQNT/Linux/QQ_3.2.23_260108_x86_64_01.rpm","deb":"https://dldir1v6.qq.com/qqfile/qq/QQNT/Linux/QQ_3.2.23_260108_amd64_01.deb","appimage":"https://dldir1v6.qq.com/qqfile/qq/QQNT/Linux/QQ_3.2.23_260108_x86_64_01.AppImage"},"armDownloadUrl":{"rpm":"https://dldir1v6.qq.com/qqfile/qq/QQNT/Linux/QQ_3.2.23_260108_aarch64_01.rpm","deb":"https://dldir1v6.qq.com/qqfile/qq/QQNT/Linux/QQ_3.2.23_260108_arm64_01.deb","appimage":"https://dldir1v6.qq.com/qqfile/qq/QQNT/Linux/QQ_3.2.23_260108_arm64_01.AppImage"},"loongarchDownloadUrl":"https://dldir1v6.qq.com/qqfile/qq/QQNT/Linux/QQ_3.2.23_260108_loongarch64_01.deb","mipsDownloadUrl":"https://dldir1v6.qq.com/qqfile/qq/QQNT/Linux/QQ_3.2.23_260108_mips64el_01.deb","linuxVersionList":[{"version":"3.2.23","date":"2026-01-08","feature":["修复了一些已知问题"]},{"version":"3.2.22","date":"2025-12-03","feature":["优化了消息列表的加载速度","修复了一些已知问题"]},{"version":"3.2.21","date":"2025-11-05","feature":["新增频道功能","修复了一些已知问题"]}]};
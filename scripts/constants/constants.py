@@ -4,6 +4,20 @@ from enum import Enum
 
 DOWNLOAD_DIR = "downloads"
 
+# 本地缓存文件名（位于 settings.cache.dir 目录下）
+HTTP_CACHE_FILE = "http_cache.json"
+ARTIFACT_METADATA_FILE = "artifacts.json"
+RUN_HISTORY_FILE = "history.sqlite3"
+# 下载缓存目录（索引和按 SHA512 存放的文件）
+ARTIFACT_CACHE_DIR = "artifacts"
+
+# 校验后的配置缓存（位于配置文件同目录的 .cache/ 下）
+CONFIG_CACHE_DIR = ".cache"
+CONFIG_CACHE_FILE = "config.json"
+
+# 随仓库提交的校验和账本（与 config.yaml 同目录）
+CHECKSUM_LEDGER_FILE = "checksum-ledger.json"
+
 
 class ArchEnum(Enum):
     """支持的 CPU 架构"""
@@ -21,6 +35,16 @@ class HashAlgorithmEnum(Enum):
     SHA512 = "sha512"
 
 
+class ProgressModeEnum(Enum):
+    """下载进度显示方式"""
+
+    # 终端中使用 Rich 进度条，否则输出日志行
+    AUTO = "auto"
+    RICH = "rich"
+    LOG = "log"
+    NONE = "none"
+
+
 class ParserEnum(Enum):
     """解析器名称"""
 
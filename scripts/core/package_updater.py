@@ -3,51 +3,166 @@
 整合fetch、parse和update三个流程
 
 架构设计：
-1. 串行下载所有维护的 AUR 包（一个包处理完后才处理下一个）
+1. 通过 PackageScheduler 以有限并发处理所有维护的 AUR 包（max_jobs 为 1 时串行）
 2. 并行下载单个包的所有架构（使用 Downloader 的并发功能）
 """
 
+import asyncio
+import hashlib
+import time
+from functools import cached_property
 from pathlib import Path
 
-from constants.constants import DOWNLOAD_DIR, ParserEnum
-from fetcher.fetcher import Fetcher
-from loaders.config_loader import ConfigLoader, PackageConfig
-from parsers.base_parser import BaseParser
-from parsers.qq import QQParser
-from parsers.navicat import NavicatPremiumCSParser
+from constants.constants import (
+    ARTIFACT_CACHE_DIR,
+    ARTIFACT_METADATA_FILE,
+    CHECKSUM_LEDGER_FILE,
+    DOWNLOAD_DIR,
+    HTTP_CACHE_FILE,
+    RUN_HISTORY_FILE,
+    HashAlgorithmEnum,
+)
+from core.run_history import (
+    PackageRun,
+    RunHistory,
+    current_run,
+    phase,
+    span,
+    track_package,
+)
+from core.run_report import write_json_report, write_prometheus_textfile
+from core.scheduler import PackageScheduler
+from core.version_check import AHEAD, ERROR, OUTDATED, UP_TO_DATE, CheckResult
+from httpx import Limits, Timeout
+
+from fetcher.fetcher import Fetcher, FetchResult
+from fetcher.http_cache import HttpMetadataCache
+from loaders.config_loader import ConfigLoader, PackageConfig, PoolSettings, Settings
+from parsers.base_parser import BaseParser, Release
+from parsers.registry import ParserRegistry
 from updater.pkgbuild_editor import PKGBUILDEditor
+from utils.artifact_cache import ArtifactCache
+from utils.artifact_metadata import ArtifactMetadataStore, RemoteMetadata
+from utils.checksum_ledger import ChecksumLedger
 from utils.downloader import Downloader
+from utils.hash import calculate_file_hash_async, create_hash_executor
 from utils.url_utils import generate_download_filename
 from utils.version_utils import compare_versions
 
 
+def _limits(pool: PoolSettings) -> Limits:
+    return Limits(
+        max_connections=pool.max_connections,
+        max_keepalive_connections=pool.max_keepalive_connections,
+        keepalive_expiry=pool.keepalive_expiry,
+    )
+
+
+def create_fetcher(
+    settings: Settings,
+    cache: HttpMetadataCache | None = None,
+    *,
+    rewrite_base_url: str | None = None,
+) -> Fetcher:
+    """
+    按配置创建 Fetcher（版本页和下载使用独立的连接池和超时）
+
+    下载的连接池等待时间不设上限：同时进行的下载数量已由 Downloader 的信号量限制。
+    """
+    http_settings = settings.http
+    return Fetcher(
+        timeout=Timeout(http_settings.read_timeout, connect=http_settings.connect_timeout),
+        cache=cache,
+        rewrite_base_url=rewrite_base_url,
+        limits=_limits(http_settings.metadata_pool),
+        download_timeout=Timeout(
+            settings.download.timeout,
+            connect=http_settings.connect_timeout,
+            pool=None,
+        ),
+        download_limits=_limits(http_settings.download_pool),
+        http2=http_settings.http2,
+    )
+
+
 class PackageUpdater:
     """包更新器，整合fetch、parse和update流程"""
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        max_jobs: int | None = None,
+        force: bool = False,
+        *,
+        config: ConfigLoader | None = None,
+        fetcher: Fetcher | None = None,
+    ) -> None:
+        """
+        Args:
+            max_jobs: 同时处理的包数量（None 时使用配置文件）
+            force: 忽略本地缓存，完整检查每个包
+            config: 配置（None 时从 config.yaml 加载）
+            fetcher: 自定义 Fetcher（如指向本地模拟上游的实例），None 时按配置创建
+        """
         # 加载配置
-        self.config = ConfigLoader.load_from_yaml()
+        self.config = config or ConfigLoader.load_from_yaml()
+
+        # 为 True 时忽略版本页缓存，总是完整检查每个包
+        self.force = force
 
         # 从配置中获取下载设置
         download_settings = self.config.settings.download
+        cache_settings = self.config.settings.cache
 
-        # 初始化 Fetcher（使用配置的超时时间）
-        self.fetcher = Fetcher(timeout=download_settings.timeout)
+        # 初始化 Fetcher（使用配置的连接池、超时时间和版本页条件请求缓存）
+        http_cache = (
+            HttpMetadataCache(Path(cache_settings.dir) / HTTP_CACHE_FILE)
+            if cache_settings.enable
+            else None
+        )
+        self.fetcher = fetcher or create_fetcher(self.config.settings, http_cache)
 
-        # 注册解析器
-        self.parsers: dict[str, BaseParser] = {
-            ParserEnum.QQ.value: QQParser(),
-            ParserEnum.NAVICAT_PREMIUM_CS.value: NavicatPremiumCSParser(),
-        }
+        # 已验证文件的远端元数据记录（版本未变时用于跳过下载）
+        self.artifact_store = (
+            ArtifactMetadataStore(Path(cache_settings.dir) / ARTIFACT_METADATA_FILE)
+            if cache_settings.enable
+            else None
+        )
 
-        # 初始化下载器（使用配置的下载设置）
-        self.downloader = Downloader(
-            client=self.fetcher.client,
-            max_concurrent=download_settings.max_concurrent,
-            max_retries=download_settings.max_retries,
-            base_delay=download_settings.base_delay,
-            chunk_size=download_settings.chunk_size,
-            show_progress=download_settings.show_progress,
+        # 内容寻址的下载缓存（按 LRU 在容量上限内淘汰，命中时将文件链接到下载目录）
+        self.artifact_cache = (
+            ArtifactCache(
+                Path(cache_settings.dir) / ARTIFACT_CACHE_DIR,
+                cache_settings.artifact_max_bytes,
+            )
+            if cache_settings.enable and cache_settings.artifact_cache
+            else None
+        )
+
+        # 随仓库提交的校验和账本（与 config.yaml 同目录，不受本地缓存开关影响）
+        self.checksum_ledger = ChecksumLedger(Path(CHECKSUM_LEDGER_FILE))
+
+        # 运行历史（每个包的版本、文件和各阶段耗时）
+        self.run_history = (
+            RunHistory(Path(cache_settings.dir) / RUN_HISTORY_FILE)
+            if cache_settings.history
+            else None
+        )
+
+        # 本次运行各包的处理记录（用于导出运行报告和指标）
+        self.started_at = time.time()
+        self.runs: list[PackageRun] = []
+
+        # 解析器注册表（包实际使用某个解析器时才导入其模块）
+        self.parsers = ParserRegistry()
+
+        # 哈希计算线程池（本次运行的所有包共享，避免阻塞事件循环）
+        self.hash_executor = create_hash_executor(download_settings.hash_workers)
+
+        # 初始化包调度器（命令行 --jobs 优先于配置文件）
+        scheduler_settings = self.config.settings.scheduler
+        self.scheduler = PackageScheduler(
+            max_jobs=max_jobs or scheduler_settings.max_jobs,
+            group_output=scheduler_settings.group_output,
         )
 
         # 获取项目根目录（这里的项目根目录指更新脚本的根目录）
@@ -56,6 +171,43 @@ class PackageUpdater:
         # PKGBUILD目录相对于项目根目录
         self.pkgbuild_root = self.project_root.parent
 
+    @cached_property
+    def downloader(self) -> Downloader:
+        """下载器（首次使用时按配置创建，--check 模式不会创建）"""
+        download_settings = self.config.settings.download
+        return Downloader(
+            client=self.fetcher.download_client,
+            max_concurrent=download_settings.max_concurrent,
+            max_retries=download_settings.max_retries,
+            base_delay=download_settings.base_delay,
+            chunk_size=download_settings.chunk_size,
+            max_chunk_size=download_settings.max_chunk_size,
+            preallocate=download_settings.preallocate,
+            show_progress=download_settings.show_progress,
+            progress_mode=download_settings.progress_mode,
+            progress_interval=download_settings.progress_interval,
+            log_interval=download_settings.log_interval,
+            segments=download_settings.segments,
+            segment_threshold=download_settings.segment_threshold,
+            hash_executor=self.hash_executor,
+        )
+
+    def _local_state(self, package_config: PackageConfig) -> str:
+        """
+        包的本地状态指纹（PKGBUILD 内容和包配置）
+
+        记录在版本页缓存条目中：新增架构、修改或回退 PKGBUILD 后指纹变化，
+        即使上游未变化也会完整检查该包。
+        """
+        digest = hashlib.sha256(package_config.model_dump_json().encode("utf-8"))
+        try:
+            digest.update(
+                self._get_pkgbuild_path(package_config.pkgbuild).read_bytes()
+            )
+        except OSError:
+            pass
+        return digest.hexdigest()
+
     def _get_pkgbuild_path(self, pkgbuild_relative_path: str) -> Path:
         """
         获取PKGBUILD文件的完整路径
@@ -94,15 +246,17 @@ class PackageUpdater:
             return False
         return True
 
-    async def _fetch_arch_urls(
-        self, parser: BaseParser, supported_archs: list, response_data: str
+    def _select_arch_urls(
+        self, release: Release, supported_archs: list
     ) -> dict[str, str]:
-        """获取所有架构的下载 URL"""
+        """从解析结果中选出包支持的架构的下载 URL"""
         arch_urls = {}
         for arch in supported_archs:
-            url = parser.parse_url(arch, response_data)
+            url = release.url(arch)
             if url:
                 arch_urls[arch.value] = url
+                if (run := current_run()) is not None:
+                    run.record_artifact(arch.value, url)
             else:
                 print(f"  警告: 无法获取 {arch.value} 架构的下载URL")
         return arch_urls
@@ -113,35 +267,63 @@ class PackageUpdater:
         new_version: str,
         arch_urls: dict[str, str],
         verify_only: bool = False,
+        probed: dict[str, RemoteMetadata | None] | None = None,
     ) -> tuple[dict[str, str], bool]:
         """
         下载文件并计算校验和
 
         使用 Downloader 的并发下载功能，并行下载单个包的所有架构
+
+        Args:
+            probed: 本次运行已探测过的远端元数据 {url: metadata}，这些 URL 不再重复探测
         """
         download_dir = Path(DOWNLOAD_DIR)
         download_dir.mkdir(exist_ok=True)
 
-        downloads = {
-            arch: (
-                url,
-                download_dir
-                / generate_download_filename(
-                    package_name, new_version, arch, url, default_extension=".deb"
-                ),
+        checksums: dict[str, str] = {}
+        failed_archs: list[str] = []
+
+        destinations = {
+            arch: download_dir
+            / generate_download_filename(
+                package_name, new_version, arch, url, default_extension=".deb"
             )
             for arch, url in arch_urls.items()
         }
 
-        # 使用 Downloader 并行下载所有架构
-        download_results = await self.downloader.download_all(
-            downloads, package_name=package_name
-        )
+        # 先查校验和账本和下载缓存，命中的架构无需任何传输
+        with phase("download"):
+            known_checksums = await self._resolve_known_checksums(
+                package_name, arch_urls, probed, destinations
+            )
+        checksums.update(known_checksums)
 
-        checksums = {}
-        failed_archs = []
+        downloads = {
+            arch: (url, destinations[arch])
+            for arch, url in arch_urls.items()
+            if arch not in known_checksums
+        }
+
+        # 使用 Downloader 并行下载所有架构
+        download_start = time.perf_counter()
+        with phase("download"):
+            download_results = await self.downloader.download_all(
+                downloads, package_name=package_name
+            )
 
         for arch, result in download_results.items():
+            if (run := current_run()) is not None:
+                run.add_span(
+                    "download.arch",
+                    download_start,
+                    result.download_time,
+                    arch=arch,
+                    success=result.success,
+                    bytes=result.downloaded_size - result.resumed_from,
+                    resumed_from=result.resumed_from,
+                    retries=result.retry_count,
+                )
+
             if not result.success:
                 if not verify_only:
                     print(f"  错误: {arch} 架构下载失败: {result.error}")
@@ -156,10 +338,43 @@ class PackageUpdater:
                     failed_archs.append(arch)
                 continue
 
-            checksum = await self._calculate_checksum(result.file_path)
+            # 优先使用下载过程中计算的摘要，避免再次读取文件
+            checksum = result.digests.get(HashAlgorithmEnum.SHA512.value)
+            if checksum is None:
+                checksum = await self._calculate_checksum(result.file_path)
             checksums[arch] = checksum
             print(f"  {arch} 架构哈希验证通过: {checksum}")
 
+            if (run := current_run()) is not None:
+                run.record_artifact(
+                    arch,
+                    arch_urls[arch],
+                    metadata=result.metadata,
+                    sha512=checksum,
+                    source="download",
+                    bytes_transferred=result.downloaded_size - result.resumed_from,
+                    transfer_time=result.download_time,
+                )
+
+            self.checksum_ledger.record(
+                arch_urls[arch],
+                result.metadata,
+                checksum,
+                package=package_name,
+                arch=arch,
+            )
+            if self.artifact_store is not None and result.metadata is not None:
+                self.artifact_store.record(arch_urls[arch], result.metadata, checksum)
+            if self.artifact_cache is not None:
+                try:
+                    self.artifact_cache.store(
+                        arch_urls[arch], result.metadata, result.file_path, checksum
+                    )
+                except OSError as e:
+                    print(f"  警告: {arch} 架构文件写入下载缓存失败: {e}")
+
+        self._save_stores()
+
         if not verify_only and (failed_archs or not checksums):
             if failed_archs:
                 print(f"  错误: {len(failed_archs)} 个架构下载失败: {failed_archs}")
@@ -169,87 +384,280 @@ class PackageUpdater:
 
         return checksums, True
 
+    def _save_stores(self) -> None:
+        """写入校验和账本、文件元数据记录和下载缓存索引"""
+        try:
+            self.checksum_ledger.prune(self.config.packages)
+            self.checksum_ledger.save()
+            if self.artifact_store is not None:
+                self.artifact_store.save()
+            if self.artifact_cache is not None:
+                self.artifact_cache.save()
+        except OSError as e:
+            print(f"  警告: 写入本地缓存失败: {e}")
+
+    async def _resolve_known_checksums(
+        self,
+        package_name: str,
+        arch_urls: dict[str, str],
+        probed: dict[str, RemoteMetadata | None] | None = None,
+        destinations: dict[str, Path] | None = None,
+    ) -> dict[str, str]:
+        """
+        通过一次元数据探测，从校验和账本或下载缓存中获取各架构的校验和
+
+        1. 包启用 trust_ledger 时，URL、文件大小和校验字段均与账本一致则直接采用
+        2. 否则按 URL + 校验字段 + 文件大小查找下载缓存条目，命中时将缓存的文件放到下载路径
+
+        Args:
+            probed: 已探测过的远端元数据 {url: metadata}，只探测其余的 URL
+            destinations: 各架构的下载路径 {arch: path}
+
+        Returns:
+            {arch: checksum} 无需下载的架构及其校验和
+        """
+        trust_ledger = self.config.packages[package_name].trust_ledger
+        if self.force or (not trust_ledger and self.artifact_cache is None):
+            return {}
+
+        metadata_by_url = dict(probed or {})
+        pending = [url for url in arch_urls.values() if url not in metadata_by_url]
+        metadata_by_url.update(
+            zip(
+                pending,
+                await asyncio.gather(*(self.downloader.probe(url) for url in pending)),
+            )
+        )
+
+        hits: dict[str, str] = {}
+        for arch, url in arch_urls.items():
+            metadata = metadata_by_url.get(url)
+            if metadata is None:
+                continue
+
+            if trust_ledger and (entry := self.checksum_ledger.lookup(url, metadata)):
+                print(f"  {arch} 架构与校验和账本一致（{entry.run}）: {entry.sha512}")
+                checksum, source = entry.sha512, "ledger"
+            elif self.artifact_cache is not None and (
+                cached := self.artifact_cache.lookup(url, metadata)
+            ):
+                if destinations is not None and arch in destinations:
+                    try:
+                        self.artifact_cache.restore(cached, destinations[arch])
+                    except OSError as e:
+                        print(f"  警告: {arch} 架构无法从下载缓存取出文件，重新下载: {e}")
+                        continue
+                print(f"  {arch} 架构命中下载缓存: {cached.sha512}")
+                checksum, source = cached.sha512, "cache"
+            else:
+                continue
+
+            self.checksum_ledger.record(
+                url, metadata, checksum, package=package_name, arch=arch
+            )
+
+            hits[arch] = checksum
+            if self.artifact_store is not None:
+                self.artifact_store.record(url, metadata, checksum)
+            if (run := current_run()) is not None:
+                run.record_artifact(
+                    arch, url, metadata=metadata, sha512=checksum, source=source
+                )
+        return hits
+
+    async def _probe_unchanged_archs(
+        self, arch_urls: dict[str, str], current_checksums: dict[str, str]
+    ) -> tuple[dict[str, str], dict[str, RemoteMetadata | None]]:
+        """
+        通过远端元数据判断哪些架构的文件未变化（不下载文件内容）
+
+        仅当记录的 SHA512 与 PKGBUILD 中的一致，且 Content-Length、ETag、
+        Last-Modified 和 CDN 内容哈希头均未变化时，认为该架构的文件未变化。
+
+        Returns:
+            ({arch: checksum} 未变化的架构及其校验和, {url: metadata} 本次探测的结果)
+        """
+        if self.artifact_store is None or self.force:
+            return {}, {}
+
+        candidates = {
+            arch: (url, record)
+            for arch, url in arch_urls.items()
+            if (record := self.artifact_store.get(url)) is not None
+            and record.sha512 == current_checksums.get(arch)
+        }
+        if not candidates:
+            return {}, {}
+
+        with phase("download"):
+            probed = await asyncio.gather(
+                *(self.downloader.probe(url) for url, _ in candidates.values())
+            )
+
+        unchanged: dict[str, str] = {}
+        for (arch, (_, record)), metadata in zip(candidates.items(), probed):
+            if metadata is None:
+                continue
+            changed_fields = record.metadata.diff(metadata)
+            if changed_fields:
+                print(f"  {arch} 架构的远端元数据已变化: {', '.join(changed_fields)}")
+            else:
+                print(f"  {arch} 架构的远端元数据未变化，跳过下载")
+                unchanged[arch] = record.sha512
+                if (run := current_run()) is not None:
+                    run.record_artifact(
+                        arch,
+                        candidates[arch][0],
+                        metadata=metadata,
+                        sha512=record.sha512,
+                        source="metadata",
+                    )
+        return unchanged, {
+            url: metadata for (url, _), metadata in zip(candidates.values(), probed)
+        }
+
     async def update_package(
         self, package_name: str, package_config: PackageConfig
     ) -> bool:
-        """更新单个包"""
+        """更新单个包（记录阶段耗时和计时 span）"""
+        with track_package(package_name, self.checksum_ledger.run_id) as run:
+            success = await self._update_package(package_name, package_config)
+            if run.status != "unchanged":
+                run.status = "ok" if success else "failed"
+
+        self.runs.append(run)
+        if self.run_history is not None:
+            self.run_history.save(run)
+        return success
+
+    async def _update_package(
+        self, package_name: str, package_config: PackageConfig
+    ) -> bool:
+        """更新单个包（不含运行历史记录）"""
         print(f"开始更新包: {package_name}")
 
         try:
-            # 1. 获取最新版本信息
-            print(f"  1. 从 {package_config.fetch_url} 获取版本信息...")
-            response_data = await self.fetcher.fetch_text(package_config.fetch_url)
-            if not response_data:
-                print("  错误: 无法获取版本信息")
-                return False
-
-            # 2. 解析版本号和下载 URL
-            print("  2. 解析版本信息...")
             parser = self.parsers.get(package_config.parser)
             if not parser:
                 print(f"  错误: 找不到解析器 {package_config.parser}")
                 return False
 
-            new_version = parser.parse_version(response_data)
-            if not new_version:
-                print("  错误: 无法解析版本号")
+            # 1. 获取最新版本信息（条件请求，上游和本地状态都未变化时跳过后续步骤）
+            print(f"  1. 从 {package_config.fetch_url} 获取版本信息...")
+            with phase("fetch") as fetch_span:
+                fetch_result = await self.fetcher.fetch_text_conditional(
+                    package_config.fetch_url,
+                    package=package_name,
+                    local_state=self._local_state(package_config),
+                    use_cache=not self.force,
+                    find_end=parser.find_release_end if parser.streaming else None,
+                )
+                if fetch_span is not None and fetch_result is not None:
+                    fetch_span.attributes["partial"] = fetch_result.partial
+            if fetch_result is None or (
+                not fetch_result.unchanged and not fetch_result.text
+            ):
+                print("  错误: 无法获取版本信息")
                 return False
 
-            print(f"  最新版本: {new_version}")
+            if fetch_result.partial:
+                print("  已获取解析所需的内容，提前结束读取版本页")
 
-            # 3. 检查当前版本
-            pkgbuild_path = self._get_pkgbuild_path(package_config.pkgbuild)
-            print(f"  PKGBUILD路径: {pkgbuild_path}")
+            if fetch_result.unchanged:
+                reason = "304 Not Modified" if fetch_result.not_modified else "内容指纹未变化"
+                print(f"  上游版本信息未变化（{reason}），跳过后续步骤")
+                if (run := current_run()) is not None:
+                    run.status = "unchanged"
+                return True
 
-            if not pkgbuild_path.exists():
-                print(f"  错误: PKGBUILD文件不存在: {pkgbuild_path}")
-                return False
+            success = await self._update_from_response(
+                package_name, package_config, parser, fetch_result
+            )
+            if success:
+                # 仅在处理成功后记录缓存，失败的包下次运行时会重新检查；
+                # 本地状态指纹在更新 PKGBUILD 之后计算
+                self.fetcher.commit_fetch(
+                    package_config.fetch_url,
+                    fetch_result,
+                    package_name,
+                    self._local_state(package_config),
+                )
+            return success
 
-            editor = PKGBUILDEditor(pkgbuild_path)
-            current_version = editor.get_pkgver()
-            print(f"  当前版本: {current_version}")
+        except Exception as e:
+            print(f"  错误: 更新包 {package_name} 时发生异常: {e}")
+            return False
 
-            # 获取包支持的架构
-            supported_archs = package_config.get_supported_archs()
+    async def _update_from_response(
+        self,
+        package_name: str,
+        package_config: PackageConfig,
+        parser: BaseParser,
+        fetch_result: FetchResult,
+    ) -> bool:
+        """根据获取到的版本信息执行解析、下载和更新"""
+        response_data = fetch_result.text or ""
+
+        # 2. 解析版本号和下载 URL
+        print("  2. 解析版本信息...")
+        # 每个版本页只扫描和解码一次
+        with phase("parse"):
+            release = parser.parse_release(response_data)
+        new_version = release.version
+        if not new_version:
+            print("  错误: 无法解析版本号")
+            return False
 
-            # 版本比较
-            version_comparison = compare_versions(new_version, current_version)
+        print(f"  最新版本: {new_version}")
+        if (run := current_run()) is not None:
+            run.upstream_version = new_version
 
-            if version_comparison <= 0:
-                # 当前版本 >= 新版本，仅验证哈希
-                return await self._handle_version_not_newer(
-                    package_name,
-                    new_version,
-                    current_version,
-                    parser,
-                    supported_archs,
-                    response_data,
-                )
+        # 3. 检查当前版本
+        pkgbuild_path = self._get_pkgbuild_path(package_config.pkgbuild)
+        print(f"  PKGBUILD路径: {pkgbuild_path}")
+
+        if not pkgbuild_path.exists():
+            print(f"  错误: PKGBUILD文件不存在: {pkgbuild_path}")
+            return False
+
+        editor = self._read_pkgbuild(pkgbuild_path)
+        current_version = editor.get_pkgver()
+        print(f"  当前版本: {current_version}")
+
+        # 获取包支持的架构
+        supported_archs = package_config.get_supported_archs()
+
+        # 版本比较
+        version_comparison = compare_versions(new_version, current_version)
 
-            # 版本更新流程
-            return await self._handle_version_update(
+        if version_comparison <= 0:
+            # 当前版本 >= 新版本，仅验证哈希
+            return await self._handle_version_not_newer(
                 package_name,
                 new_version,
                 current_version,
-                editor,
-                parser,
+                release,
                 supported_archs,
-                response_data,
-                package_config,
             )
 
-        except Exception as e:
-            print(f"  错误: 更新包 {package_name} 时发生异常: {e}")
-            return False
+        # 版本更新流程
+        return await self._handle_version_update(
+            package_name,
+            new_version,
+            current_version,
+            editor,
+            release,
+            supported_archs,
+            package_config,
+        )
 
     async def _handle_version_not_newer(
         self,
         package_name: str,
         new_version: str,
         current_version: str,
-        parser: BaseParser,
+        release: Release,
         supported_archs: list,
-        response_data: str,
     ) -> bool:
         """
         处理版本不更新的情况（当前版本 >= 新版本）
@@ -266,9 +674,7 @@ class PackageUpdater:
             print("  说明: 当前包版本较新，无需降级")
             print("  注意: 仍将下载并验证哈希数据...")
 
-            arch_urls = await self._fetch_arch_urls(
-                parser, supported_archs, response_data
-            )
+            arch_urls = self._select_arch_urls(release, supported_archs)
             if not arch_urls:
                 print("  错误: 无法获取任何架构的下载URL")
                 return False
@@ -287,7 +693,7 @@ class PackageUpdater:
         pkgbuild_path = self._get_pkgbuild_path(
             self.config.packages[package_name].pkgbuild
         )
-        editor = PKGBUILDEditor(pkgbuild_path)
+        editor = self._read_pkgbuild(pkgbuild_path)
 
         current_checksums = {}
         for arch in supported_archs:
@@ -297,17 +703,28 @@ class PackageUpdater:
             else:
                 print(f"  警告: 无法获取 {arch.value} 架构的当前哈希值")
 
-        # 下载并计算新哈希值
-        arch_urls = await self._fetch_arch_urls(parser, supported_archs, response_data)
+        arch_urls = self._select_arch_urls(release, supported_archs)
         if not arch_urls:
             print("  错误: 无法获取任何架构的下载URL")
             return False
 
-        new_checksums, success = await self._download_and_verify(
-            package_name, new_version, arch_urls
+        # 先探测远端元数据，仅下载元数据有变化（或无记录）的架构
+        new_checksums, probed = await self._probe_unchanged_archs(
+            arch_urls, current_checksums
         )
-        if not success:
-            return False
+        pending_urls = {
+            arch: url for arch, url in arch_urls.items() if arch not in new_checksums
+        }
+
+        # 下载并计算新哈希值
+        if pending_urls:
+            # 已探测过的架构直接使用探测结果查找账本和下载缓存
+            downloaded_checksums, success = await self._download_and_verify(
+                package_name, new_version, pending_urls, probed=probed
+            )
+            if not success:
+                return False
+            new_checksums.update(downloaded_checksums)
 
         # 比较哈希值
         hash_changed = False
@@ -329,13 +746,14 @@ class PackageUpdater:
         new_pkgrel = current_pkgrel + 1
         print(f"  pkgrel: {current_pkgrel} → {new_pkgrel}")
 
-        editor.update_pkgrel(new_pkgrel)
+        with phase("edit"):
+            editor.update_pkgrel(new_pkgrel)
 
-        # 更新校验和（不更新 source URL，因为版本未变）
-        for arch, checksum in new_checksums.items():
-            editor.update_arch_checksum(arch, checksum)
+            # 更新校验和（不更新 source URL，因为版本未变）
+            for arch, checksum in new_checksums.items():
+                editor.update_arch_checksum(arch, checksum)
 
-        editor.save()
+        self._save_pkgbuild(editor)
         print(f"  包 {package_name} 的 pkgrel 已更新（版本未变但哈希已变）")
         return True
 
@@ -345,16 +763,15 @@ class PackageUpdater:
         new_version: str,
         current_version: str,
         editor: PKGBUILDEditor,
-        parser: BaseParser,
+        release: Release,
         supported_archs: list,
-        response_data: str,
         package_config: PackageConfig,
     ) -> bool:
         """处理版本更新流程"""
         print("  3. 下载文件并计算校验和...")
         print(f"  支持的架构: {[arch.value for arch in supported_archs]}")
 
-        arch_urls = await self._fetch_arch_urls(parser, supported_archs, response_data)
+        arch_urls = self._select_arch_urls(release, supported_archs)
         if not arch_urls:
             print("  错误: 无法获取任何架构的下载URL")
             return False
@@ -367,33 +784,46 @@ class PackageUpdater:
 
         # 更新 PKGBUILD
         print("  4. 更新 PKGBUILD 版本和校验和...")
-        editor.update_pkgver(new_version)
-        editor.update_pkgrel(1)  # 重置 pkgrel 为 1
+        with phase("edit"):
+            editor.update_pkgver(new_version)
+            editor.update_pkgrel(1)  # 重置 pkgrel 为 1
 
-        # 更新各架构的 source 和校验和
-        for arch, url in arch_urls.items():
-            if package_config.update_source_url:
-                editor.update_source_url(arch, url)
-            editor.update_arch_checksum(arch, checksums[arch])
+            # 更新各架构的 source 和校验和
+            for arch, url in arch_urls.items():
+                if package_config.update_source_url:
+                    editor.update_source_url(arch, url)
+                editor.update_arch_checksum(arch, checksums[arch])
 
-        editor.save()
+        self._save_pkgbuild(editor)
         print("  5. PKGBUILD 已更新")
 
         print(f"包 {package_name} 更新完成!")
         return True
 
-    async def _calculate_checksum(self, file_path: Path) -> str:
-        """计算文件的 SHA512 校验和"""
-        from utils.hash import calculate_file_hash
-        from constants.constants import HashAlgorithmEnum
+    def _read_pkgbuild(self, pkgbuild_path: Path) -> PKGBUILDEditor:
+        """读取 PKGBUILD（计入编辑阶段）"""
+        with span("pkgbuild.read", phase="edit", path=str(pkgbuild_path)):
+            return PKGBUILDEditor(pkgbuild_path)
+
+    def _save_pkgbuild(self, editor: PKGBUILDEditor) -> None:
+        """保存 PKGBUILD（计入编辑阶段）并标记本次运行修改了 PKGBUILD"""
+        with span("pkgbuild.save", phase="edit", path=str(editor.pkgbuild_path)):
+            editor.save()
+        if (run := current_run()) is not None:
+            run.pkgbuild_changed = True
 
-        return calculate_file_hash(file_path, HashAlgorithmEnum.SHA512.value)
+    async def _calculate_checksum(self, file_path: Path) -> str:
+        """在共享线程池中计算文件的 SHA512 校验和"""
+        with phase("hash", path=str(file_path)):
+            return await calculate_file_hash_async(
+                file_path, HashAlgorithmEnum.SHA512.value, executor=self.hash_executor
+            )
 
     async def update_all_packages(self) -> None:
         """
         更新所有配置的包
 
-        串行处理所有包（一个包处理完后才处理下一个）
+        通过 PackageScheduler 以有限并发处理所有包
         每个包的多个架构并行下载（通过 Downloader 实现）
         """
         # 过滤出启用的包
@@ -430,18 +860,34 @@ class PackageUpdater:
             print("\n没有可更新的包")
             return
 
-        success_count = 0
+        results = await self.scheduler.run(valid_packages, self.update_package)
+        success_count = sum(results.values())
         total_count = len(valid_packages)
-
-        for package_name, package_config in valid_packages.items():
-            print()
-            success = await self.update_package(package_name, package_config)
-            if success:
-                success_count += 1
+        self.export_reports()
 
         print()
         print(f"更新完成: {success_count}/{total_count} 个包更新成功")
 
+    def export_reports(self) -> None:
+        """按配置导出 JSON 运行报告和 Prometheus 指标文件"""
+        metrics_settings = self.config.settings.metrics
+        try:
+            if metrics_settings.report:
+                write_json_report(
+                    Path(metrics_settings.report),
+                    self.checksum_ledger.run_id,
+                    self.started_at,
+                    self.runs,
+                )
+                print(f"运行报告已写入: {metrics_settings.report}")
+            if metrics_settings.prometheus:
+                write_prometheus_textfile(
+                    Path(metrics_settings.prometheus), self.started_at, self.runs
+                )
+                print(f"Prometheus 指标已写入: {metrics_settings.prometheus}")
+        except OSError as e:
+            print(f"警告: 导出运行报告失败: {e}")
+
     def _is_package_updatable(
         self, package_name: str, package_config: PackageConfig
     ) -> tuple[bool, str | None]:
@@ -514,19 +960,80 @@ class PackageUpdater:
         # 更新包
         print(f"开始更新 {len(valid_packages)} 个包...")
 
-        success_count = 0
+        results = await self.scheduler.run(valid_packages, self.update_package)
+        success_count = sum(results.values())
         total_count = len(valid_packages)
-
-        for package_name, package_config in valid_packages.items():
-            print()
-            if await self.update_package(package_name, package_config):
-                success_count += 1
+        self.export_reports()
 
         print()
         print(f"更新完成: {success_count}/{total_count} 个包更新成功")
 
         return success_count, total_count
 
+    async def check_packages(
+        self, package_names: list[str] | None = None
+    ) -> list[CheckResult]:
+        """
+        并发检查包的上游版本是否高于 PKGBUILD 的 pkgver（不下载文件，不修改任何文件）
+
+        Args:
+            package_names: 要检查的包，None 时检查所有启用的包
+
+        Returns:
+            按包名顺序排列的检查结果
+        """
+        if package_names is None:
+            package_names = [
+                name for name, config in self.config.packages.items() if config.enable
+            ]
+        return list(
+            await asyncio.gather(*(self._check_package(name) for name in package_names))
+        )
+
+    async def _check_package(self, package_name: str) -> CheckResult:
+        """检查单个包的版本（异常记录为该包的检查失败，不影响其他包）"""
+        try:
+            return await self._check_package_version(package_name)
+        except Exception as e:
+            return CheckResult(package_name, None, None, ERROR, f"检查时发生异常: {e}")
+
+    async def _check_package_version(self, package_name: str) -> CheckResult:
+        package_config = self.config.packages.get(package_name)
+        if package_config is None:
+            return CheckResult(package_name, None, None, ERROR, "包不在配置中")
+
+        pkgbuild_path = self._get_pkgbuild_path(package_config.pkgbuild)
+        if not pkgbuild_path.exists():
+            return CheckResult(
+                package_name, None, None, ERROR, f"PKGBUILD 文件不存在: {pkgbuild_path}"
+            )
+        current = PKGBUILDEditor(pkgbuild_path).get_pkgver()
+        if not current:
+            return CheckResult(package_name, None, None, ERROR, "无法读取 pkgver")
+
+        parser = self.parsers.get(package_config.parser)
+        if parser is None:
+            return CheckResult(
+                package_name, current, None, ERROR, f"找不到解析器 {package_config.parser}"
+            )
+
+        # 需要版本页内容才能解析版本号，不发送条件请求，也不写入版本页缓存
+        fetch_result = await self.fetcher.fetch_text_conditional(
+            package_config.fetch_url,
+            use_cache=False,
+            find_end=parser.find_release_end if parser.streaming else None,
+        )
+        if fetch_result is None or not fetch_result.text:
+            return CheckResult(package_name, current, None, ERROR, "无法获取版本信息")
+
+        upstream = parser.parse_release(fetch_result.text).version
+        if not upstream:
+            return CheckResult(package_name, current, None, ERROR, "无法解析版本号")
+
+        comparison = compare_versions(upstream, current)
+        status = OUTDATED if comparison > 0 else AHEAD if comparison < 0 else UP_TO_DATE
+        return CheckResult(package_name, current, upstream, status)
+
     def list_available_packages(self) -> None:
         """列出所有可用的包"""
         print("可用的包:")
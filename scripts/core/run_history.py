@@ -0,0 +1,423 @@
+"""
+运行历史模块
+
+将每次运行中每个包的处理结果写入本地 SQLite 数据库：
+1. 上游版本、下载 URL、校验字段、校验和以及传输字节数
+2. 获取（fetch）、解析（parse）、下载（download）、哈希（hash）、编辑（edit）各阶段耗时
+
+处理过程中的记录（包括各阶段的计时 span）保存在 ContextVar 中，并发处理多个包时互不干扰。
+"""
+
+import sqlite3
+import time
+from collections.abc import Iterator
+from contextlib import AbstractContextManager, closing, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+from urllib.parse import urlsplit
+
+from utils.artifact_metadata import RemoteMetadata
+
+PHASES: tuple[str, ...] = ("fetch", "parse", "download", "hash", "edit")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS package_runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id TEXT NOT NULL,
+    package TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    status TEXT NOT NULL,
+    upstream_version TEXT,
+    pkgbuild_changed INTEGER NOT NULL DEFAULT 0,
+    bytes_transferred INTEGER NOT NULL DEFAULT 0,
+    wall_time REAL NOT NULL,
+    fetch_time REAL NOT NULL DEFAULT 0,
+    parse_time REAL NOT NULL DEFAULT 0,
+    download_time REAL NOT NULL DEFAULT 0,
+    hash_time REAL NOT NULL DEFAULT 0,
+    edit_time REAL NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_package_runs_package
+    ON package_runs (package, started_at);
+CREATE TABLE IF NOT EXISTS artifacts (
+    package_run_id INTEGER NOT NULL REFERENCES package_runs (id) ON DELETE CASCADE,
+    arch TEXT NOT NULL,
+    url TEXT NOT NULL,
+    host TEXT NOT NULL,
+    validator TEXT,
+    content_length INTEGER,
+    sha512 TEXT,
+    source TEXT,
+    bytes_transferred INTEGER NOT NULL DEFAULT 0,
+    transfer_time REAL NOT NULL DEFAULT 0
+);
+"""
+
+
+@dataclass
+class ArtifactRun:
+    """单个架构文件在本次运行中的处理记录"""
+
+    url: str
+    validator: str | None = None
+    content_length: int | None = None
+    sha512: str | None = None
+    # 校验和来源：download / cache / ledger / metadata
+    source: str | None = None
+    bytes_transferred: int = 0
+    transfer_time: float = 0.0
+
+
+@dataclass
+class Span:
+    """一个计时区间"""
+
+    name: str
+    # 相对于包处理开始的时间（秒）
+    start: float
+    duration: float = 0.0
+    # 附加信息，如架构、字节数、重试次数
+    attributes: dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class PackageRun:
+    """单个包在本次运行中的处理记录"""
+
+    package: str
+    run_id: str
+    started_at: float = field(default_factory=time.time)
+    status: str = "failed"
+    upstream_version: str | None = None
+    pkgbuild_changed: bool = False
+    phases: dict[str, float] = field(default_factory=lambda: dict.fromkeys(PHASES, 0.0))
+    artifacts: dict[str, ArtifactRun] = field(default_factory=dict)
+    spans: list[Span] = field(default_factory=list)
+    wall_time: float = 0.0
+    # perf_counter 计时起点，span 的 start 相对于此时间
+    origin: float = field(default_factory=time.perf_counter, repr=False)
+
+    @property
+    def bytes_transferred(self) -> int:
+        return sum(artifact.bytes_transferred for artifact in self.artifacts.values())
+
+    def artifact(self, arch: str, url: str) -> ArtifactRun:
+        """获取（或创建）架构文件记录"""
+        artifact = self.artifacts.get(arch)
+        if artifact is None or artifact.url != url:
+            artifact = self.artifacts[arch] = ArtifactRun(url=url)
+        return artifact
+
+    def record_artifact(
+        self,
+        arch: str,
+        url: str,
+        *,
+        metadata: RemoteMetadata | None = None,
+        sha512: str | None = None,
+        source: str | None = None,
+        bytes_transferred: int = 0,
+        transfer_time: float = 0.0,
+    ) -> None:
+        """记录架构文件的元数据、校验和及传输情况"""
+        artifact = self.artifact(arch, url)
+        if metadata is not None:
+            artifact.validator = metadata.validator
+            artifact.content_length = metadata.content_length
+        if sha512 is not None:
+            artifact.sha512 = sha512
+        if source is not None:
+            artifact.source = source
+        artifact.bytes_transferred += bytes_transferred
+        artifact.transfer_time += transfer_time
+
+    def add_span(
+        self, name: str, start: float, duration: float, **attributes: Any
+    ) -> Span:
+        """
+        记录已结束的计时区间（如并发下载中单个架构的耗时）
+
+        Args:
+            start: 开始时间（perf_counter 值）
+            duration: 持续时间（秒）
+        """
+        recorded = Span(
+            name=name,
+            start=start - self.origin,
+            duration=duration,
+            attributes=attributes,
+        )
+        self.spans.append(recorded)
+        return recorded
+
+
+_current_run: ContextVar[PackageRun | None] = ContextVar("current_run", default=None)
+
+
+def current_run() -> PackageRun | None:
+    """当前任务正在处理的包记录（未记录历史时为 None）"""
+    return _current_run.get()
+
+
+@contextmanager
+def span(
+    name: str, *, phase: str | None = None, **attributes: Any
+) -> Iterator[Span | None]:
+    """
+    记录当前包的一个计时区间（未在 track_package 中时不做任何事）
+
+    Args:
+        name: 区间名称，如 pkgbuild.read
+        phase: 计入的阶段（fetch / parse / download / hash / edit）
+        attributes: 附加信息，也可在区间内通过返回的 Span 补充
+    """
+    run = _current_run.get()
+    if run is None:
+        yield None
+        return
+
+    start = time.perf_counter()
+    recorded = Span(name=name, start=start - run.origin, attributes=attributes)
+    try:
+        yield recorded
+    finally:
+        recorded.duration = time.perf_counter() - start
+        run.spans.append(recorded)
+        if phase is not None:
+            run.phases[phase] = run.phases.get(phase, 0.0) + recorded.duration
+
+
+def phase(name: str, **attributes: Any) -> AbstractContextManager[Span | None]:
+    """记录与阶段同名的计时区间，并累计阶段耗时"""
+    return span(name, phase=name, **attributes)
+
+
+@contextmanager
+def _tracking(run: PackageRun) -> Iterator[PackageRun]:
+    token = _current_run.set(run)
+    try:
+        yield run
+    finally:
+        run.wall_time = time.perf_counter() - run.origin
+        _current_run.reset(token)
+
+
+def track_package(package: str, run_id: str) -> AbstractContextManager[PackageRun]:
+    """在上下文中收集包的处理记录（阶段耗时、span 和文件信息）"""
+    return _tracking(PackageRun(package=package, run_id=run_id))
+
+
+@dataclass(frozen=True)
+class HistoryRow:
+    """历史视图中的一行"""
+
+    package: str
+    started_at: float
+    status: str
+    upstream_version: str | None
+    pkgbuild_changed: bool
+    bytes_transferred: int
+    wall_time: float
+    phases: dict[str, float]
+
+
+class RunHistory:
+    """基于 SQLite 的运行历史存储"""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+
+    def _connect(self) -> sqlite3.Connection:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(self.path)
+        connection.execute("PRAGMA foreign_keys = ON")
+        connection.executescript(_SCHEMA)
+        return connection
+
+    def save(self, run: PackageRun) -> None:
+        """写入包处理记录，失败时只打印警告"""
+        try:
+            self.record(run)
+        except sqlite3.Error as e:
+            print(f"  警告: 写入运行历史失败: {e}")
+
+    def record(self, run: PackageRun) -> None:
+        """写入一条包处理记录"""
+        with closing(self._connect()) as connection, connection:
+            cursor = connection.execute(
+                """
+                INSERT INTO package_runs (
+                    run_id, package, started_at, status, upstream_version,
+                    pkgbuild_changed, bytes_transferred, wall_time,
+                    fetch_time, parse_time, download_time, hash_time, edit_time
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    run.run_id,
+                    run.package,
+                    run.started_at,
+                    run.status,
+                    run.upstream_version,
+                    int(run.pkgbuild_changed),
+                    run.bytes_transferred,
+                    run.wall_time,
+                    *(run.phases.get(name, 0.0) for name in PHASES),
+                ),
+            )
+            connection.executemany(
+                """
+                INSERT INTO artifacts (
+                    package_run_id, arch, url, host, validator, content_length,
+                    sha512, source, bytes_transferred, transfer_time
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                [
+                    (
+                        cursor.lastrowid,
+                        arch,
+                        artifact.url,
+                        urlsplit(artifact.url).hostname or "",
+                        artifact.validator,
+                        artifact.content_length,
+                        artifact.sha512,
+                        artifact.source,
+                        artifact.bytes_transferred,
+                        artifact.transfer_time,
+                    )
+                    for arch, artifact in run.artifacts.items()
+                ],
+            )
+
+    def recent(self, package: str | None = None, limit: int = 10) -> list[HistoryRow]:
+        """每个包最近 limit 次运行的记录，按时间先后排列"""
+        if not self.path.exists():
+            return []
+
+        with closing(self._connect()) as connection:
+            rows = connection.execute(
+                """
+                SELECT package, started_at, status, upstream_version, pkgbuild_changed,
+                       bytes_transferred, wall_time,
+                       fetch_time, parse_time, download_time, hash_time, edit_time
+                FROM (
+                    SELECT *, ROW_NUMBER() OVER (
+                        PARTITION BY package ORDER BY started_at DESC
+                    ) AS position
+                    FROM package_runs
+                    WHERE ? IS NULL OR package = ?
+                )
+                WHERE position <= ?
+                ORDER BY package, started_at
+                """,
+                (package, package, limit),
+            ).fetchall()
+
+        return [
+            HistoryRow(
+                package=row[0],
+                started_at=row[1],
+                status=row[2],
+                upstream_version=row[3],
+                pkgbuild_changed=bool(row[4]),
+                bytes_transferred=row[5],
+                wall_time=row[6],
+                phases=dict(zip(PHASES, row[7:])),
+            )
+            for row in rows
+        ]
+
+    def version_changes(self, package: str | None = None) -> list[tuple[str, str, float]]:
+        """每个包每个上游版本首次出现的时间，用于观察上游发布节奏"""
+        if not self.path.exists():
+            return []
+
+        with closing(self._connect()) as connection:
+            return connection.execute(
+                """
+                SELECT package, upstream_version, MIN(started_at) AS first_seen
+                FROM package_runs
+                WHERE upstream_version IS NOT NULL AND (? IS NULL OR package = ?)
+                GROUP BY package, upstream_version
+                ORDER BY package, first_seen
+                """,
+                (package, package),
+            ).fetchall()
+
+    def host_throughput(self, package: str | None = None) -> list[tuple[str, int, int, float]]:
+        """
+        各下载主机的传输统计
+
+        Returns:
+            [(主机, 下载次数, 总字节数, 平均速度 B/s)]
+        """
+        if not self.path.exists():
+            return []
+
+        with closing(self._connect()) as connection:
+            return connection.execute(
+                """
+                SELECT a.host, COUNT(*), SUM(a.bytes_transferred),
+                       SUM(a.bytes_transferred) / SUM(a.transfer_time)
+                FROM artifacts AS a
+                JOIN package_runs AS r ON r.id = a.package_run_id
+                WHERE a.bytes_transferred > 0 AND a.transfer_time > 0
+                  AND (? IS NULL OR r.package = ?)
+                GROUP BY a.host
+                ORDER BY a.host
+                """,
+                (package, package),
+            ).fetchall()
+
+
+def _format_size(size: float) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+def print_history(history: RunHistory, package: str | None = None, limit: int = 10) -> None:
+    """打印运行历史：各阶段耗时趋势、上游版本变化和下载主机吞吐量"""
+    rows = history.recent(package, limit)
+    if not rows:
+        print("暂无运行历史")
+        return
+
+    current_package: str | None = None
+    for row in rows:
+        if row.package != current_package:
+            current_package = row.package
+            print(f"\n{row.package} 最近 {limit} 次运行:")
+            print(
+                f"  {'时间':<16} {'状态':<9} {'版本':<18} "
+                + " ".join(f"{name:>8}" for name in PHASES)
+                + f" {'总耗时':>8} {'传输':>10}"
+            )
+        started = time.strftime("%Y-%m-%d %H:%M", time.localtime(row.started_at))
+        marker = "*" if row.pkgbuild_changed else " "
+        print(
+            f"  {started:<16} {row.status:<9} {(row.upstream_version or '-') + marker:<18} "
+            + " ".join(f"{row.phases[name]:>7.2f}s" for name in PHASES)
+            + f" {row.wall_time:>7.2f}s {_format_size(row.bytes_transferred):>10}"
+        )
+    print("\n  * 表示本次运行修改了 PKGBUILD")
+
+    changes = history.version_changes(package)
+    if changes:
+        print("\n上游版本首次发现时间:")
+        for name, version, first_seen in changes:
+            seen = time.strftime("%Y-%m-%d %H:%M", time.localtime(first_seen))
+            print(f"  {name:<24} {version:<20} {seen}")
+
+    throughput = history.host_throughput(package)
+    if throughput:
+        print("\n下载主机吞吐量:")
+        for host, count, total, speed in throughput:
+            print(
+                f"  {host:<40} {count:>4} 次 {_format_size(total):>10} "
+                f"{_format_size(speed):>10}/s"
+            )
+
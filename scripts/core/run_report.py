@@ -0,0 +1,172 @@
+"""
+运行报告导出模块
+
+将本次运行所有包的处理记录导出为：
+1. JSON 运行报告（包含每个包的阶段耗时、文件信息和计时 span）
+2. Prometheus textfile collector 格式的指标文件（供 node_exporter 采集，用于吞吐量和耗时告警）
+"""
+
+import json
+import os
+import time
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any
+
+from core.run_history import PHASES, PackageRun
+
+METRIC_PREFIX = "aur_updater"
+
+
+def _write_atomic(path: Path, content: str) -> None:
+    """原子地写入文件（textfile collector 要求文件不被读到一半）"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    tmp_path.write_text(content, encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+def build_report(
+    run_id: str, started_at: float, runs: list[PackageRun]
+) -> dict[str, Any]:
+    """构建 JSON 运行报告"""
+    return {
+        "run_id": run_id,
+        "started_at": started_at,
+        "finished_at": time.time(),
+        "packages": [
+            {
+                "package": run.package,
+                "status": run.status,
+                "upstream_version": run.upstream_version,
+                "pkgbuild_changed": run.pkgbuild_changed,
+                "wall_time": run.wall_time,
+                "bytes_transferred": run.bytes_transferred,
+                "phases": run.phases,
+                "artifacts": {
+                    arch: asdict(artifact) for arch, artifact in run.artifacts.items()
+                },
+                "spans": [asdict(span) for span in run.spans],
+            }
+            for run in runs
+        ],
+    }
+
+
+def write_json_report(
+    path: Path, run_id: str, started_at: float, runs: list[PackageRun]
+) -> None:
+    """写入 JSON 运行报告"""
+    _write_atomic(
+        path,
+        json.dumps(
+            build_report(run_id, started_at, runs), ensure_ascii=False, indent=2
+        )
+        + "\n",
+    )
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class _MetricWriter:
+    """按指标分组输出 Prometheus 文本格式"""
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, tuple[str, list[str]]] = {}
+
+    def add(self, name: str, help_text: str, value: float, **labels: str) -> None:
+        full_name = f"{METRIC_PREFIX}_{name}"
+        _, samples = self._metrics.setdefault(full_name, (help_text, []))
+        label_text = ",".join(
+            f'{key}="{_escape(label)}"' for key, label in labels.items()
+        )
+        samples.append(
+            f"{full_name}{{{label_text}}} {value:g}" if labels else f"{full_name} {value:g}"
+        )
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for name, (help_text, samples) in self._metrics.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} gauge")
+            lines.extend(samples)
+        return "\n".join(lines) + "\n"
+
+
+def render_prometheus(started_at: float, runs: list[PackageRun]) -> str:
+    """生成 Prometheus textfile collector 格式的指标"""
+    writer = _MetricWriter()
+    writer.add("last_run_timestamp_seconds", "上次运行开始的 Unix 时间", started_at)
+    for run in runs:
+        package = run.package
+        writer.add(
+            "package_success",
+            "包处理是否成功（上游未变化也视为成功）",
+            0 if run.status == "failed" else 1,
+            package=package,
+        )
+        writer.add(
+            "package_pkgbuild_changed",
+            "本次运行是否修改了 PKGBUILD",
+            int(run.pkgbuild_changed),
+            package=package,
+        )
+        writer.add(
+            "package_duration_seconds", "包处理总耗时", run.wall_time, package=package
+        )
+        for name in PHASES:
+            writer.add(
+                "phase_duration_seconds",
+                "包在各阶段的耗时",
+                run.phases.get(name, 0.0),
+                package=package,
+                phase=name,
+            )
+        writer.add(
+            "package_transferred_bytes",
+            "包下载传输的字节数",
+            run.bytes_transferred,
+            package=package,
+        )
+
+        for downloaded in (span for span in run.spans if span.name == "download.arch"):
+            arch = str(downloaded.attributes.get("arch", ""))
+            transferred = float(downloaded.attributes.get("bytes", 0))
+            writer.add(
+                "download_duration_seconds",
+                "单个架构文件的下载耗时",
+                downloaded.duration,
+                package=package,
+                arch=arch,
+            )
+            writer.add(
+                "download_bytes",
+                "单个架构文件本次传输的字节数",
+                transferred,
+                package=package,
+                arch=arch,
+            )
+            writer.add(
+                "download_throughput_bytes_per_second",
+                "单个架构文件的下载吞吐量",
+                transferred / downloaded.duration if downloaded.duration > 0 else 0,
+                package=package,
+                arch=arch,
+            )
+            writer.add(
+                "download_retries",
+                "单个架构文件的重试次数",
+                float(downloaded.attributes.get("retries", 0)),
+                package=package,
+                arch=arch,
+            )
+    return writer.render()
+
+
+def write_prometheus_textfile(
+    path: Path, started_at: float, runs: list[PackageRun]
+) -> None:
+    """写入 Prometheus textfile collector 指标文件"""
+    _write_atomic(path, render_prometheus(started_at, runs))
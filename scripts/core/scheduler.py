@@ -0,0 +1,70 @@
+"""
+包级并发调度器
+
+以有限并发同时运行多个包的完整更新流程：
+1. 通过信号量限制同时处理的包数量
+2. 并发模式下按包缓冲输出，包处理结束后整体输出，保证日志按包分组
+"""
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from contextlib import nullcontext
+
+from utils.output import capture_task_output, emit, grouped_stdout
+
+
+class PackageScheduler:
+    """
+    有限并发的包调度器
+
+    max_jobs 为 1 时按配置顺序串行执行，输出实时打印；
+    大于 1 时并发执行，每个包的输出在其处理结束后一次性打印。
+    """
+
+    def __init__(self, max_jobs: int = 1, *, group_output: bool = True) -> None:
+        self.max_jobs = max(1, max_jobs)
+        self.group_output = group_output
+
+    async def run[T](
+        self,
+        items: dict[str, T],
+        worker: Callable[[str, T], Awaitable[bool]],
+    ) -> dict[str, bool]:
+        """
+        调度执行所有任务
+
+        Args:
+            items: {名称: 参数} 字典，按插入顺序调度
+            worker: 处理单个任务的协程函数，返回是否成功
+
+        Returns:
+            {名称: 是否成功} 字典，顺序与 items 一致
+        """
+        if self.max_jobs == 1 or len(items) <= 1:
+            results: dict[str, bool] = {}
+            for name, item in items.items():
+                print()
+                results[name] = await worker(name, item)
+            return results
+
+        print(f"并发处理 {len(items)} 个包（最多同时 {self.max_jobs} 个）")
+        semaphore = asyncio.Semaphore(self.max_jobs)
+
+        async def run_one(name: str, item: T) -> bool:
+            async with semaphore:
+                if not self.group_output:
+                    print()
+                    return await worker(name, item)
+
+                with capture_task_output() as buffer:
+                    try:
+                        return await worker(name, item)
+                    finally:
+                        emit("\n" + buffer.getvalue())
+
+        with grouped_stdout() if self.group_output else nullcontext():
+            outcomes: list[bool] = await asyncio.gather(
+                *(run_one(name, item) for name, item in items.items())
+            )
+
+        return dict(zip(items.keys(), outcomes))
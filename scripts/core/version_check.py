@@ -0,0 +1,64 @@
+"""
+版本检查结果模块
+
+--check 模式只获取并解析各包的版本页，与 PKGBUILD 的 pkgver 比较，不下载任何文件。
+结果以 JSON 输出，退出码供 CI 判断是否需要运行下载和构建任务。
+"""
+
+import json
+from dataclasses import asdict, dataclass
+
+# 检查状态
+UP_TO_DATE = "up_to_date"
+OUTDATED = "outdated"
+# PKGBUILD 的版本高于上游
+AHEAD = "ahead"
+ERROR = "error"
+
+# 退出码
+EXIT_UP_TO_DATE = 0
+EXIT_ERROR = 1
+EXIT_OUTDATED = 2
+
+
+@dataclass(frozen=True)
+class CheckResult:
+    """单个包的版本检查结果"""
+
+    package: str
+    current: str | None
+    upstream: str | None
+    status: str
+    error: str | None = None
+
+
+def overall_status(results: list[CheckResult]) -> str:
+    """整体状态：有错误时为 error，否则有过期包时为 outdated"""
+    statuses = {result.status for result in results}
+    if ERROR in statuses:
+        return ERROR
+    if OUTDATED in statuses:
+        return OUTDATED
+    return UP_TO_DATE
+
+
+def exit_code(results: list[CheckResult]) -> int:
+    """退出码：0 全部最新，1 有包检查失败，2 有包需要更新"""
+    return {
+        ERROR: EXIT_ERROR,
+        OUTDATED: EXIT_OUTDATED,
+        UP_TO_DATE: EXIT_UP_TO_DATE,
+    }[overall_status(results)]
+
+
+def render_json(results: list[CheckResult]) -> str:
+    """生成 JSON 摘要"""
+    return json.dumps(
+        {
+            "status": overall_status(results),
+            "outdated": [r.package for r in results if r.status == OUTDATED],
+            "packages": [asdict(result) for result in results],
+        },
+        ensure_ascii=False,
+        indent=2,
+    )
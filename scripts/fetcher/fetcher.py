@@ -1,8 +1,24 @@
 """HTTP 客户端模块"""
 
+import hashlib
+import importlib.util
+from collections.abc import Callable
+from dataclasses import dataclass, replace
 from typing import Any
 
-from httpx import AsyncClient
+from httpx import (
+    URL,
+    AsyncBaseTransport,
+    AsyncClient,
+    AsyncHTTPTransport,
+    Limits,
+    Request,
+    Response,
+    Timeout,
+)
+
+from fetcher.http_cache import HttpCacheEntry, HttpMetadataCache
+from utils.single_flight import SingleFlight
 
 DEFAULT_HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/140.0.4472.124 Safari/537.36",
@@ -10,18 +26,148 @@ DEFAULT_HEADERS = {
     "Cache-Control": "no-cache",
 }
 
+# 流式获取时每次扫描保留的上一段文本长度（字符），跨块的匹配在下一次扫描中仍能找到
+STREAM_SCAN_OVERLAP = 4096
+
+# 未指定连接池限制时使用（与 httpx 的默认值一致）
+DEFAULT_LIMITS = Limits(max_connections=100, max_keepalive_connections=20)
+
+
+def http2_available() -> bool:
+    """是否安装了 HTTP/2 支持（h2）"""
+    return importlib.util.find_spec("h2") is not None
+
+
+class RewriteTransport(AsyncBaseTransport):
+    """
+    将所有请求改写到指定的基础 URL，用于在本地模拟上游服务器
+
+    原 URL 的主机名作为路径前缀保留，例如基础 URL 为 http://127.0.0.1:8000 时，
+    https://dldir1v6.qq.com/qqfile/QQ.deb 会被改写为 http://127.0.0.1:8000/dldir1v6.qq.com/qqfile/QQ.deb
+    """
+
+    def __init__(
+        self, base_url: str, transport: AsyncBaseTransport | None = None
+    ) -> None:
+        self.base_url = URL(base_url)
+        self._transport = transport or AsyncHTTPTransport()
+
+    def rewrite(self, url: URL) -> URL:
+        """计算改写后的 URL"""
+        return url.copy_with(
+            scheme=self.base_url.scheme,
+            host=self.base_url.host,
+            port=self.base_url.port,
+            path=f"{self.base_url.path.rstrip('/')}/{url.host}{url.path}",
+        )
+
+    async def handle_async_request(self, request: Request) -> Response:
+        request.url = self.rewrite(request.url)
+        request.headers["Host"] = request.url.netloc.decode("ascii")
+        return await self._transport.handle_async_request(request)
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+@dataclass(frozen=True)
+class FetchResult:
+    """条件请求结果"""
+
+    text: str | None
+    entry: HttpCacheEntry | None
+    not_modified: bool = False
+    fingerprint_unchanged: bool = False
+    # 流式获取时已在中途结束读取，text 只包含解析所需的前缀
+    partial: bool = False
+
+    @property
+    def unchanged(self) -> bool:
+        """上游内容是否与上次成功处理时相同"""
+        return self.not_modified or self.fingerprint_unchanged
+
 
 class Fetcher:
-    """HTTP 客户端封装，处理网络请求"""
+    """
+    HTTP 客户端封装，处理网络请求
+
+    版本页等小请求使用 client，大文件下载使用 download_client，两者的连接池相互独立，
+    长时间的下载不会占用版本页请求所需的连接。
+    多个包并发请求同一个版本页时，只发送一次请求并共享结果。
+    """
 
     def __init__(
-        self, timeout: int = 10, headers: dict[str, str] | None = None
+        self,
+        timeout: float | Timeout = 10,
+        headers: dict[str, str] | None = None,
+        cache: HttpMetadataCache | None = None,
+        *,
+        transport: AsyncBaseTransport | None = None,
+        rewrite_base_url: str | None = None,
+        limits: Limits | None = None,
+        download_timeout: float | Timeout | None = None,
+        download_limits: Limits | None = None,
+        http2: bool = False,
     ) -> None:
+        """
+        Args:
+            timeout: 版本页请求的超时时间（秒或 httpx.Timeout）
+            headers: 额外的请求头
+            cache: 版本页条件请求缓存
+            transport: 自定义 httpx 传输层（如测试用的 MockTransport），两个客户端共用
+            rewrite_base_url: 将所有请求（包括下载）改写到该基础 URL，用于本地模拟上游
+            limits: 版本页请求的连接池限制
+            download_timeout: 下载的超时时间，None 时与 timeout 相同
+            download_limits: 下载的连接池限制
+            http2: 是否协商 HTTP/2（未安装 h2 时回退到 HTTP/1.1）
+        """
         merged_headers: dict[str, str] = DEFAULT_HEADERS.copy()
         if headers:
             merged_headers.update(headers)
 
-        self.client = AsyncClient(timeout=timeout, headers=merged_headers)
+        if http2 and not http2_available():
+            print("警告: 未安装 h2，HTTP/2 已禁用（运行 uv sync 安装 httpx[http2] 依赖）")
+            http2 = False
+
+        self.client = AsyncClient(
+            timeout=timeout,
+            headers=merged_headers,
+            transport=self._build_transport(
+                transport, rewrite_base_url, limits, http2
+            ),
+        )
+        self.download_client = AsyncClient(
+            timeout=timeout if download_timeout is None else download_timeout,
+            headers=merged_headers,
+            transport=self._build_transport(
+                transport, rewrite_base_url, download_limits, http2
+            ),
+        )
+        self.cache = cache
+        # 进行中的文本请求（按 URL 和请求头合并）
+        self._inflight: SingleFlight[tuple[object, ...], Any] = SingleFlight()
+
+    @staticmethod
+    def _build_transport(
+        transport: AsyncBaseTransport | None,
+        rewrite_base_url: str | None,
+        limits: Limits | None,
+        http2: bool,
+    ) -> AsyncBaseTransport:
+        """创建客户端的传输层（自定义传输层时连接池设置不生效）"""
+        if transport is None:
+            transport = AsyncHTTPTransport(
+                limits=limits or DEFAULT_LIMITS,
+                http2=http2,
+            )
+        if rewrite_base_url:
+            transport = RewriteTransport(rewrite_base_url, transport)
+        return transport
+
+    async def aclose(self) -> None:
+        """关闭两个客户端的连接池"""
+        await self.client.aclose()
+        await self.download_client.aclose()
 
     async def fetch_json(
         self, url: str, headers: dict[str, str] | None = None
@@ -38,7 +184,14 @@ class Fetcher:
     async def fetch_text(
         self, url: str, headers: dict[str, str] | None = None
     ) -> str | None:
-        """获取文本数据"""
+        """获取文本数据（同一 URL 的并发请求只发送一次）"""
+        key = ("text", url, *sorted(f"{k}: {v}" for k, v in (headers or {}).items()))
+        text, _ = await self._inflight.do(key, lambda: self._fetch_text(url, headers))
+        return text
+
+    async def _fetch_text(
+        self, url: str, headers: dict[str, str] | None = None
+    ) -> str | None:
         try:
             response = await self.client.get(url, headers=headers)
             response.raise_for_status()
@@ -46,3 +199,130 @@ class Fetcher:
         except Exception as e:
             print(f"从 {url} 获取文本失败: {e}")
             return None
+
+    async def fetch_text_conditional(
+        self,
+        url: str,
+        *,
+        package: str | None = None,
+        local_state: str = "",
+        use_cache: bool = True,
+        find_end: Callable[[str], int | None] | None = None,
+    ) -> FetchResult | None:
+        """
+        使用条件请求获取文本数据
+
+        有缓存时发送 If-None-Match / If-Modified-Since；上游返回 304
+        或响应体指纹与缓存一致时，结果标记为未变化。
+        返回的 entry 需在处理成功后通过 commit_fetch 写入缓存。
+        同一 URL、缓存状态和 find_end 都相同的并发请求只发送一次，调用者共享同一个 FetchResult
+        （同一解析器实例的 find_release_end 绑定方法彼此相等，使用同一解析器的包可以共享）。
+
+        Args:
+            package: 缓存按（包, URL）记录，多个包共用一个版本页时互不影响
+            local_state: 本地状态指纹，与缓存条目记录的不同时忽略该条目（不发送条件请求）
+            find_end: 指定时流式读取响应，每收到一块文本后以尚未扫描的文本（包含上一次扫描
+                末尾 STREAM_SCAN_OVERLAP 个字符）调用，返回解析所需内容在该文本中的结束位置时
+                立即关闭连接；此时 text 和指纹只包含到该位置为止的前缀
+        """
+        cached = self.cache.get(url, package) if self.cache else None
+        if cached is not None and cached.local_state != local_state:
+            cached = None
+        # 结果是否“未变化”取决于调用者的缓存条目，流式读取的前缀取决于 find_end，
+        # 两者都相同的请求才能共享
+        result, _ = await self._inflight.do(
+            ("conditional", url, str(use_cache), find_end, cached),
+            lambda: self._fetch_text_conditional(
+                url, cached, use_cache=use_cache, find_end=find_end
+            ),
+        )
+        return result
+
+    async def _fetch_text_conditional(
+        self,
+        url: str,
+        cached: HttpCacheEntry | None,
+        *,
+        use_cache: bool,
+        find_end: Callable[[str], int | None] | None,
+    ) -> FetchResult | None:
+        request_headers: dict[str, str] = {}
+        if cached is not None and use_cache:
+            request_headers = cached.conditional_headers()
+
+        partial = False
+        try:
+            if find_end is None:
+                response = await self.client.get(url, headers=request_headers)
+                if response.status_code == 304 and cached is not None:
+                    return FetchResult(text=None, entry=cached, not_modified=True)
+                response.raise_for_status()
+                text, body = response.text, response.content
+            else:
+                async with self.client.stream(
+                    "GET", url, headers=request_headers
+                ) as response:
+                    if response.status_code == 304 and cached is not None:
+                        return FetchResult(text=None, entry=cached, not_modified=True)
+                    response.raise_for_status()
+                    text, partial = await self._read_prefix(response, find_end)
+                body = text.encode("utf-8")
+        except Exception as e:
+            print(f"从 {url} 获取文本失败: {e}")
+            return None
+
+        entry = HttpCacheEntry(
+            etag=response.headers.get("etag"),
+            last_modified=response.headers.get("last-modified"),
+            fingerprint=hashlib.sha256(body).hexdigest(),
+        )
+        fingerprint_unchanged = (
+            use_cache and cached is not None and cached.fingerprint == entry.fingerprint
+        )
+        return FetchResult(
+            text=text,
+            entry=entry,
+            fingerprint_unchanged=fingerprint_unchanged,
+            partial=partial,
+        )
+
+    @staticmethod
+    async def _read_prefix(
+        response: Response, find_end: Callable[[str], int | None]
+    ) -> tuple[str, bool]:
+        """
+        逐块读取响应文本，返回 (文本, 是否在中途结束读取)
+
+        每次只扫描新收到的文本和上一次扫描末尾的一小段，总扫描量与页面大小成正比。
+        """
+        chunks: list[str] = []
+        # 待扫描的文本及其在完整文本中的起始位置
+        window = ""
+        window_start = 0
+        async for chunk in response.aiter_text():
+            chunks.append(chunk)
+            window += chunk
+            end = find_end(window)
+            if end is not None:
+                return "".join(chunks)[: window_start + end], True
+            dropped = max(len(window) - STREAM_SCAN_OVERLAP, 0)
+            window = window[dropped:]
+            window_start += dropped
+        return "".join(chunks), False
+
+    def commit_fetch(
+        self,
+        url: str,
+        result: FetchResult,
+        package: str | None = None,
+        local_state: str = "",
+    ) -> None:
+        """将包成功处理的请求元数据连同处理后的本地状态指纹写入缓存"""
+        if self.cache is None or result.entry is None:
+            return
+        try:
+            self.cache.commit(
+                url, replace(result.entry, local_state=local_state), package
+            )
+        except OSError as e:
+            print(f"  警告: 写入 HTTP 缓存失败: {e}")
@@ -0,0 +1,102 @@
+"""HTTP 元数据缓存模块（用于条件请求）"""
+
+import json
+import os
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+
+def cache_key(url: str, package: str | None = None) -> str:
+    """缓存条目的键：同一 URL 被多个包使用时，每个包独立记录（URL 中不含空格）"""
+    return url if package is None else f"{package} {url}"
+
+
+@dataclass(frozen=True)
+class HttpCacheEntry:
+    """单个 URL 的缓存元数据"""
+
+    etag: str | None
+    last_modified: str | None
+    fingerprint: str
+    # 记录时本地状态（PKGBUILD 和包配置）的指纹，本地状态变化后条目失效
+    local_state: str = ""
+
+    def conditional_headers(self) -> dict[str, str]:
+        """条件请求头"""
+        headers: dict[str, str] = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class HttpMetadataCache:
+    """
+    持久化的 HTTP 元数据缓存
+
+    按（包, URL）记录上一次成功处理时的 ETag、Last-Modified 和响应体指纹，
+    用于发送 If-None-Match / If-Modified-Since 条件请求。
+    多个包共用同一个版本页时，一个包处理成功不会使其他包被判定为未变化。
+    条目同时记录当时的本地状态指纹，PKGBUILD 或包配置变化后不再使用该条目。
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._entries: dict[str, HttpCacheEntry] | None = None
+
+    def _load(self) -> dict[str, HttpCacheEntry]:
+        """懒加载缓存文件，文件损坏时视为空缓存"""
+        if self._entries is not None:
+            return self._entries
+
+        self._entries = {}
+        if self.path.exists():
+            try:
+                data: dict[str, dict[str, str | None]] = json.loads(
+                    self.path.read_text(encoding="utf-8")
+                )
+                for url, entry in data.items():
+                    self._entries[url] = HttpCacheEntry(
+                        etag=entry.get("etag"),
+                        last_modified=entry.get("last_modified"),
+                        fingerprint=entry.get("fingerprint") or "",
+                        local_state=entry.get("local_state") or "",
+                    )
+            except (OSError, ValueError, AttributeError) as e:
+                print(f"  警告: 读取 HTTP 缓存失败，已忽略: {e}")
+        return self._entries
+
+    def get(self, url: str, package: str | None = None) -> HttpCacheEntry | None:
+        """获取包的 URL 缓存元数据"""
+        return self._load().get(cache_key(url, package))
+
+    def conditional_headers(
+        self, url: str, package: str | None = None
+    ) -> dict[str, str]:
+        """根据缓存生成条件请求头"""
+        entry = self.get(url, package)
+        return entry.conditional_headers() if entry is not None else {}
+
+    def commit(
+        self, url: str, entry: HttpCacheEntry, package: str | None = None
+    ) -> None:
+        """记录包的 URL 最新元数据并立即写入磁盘"""
+        entries = self._load()
+        entries[cache_key(url, package)] = entry
+        self.save()
+
+    def save(self) -> None:
+        """原子地写入缓存文件"""
+        entries = self._load()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp_path.write_text(
+            json.dumps(
+                {url: asdict(entry) for url, entry in entries.items()},
+                ensure_ascii=False,
+                indent=2,
+            ),
+            encoding="utf-8",
+        )
+        os.replace(tmp_path, self.path)
@@ -1,9 +1,27 @@
 """配置文件加载模块"""
 
+import hashlib
+import os
+import sys
+from pathlib import Path
+from typing import Any
+
+import pydantic
 import yaml
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
+
+import constants.constants
+from constants.constants import (
+    CONFIG_CACHE_DIR,
+    CONFIG_CACHE_FILE,
+    ArchEnum,
+    ProgressModeEnum,
+)
+
+# 安装了 libyaml 时使用 C 实现的加载器
+SafeLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
 
-from constants.constants import ArchEnum
+_ARCHS_BY_VALUE: dict[str, ArchEnum] = {arch.value: arch for arch in ArchEnum}
 
 
 class DownloadSettings(BaseModel):
@@ -13,8 +31,92 @@ class DownloadSettings(BaseModel):
     max_retries: int = 3
     base_delay: float = 1.0
     timeout: int = 30
-    chunk_size: int = 8192
+    # 写入块大小（字节）：从 chunk_size 开始，按吞吐量在 [chunk_size, max_chunk_size] 之间调整
+    chunk_size: int = Field(default=64 * 1024, ge=1)
+    max_chunk_size: int = Field(default=4 * 1024 * 1024, ge=1)
+    # 已知文件大小时用 posix_fallocate 预分配空间
+    preallocate: bool = True
     show_progress: bool = True
+    # 进度显示方式（show_progress 为 false 时不显示）
+    progress_mode: ProgressModeEnum = ProgressModeEnum.AUTO
+    # 进度条的更新间隔（秒），与数据块大小无关
+    progress_interval: float = Field(default=0.1, gt=0)
+    # log 模式下每个文件输出进度行的间隔（秒）
+    log_interval: float = Field(default=5.0, gt=0)
+    # 分段并行下载：segments > 1 时，不小于 segment_threshold 字节的文件分段下载
+    segments: int = Field(default=1, ge=1)
+    segment_threshold: int = Field(default=64 * 1024 * 1024, ge=0)
+    # 哈希计算线程数（不设置时按 CPU 核心数）
+    hash_workers: int | None = Field(default=None, ge=1)
+
+    class Config:
+        extra = "ignore"
+
+
+class PoolSettings(BaseModel):
+    """HTTP 连接池配置（None 表示不限制）"""
+
+    max_connections: int | None = Field(default=None, ge=1)
+    max_keepalive_connections: int | None = Field(default=None, ge=0)
+    # 空闲连接保持时间（秒）
+    keepalive_expiry: float | None = Field(default=30.0, ge=0)
+
+    class Config:
+        extra = "ignore"
+
+
+class HttpSettings(BaseModel):
+    """HTTP 连接配置"""
+
+    # 是否协商 HTTP/2（需要安装 h2，未安装时回退到 HTTP/1.1）
+    http2: bool = False
+    # 建立连接的超时时间（秒）
+    connect_timeout: float = Field(default=10.0, gt=0)
+    # 版本页等小请求的读取超时（秒），下载的读取超时使用 download.timeout
+    read_timeout: float = Field(default=10.0, gt=0)
+    # 版本页和元数据请求的连接池
+    metadata_pool: PoolSettings = Field(
+        default_factory=lambda: PoolSettings(
+            max_connections=10, max_keepalive_connections=10
+        )
+    )
+    # 大文件下载的连接池（并发数已由 download.max_concurrent 限制）
+    download_pool: PoolSettings = Field(default_factory=PoolSettings)
+
+    class Config:
+        extra = "ignore"
+
+
+class SchedulerSettings(BaseModel):
+    """包调度配置"""
+
+    max_jobs: int = Field(default=1, ge=1)
+    group_output: bool = True
+
+    class Config:
+        extra = "ignore"
+
+
+class CacheSettings(BaseModel):
+    """本地缓存配置"""
+
+    enable: bool = True
+    dir: str = ".cache"
+    artifact_cache: bool = True
+    artifact_max_bytes: int = Field(default=2 * 1024**3, ge=0)
+    history: bool = True
+
+    class Config:
+        extra = "ignore"
+
+
+class MetricsSettings(BaseModel):
+    """运行报告和指标导出配置"""
+
+    # JSON 运行报告路径（None 表示不导出）
+    report: str | None = None
+    # Prometheus textfile collector 指标文件路径（None 表示不导出）
+    prometheus: str | None = None
 
     class Config:
         extra = "ignore"
@@ -24,6 +126,10 @@ class Settings(BaseModel):
     """全局配置"""
 
     download: DownloadSettings = Field(default_factory=DownloadSettings)
+    http: HttpSettings = Field(default_factory=HttpSettings)
+    scheduler: SchedulerSettings = Field(default_factory=SchedulerSettings)
+    cache: CacheSettings = Field(default_factory=CacheSettings)
+    metrics: MetricsSettings = Field(default_factory=MetricsSettings)
 
     class Config:
         extra = "ignore"
@@ -41,20 +147,24 @@ class PackageConfig(BaseModel):
     arch: list[str] = Field(default_factory=list)
     update_source_url: bool = Field(default=True)
     enable: bool = Field(default=True)
+    # 远端文件大小和校验字段与校验和账本一致时，直接使用账本中的 SHA512
+    trust_ledger: bool = Field(default=False)
+
+    # 加载时预先转换的架构列表（无法识别的架构被忽略）
+    _supported_archs: list[ArchEnum] = PrivateAttr(default_factory=list)
 
     class Config:
         extra = "ignore"
         validate_by_name = True
 
+    def model_post_init(self, context: Any) -> None:
+        self._supported_archs = [
+            _ARCHS_BY_VALUE[arch] for arch in self.arch if arch in _ARCHS_BY_VALUE
+        ]
+
     def get_supported_archs(self) -> list[ArchEnum]:
-        """将字符串架构列表转换为 ArchEnum 列表"""
-        supported_archs = []
-        for arch_str in self.arch:
-            for arch_enum in ArchEnum:
-                if arch_enum.value == arch_str:
-                    supported_archs.append(arch_enum)
-                    break
-        return supported_archs
+        """将字符串架构列表转换为 ArchEnum 列表（加载配置时预先计算）"""
+        return self._supported_archs
 
 
 class ConfigLoader(BaseModel):
@@ -67,8 +177,63 @@ class ConfigLoader(BaseModel):
         extra = "ignore"
 
     @classmethod
-    def load_from_yaml(cls, filepath: str = "config.yaml") -> "ConfigLoader":
-        """从 YAML 文件加载配置"""
-        with open(filepath, encoding="utf-8") as f:
-            data = yaml.safe_load(f)
-        return cls(**data)
+    def load_from_yaml(
+        cls, filepath: str = "config.yaml", *, use_cache: bool = True
+    ) -> "ConfigLoader":
+        """
+        从 YAML 文件加载配置
+
+        校验后的配置以 JSON 格式缓存在配置文件同目录的 .cache/ 下，以文件内容和配置模型
+        定义的哈希为键；内容未变化时直接读取缓存，跳过 YAML 解析，由 pydantic 从 JSON 重建模型。
+        缓存目录可能来自 CI 缓存等外部来源，因此不使用 pickle，缓存内容只会被当作数据校验。
+        """
+        path = Path(filepath)
+        content = path.read_bytes()
+        cache_path = path.parent / CONFIG_CACHE_DIR / CONFIG_CACHE_FILE
+        key = _cache_key(content)
+
+        if use_cache:
+            cached = _read_cache(cache_path, key)
+            if cached is not None:
+                try:
+                    return cls.model_validate_json(cached)
+                except pydantic.ValidationError:
+                    pass
+
+        config = cls(**(yaml.load(content, Loader=SafeLoader) or {}))
+        if use_cache:
+            _write_cache(cache_path, key, config)
+        return config
+
+
+def _cache_key(content: bytes) -> str:
+    """配置缓存键：配置文件内容、配置模型定义和运行环境的哈希"""
+    hasher = hashlib.sha256(content)
+    for source in (__file__, constants.constants.__file__):
+        hasher.update(Path(source).read_bytes())
+    hasher.update(f"{pydantic.VERSION}|{sys.version}".encode())
+    return hasher.hexdigest()
+
+
+def _read_cache(cache_path: Path, key: str) -> bytes | None:
+    """读取配置缓存的 JSON 内容（首行为缓存键），不存在、已过期或无法读取时返回 None"""
+    try:
+        with cache_path.open("rb") as f:
+            if f.readline().rstrip(b"\n") != key.encode():
+                return None
+            return f.read()
+    except OSError:
+        return None
+
+
+def _write_cache(cache_path: Path, key: str, config: ConfigLoader) -> None:
+    """原子地写入配置缓存（失败时忽略，下次重新解析）"""
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_suffix(".tmp")
+        with tmp_path.open("wb") as f:
+            f.write(key.encode() + b"\n")
+            f.write(config.model_dump_json().encode("utf-8"))
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass
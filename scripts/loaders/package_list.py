@@ -0,0 +1,22 @@
+"""
+包列表快速读取模块
+
+只从配置文件中读取包名和启用状态，不导入 pydantic 和配置模型，
+供 --list 等只读命令使用，保持启动开销在几十毫秒以内。
+"""
+
+import yaml
+
+# 安装了 libyaml 时使用 C 实现的加载器
+SafeLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+def read_package_states(filepath: str = "config.yaml") -> dict[str, bool]:
+    """读取 {包名: 是否启用}（enable 缺省为启用，与 PackageConfig 一致）"""
+    with open(filepath, encoding="utf-8") as f:
+        data = yaml.load(f, Loader=SafeLoader) or {}
+    packages: dict[str, dict | None] = data.get("packages") or {}
+    return {
+        name: bool((package or {}).get("enable", True))
+        for name, package in packages.items()
+    }
@@ -1,39 +1,171 @@
 #!/usr/bin/env python3
-"""AUR 包自动更新工具主入口"""
+"""
+AUR 包自动更新工具主入口
+
+重量级模块（httpx、rich、pydantic、asyncio 等）只在需要它们的命令中导入，
+--list 等只读命令不会加载更新流程的依赖。
+"""
 
 import argparse
-import asyncio
 import sys
+from typing import TYPE_CHECKING
 
-from core.package_updater import PackageUpdater
+if TYPE_CHECKING:
+    from loaders.config_loader import ConfigLoader
 
 
-async def main() -> None:
-    """主函数，处理命令行参数并执行相应操作"""
+def parse_args() -> argparse.Namespace:
+    """解析命令行参数"""
     parser = argparse.ArgumentParser(description="AUR包更新工具")
     parser.add_argument(
         "--package", "-p", nargs="+", metavar="NAME", help="更新指定的包（可指定多个）"
     )
     parser.add_argument("--list", "-l", action="store_true", help="列出所有可用的包")
     parser.add_argument("--all", "-a", action="store_true", help="更新所有包")
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="只检查上游版本（不下载），输出 JSON 摘要；退出码 0 全部最新，1 检查失败，2 有包需要更新",
+    )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        metavar="N",
+        help="同时处理的包数量（覆盖配置文件中的 settings.scheduler.max_jobs）",
+    )
+    parser.add_argument(
+        "--force",
+        "-f",
+        action="store_true",
+        help="忽略本地缓存（版本页、文件元数据和下载缓存），完整检查每个包",
+    )
+
+    parser.add_argument(
+        "--report",
+        metavar="FILE",
+        help="将 JSON 运行报告写入指定文件（覆盖 settings.metrics.report）",
+    )
+    parser.add_argument(
+        "--metrics-file",
+        metavar="FILE",
+        help="将 Prometheus 指标写入指定文件（覆盖 settings.metrics.prometheus）",
+    )
+    parser.add_argument(
+        "--history",
+        action="store_true",
+        help="查看运行历史（各阶段耗时、上游版本变化和下载吞吐量），可配合 --package 过滤",
+    )
+    parser.add_argument(
+        "--limit",
+        type=int,
+        default=10,
+        metavar="N",
+        help="--history 显示每个包最近的运行次数（默认 10）",
+    )
 
     args = parser.parse_args()
 
-    updater = PackageUpdater()
+    if args.jobs is not None and args.jobs < 1:
+        parser.error("--jobs 必须大于等于 1")
+
+    if args.limit < 1:
+        parser.error("--limit 必须大于等于 1")
+
+    return args
+
+
+def list_packages() -> None:
+    """列出所有可用的包（只读取包名和启用状态）"""
+    from loaders.package_list import read_package_states
+
+    print("可用的包:")
+    for package_name, enabled in read_package_states().items():
+        print(f"  - {package_name} [{'启用' if enabled else '禁用'}]")
+
+
+def show_history(config: "ConfigLoader", packages: list[str] | None, limit: int) -> None:
+    """查看运行历史"""
+    from pathlib import Path
+
+    from constants.constants import RUN_HISTORY_FILE
+    from core.run_history import RunHistory, print_history
+
+    history = RunHistory(Path(config.settings.cache.dir) / RUN_HISTORY_FILE)
+    for package_name in packages or [None]:
+        print_history(history, package_name, limit)
+
+
+async def run_check(args: argparse.Namespace, config: "ConfigLoader") -> int:
+    """检查各包是否需要更新，stdout 只输出 JSON 摘要，返回退出码"""
+    import contextlib
+
+    from core.package_updater import PackageUpdater
+    from core.version_check import exit_code, render_json
+
+    # 诊断信息输出到 stderr，保持 stdout 可被直接解析
+    with contextlib.redirect_stdout(sys.stderr):
+        updater = PackageUpdater(config=config)
+        try:
+            results = await updater.check_packages(args.package)
+        finally:
+            await updater.fetcher.aclose()
+            updater.hash_executor.shutdown()
+
+    print(render_json(results))
+    return exit_code(results)
+
+
+async def run_updates(args: argparse.Namespace, config: "ConfigLoader") -> int:
+    """执行更新，返回退出码"""
+    from core.package_updater import PackageUpdater
+
+    updater = PackageUpdater(max_jobs=args.jobs, force=args.force, config=config)
+    try:
+        # 更新指定的包
+        if args.package:
+            success_count, total_count = await updater.update_packages(args.package)
+            return 0 if success_count == total_count else 1
+
+        # 更新所有包
+        await updater.update_all_packages()
+        return 0
+    finally:
+        # 关闭两个连接池和哈希线程池
+        await updater.fetcher.aclose()
+        updater.hash_executor.shutdown()
+
+
+def main() -> int:
+    """主函数，处理命令行参数并执行相应操作"""
+    args = parse_args()
 
     # 列出所有包
     if args.list:
-        updater.list_available_packages()
-        return
+        list_packages()
+        return 0
+
+    from loaders.config_loader import ConfigLoader
+
+    config = ConfigLoader.load_from_yaml()
+
+    # 查看运行历史
+    if args.history:
+        show_history(config, args.package, args.limit)
+        return 0
+
+    if args.report:
+        config.settings.metrics.report = args.report
+    if args.metrics_file:
+        config.settings.metrics.prometheus = args.metrics_file
+
+    import asyncio
 
-    # 更新指定的包
-    if args.package:
-        success_count, total_count = await updater.update_packages(args.package)
-        sys.exit(0 if success_count == total_count else 1)
+    if args.check:
+        return asyncio.run(run_check(args, config))
 
-    # 更新所有包
-    await updater.update_all_packages()
+    return asyncio.run(run_updates(args, config))
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    sys.exit(main())
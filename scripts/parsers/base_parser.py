@@ -1,14 +1,36 @@
 """解析器基类模块"""
 
 from abc import ABC, abstractmethod
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from types import MappingProxyType
 from typing import Any
 
 from constants.constants import ArchEnum
 
 
+@dataclass(frozen=True)
+class Release:
+    """从一次上游响应中解析出的发布信息（版本号和各架构的下载 URL）"""
+
+    version: str | None
+    # {架构: 下载 URL}，只包含能解析到 URL 的架构
+    urls: Mapping[str, str] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "urls", MappingProxyType(dict(self.urls)))
+
+    def url(self, arch: ArchEnum | str) -> str | None:
+        """指定架构的下载 URL"""
+        return self.urls.get(arch.value if isinstance(arch, ArchEnum) else arch)
+
+
 class BaseParser(ABC):
     """解析器抽象基类，定义版本号和 URL 解析接口"""
 
+    # 为 True 时流式获取版本页，find_release_end 找到所需内容后即停止接收
+    streaming: bool = False
+
     @abstractmethod
     def parse_version(self, response_data: str | Any) -> str | None:
         """从响应数据中提取版本号"""
@@ -16,3 +38,29 @@ class BaseParser(ABC):
     @abstractmethod
     def parse_url(self, arch: ArchEnum | str, response_data: str | Any) -> str | None:
         """从响应数据中提取下载 URL"""
+
+    def parse_release(self, response_data: str | Any) -> Release:
+        """
+        一次性解析版本号和所有架构的下载 URL
+
+        默认实现逐个调用 parse_version 和 parse_url；
+        需要对响应数据做昂贵解析（正则、JSON 解码）的解析器应重写此方法，只扫描一次响应数据。
+        """
+        urls: dict[str, str] = {}
+        for arch in ArchEnum:
+            if url := self.parse_url(arch, response_data):
+                urls[arch.value] = url
+        return Release(version=self.parse_version(response_data), urls=urls)
+
+    def find_release_end(self, text: str) -> int | None:
+        """
+        流式获取时判断已接收的文本是否已包含解析所需的全部内容
+
+        Args:
+            text: 尚未扫描的文本（新收到的文本，前面带有上一次扫描末尾的一小段重叠，
+                用于找到跨块的匹配；所需内容超出重叠长度时会继续接收到页面末尾）
+
+        Returns:
+            所需内容在 text 中的结束位置（之后的内容不再接收，也不参与解析）；需要继续接收时返回 None
+        """
+        return None
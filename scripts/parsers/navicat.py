@@ -4,16 +4,22 @@ import re
 from typing import Any
 
 from constants.constants import ArchEnum, NAVICAT_URLS
-from .base_parser import BaseParser
+from .base_parser import BaseParser, Release
+
+VERSION_PATTERN: re.Pattern[str] = re.compile(
+    r"(Navicat[^()]*\(Linux\)[^v]*version[^\d]*)(\d+\.\d+\.\d+)", re.IGNORECASE
+)
 
 
 class NavicatPremiumCSParser(BaseParser):
     """Navicat Premium CS 版本解析器"""
 
+    # 发布说明按时间倒序排列，最新的 Linux 版本位于页面开头
+    streaming = True
+
     def parse_version(self, response_data: str | Any) -> str | None:
         """从 Navicat 响应数据中提取版本号"""
-        pattern: str = r"(Navicat[^()]*\(Linux\)[^v]*version[^\d]*)(\d+\.\d+\.\d+)"
-        matched: re.Match[str] | None = re.search(pattern, response_data, re.IGNORECASE)
+        matched: re.Match[str] | None = VERSION_PATTERN.search(response_data)
         return matched.group(2) if matched else None
 
     def parse_url(self, arch: ArchEnum | str, response_data: str | Any) -> str | None:
@@ -25,3 +31,18 @@ class NavicatPremiumCSParser(BaseParser):
                 return NAVICAT_URLS[ArchEnum.AARCH64]
             case _:
                 return None
+
+    def parse_release(self, response_data: str | Any) -> Release:
+        """解析版本号，下载 URL 取自预定义映射"""
+        return Release(
+            version=self.parse_version(response_data),
+            urls={arch.value: url for arch, url in NAVICAT_URLS.items()},
+        )
+
+    def find_release_end(self, text: str) -> int | None:
+        """匹配到第一个 Linux 版本号即可结束接收"""
+        matched: re.Match[str] | None = VERSION_PATTERN.search(text)
+        # 版本号紧贴已接收文本的末尾时可能被截断，等待下一块
+        if matched and matched.end() < len(text):
+            return matched.end()
+        return None
@@ -5,7 +5,18 @@ import re
 from typing import Any
 
 from constants.constants import ArchEnum
-from .base_parser import BaseParser
+from .base_parser import BaseParser, Release
+
+PARAMS_PATTERN: re.Pattern[str] = re.compile(r"var params\s*=\s*(\{.*?\});", re.DOTALL)
+VERSION_PATTERN: re.Pattern[str] = re.compile(r"QQ_([\d._]+)_amd64")
+
+# 各架构在 params 中对应的字段
+ARCH_FIELDS: dict[str, str] = {
+    ArchEnum.X86_64.value: "x64DownloadUrl",
+    ArchEnum.AARCH64.value: "armDownloadUrl",
+    ArchEnum.LOONG64.value: "loongarchDownloadUrl",
+    ArchEnum.MIPS64EL.value: "mipsDownloadUrl",
+}
 
 
 class QQParser(BaseParser):
@@ -13,40 +24,34 @@ class QQParser(BaseParser):
 
     def parse_version(self, response_data: str | Any) -> str | None:
         """从 QQ 响应数据中提取版本号"""
-        url: str | None = self.parse_url(ArchEnum.X86_64, response_data)
-        if not url:
-            return None
-        pattern: str = r"QQ_([\d._]+)_amd64"
-        matched: re.Match[str] | None = re.search(pattern, url)
-        return matched.group(1) if matched else None
+        return self.parse_release(response_data).version
 
     def parse_url(self, arch: ArchEnum | str, response_data: str | Any) -> str | None:
         """从 QQ 响应数据中提取指定架构的下载 URL"""
-        arch_value: str = arch.value if isinstance(arch, ArchEnum) else arch
-
-        pattern: str = r"var params\s*=\s*(\{.*?\});"
-        matched: re.Match[str] | None = re.search(pattern, response_data, re.DOTALL)
-
-        if matched:
-            try:
-                result: dict[str, dict[str, str]] = json.loads(matched.group(1))
-                match arch_value:
-                    case ArchEnum.X86_64.value:
-                        return result.get("x64DownloadUrl", {}).get("deb")
-                    case ArchEnum.AARCH64.value:
-                        return result.get("armDownloadUrl", {}).get("deb")
-                    case ArchEnum.LOONG64.value:
-                        loongarch_url: str | dict[str, str] | None = result.get("loongarchDownloadUrl")
-                        if isinstance(loongarch_url, dict):
-                            return loongarch_url.get("deb")
-                        return loongarch_url
-                    case ArchEnum.MIPS64EL.value:
-                        mips_url: str | dict[str, str] | None = result.get("mipsDownloadUrl")
-                        if isinstance(mips_url, dict):
-                            return mips_url.get("deb")
-                        return mips_url
-
-            except json.JSONDecodeError:
-                print(f"JSON解析失败: {matched.group(1)}")
-
-        return None
+        return self.parse_release(response_data).url(arch)
+
+    def parse_release(self, response_data: str | Any) -> Release:
+        """从 params 对象中一次性提取所有架构的下载 URL，版本号取自 x86_64 的文件名"""
+        matched: re.Match[str] | None = PARAMS_PATTERN.search(response_data)
+        if not matched:
+            return Release(version=None)
+
+        try:
+            result: dict[str, Any] = json.loads(matched.group(1))
+        except json.JSONDecodeError:
+            print(f"JSON解析失败: {matched.group(1)}")
+            return Release(version=None)
+
+        urls: dict[str, str] = {}
+        for arch_value, field_name in ARCH_FIELDS.items():
+            # 龙芯和 MIPS 的字段可能直接是 URL 字符串
+            value: str | dict[str, str] | None = result.get(field_name)
+            url = value.get("deb") if isinstance(value, dict) else value
+            if url:
+                urls[arch_value] = url
+
+        version: str | None = None
+        if x86_url := urls.get(ArchEnum.X86_64.value):
+            version_matched: re.Match[str] | None = VERSION_PATTERN.search(x86_url)
+            version = version_matched.group(1) if version_matched else None
+        return Release(version=version, urls=urls)
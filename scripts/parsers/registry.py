@@ -0,0 +1,93 @@
+"""
+解析器注册表
+
+按名称延迟导入解析器：只有配置中的包实际引用某个解析器时才导入其模块并创建实例，
+解析器数量增长不会增加启动开销。
+
+解析器来源：
+1. 内置解析器（BUILTIN_PARSERS，名称 → "模块:类名"）
+2. 第三方包通过 aur_auto_update.parsers 入口点注册的解析器（名称未在内置解析器中找到时才扫描）
+"""
+
+import importlib
+from importlib.metadata import entry_points
+
+from constants.constants import ParserEnum
+from parsers.base_parser import BaseParser
+
+ENTRY_POINT_GROUP = "aur_auto_update.parsers"
+
+# 内置解析器 {名称: "模块:类名"}
+BUILTIN_PARSERS: dict[str, str] = {
+    ParserEnum.QQ.value: "parsers.qq:QQParser",
+    ParserEnum.NAVICAT_PREMIUM_CS.value: "parsers.navicat:NavicatPremiumCSParser",
+}
+
+
+def _load_class(target: str) -> type:
+    module_name, _, class_name = target.partition(":")
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+class ParserRegistry:
+    """按名称延迟创建的解析器集合"""
+
+    def __init__(
+        self,
+        builtin: dict[str, str] | None = None,
+        *,
+        discover_entry_points: bool = True,
+    ) -> None:
+        """
+        Args:
+            builtin: 内置解析器映射，None 时使用 BUILTIN_PARSERS
+            discover_entry_points: 名称未知时是否扫描已安装包的入口点
+        """
+        self._targets: dict[str, str] = dict(
+            BUILTIN_PARSERS if builtin is None else builtin
+        )
+        self._scanned = not discover_entry_points
+        self._instances: dict[str, BaseParser] = {}
+
+    def register(self, name: str, target: str) -> None:
+        """注册解析器（target 为 "模块:类名"），覆盖同名解析器"""
+        self._targets[name] = target
+        self._instances.pop(name, None)
+
+    def names(self) -> list[str]:
+        """所有已知的解析器名称（会扫描入口点）"""
+        self._scan_entry_points()
+        return sorted(self._targets)
+
+    def __contains__(self, name: str) -> bool:
+        if name not in self._targets:
+            self._scan_entry_points()
+        return name in self._targets
+
+    def get(self, name: str) -> BaseParser | None:
+        """获取解析器实例（首次使用时导入模块），未知或无法加载时返回 None"""
+        if name in self._instances:
+            return self._instances[name]
+        if name not in self:
+            return None
+
+        target = self._targets[name]
+        try:
+            parser_class = _load_class(target)
+        except (ImportError, AttributeError) as e:
+            print(f"  错误: 无法加载解析器 {name} ({target}): {e}")
+            return None
+        if not (isinstance(parser_class, type) and issubclass(parser_class, BaseParser)):
+            print(f"  错误: 解析器 {name} ({target}) 不是 BaseParser 的子类")
+            return None
+
+        parser = self._instances[name] = parser_class()
+        return parser
+
+    def _scan_entry_points(self) -> None:
+        """扫描入口点（只扫描一次，内置解析器优先）"""
+        if self._scanned:
+            return
+        self._scanned = True
+        for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+            self._targets.setdefault(entry_point.name, entry_point.value)
@@ -0,0 +1,67 @@
+from benchmarks.harness import (
+    MIN_ROUND_TIME,
+    Case,
+    Result,
+    compare,
+    load_baseline,
+    run_case,
+    save_baseline,
+)
+
+
+def test_compare_flags_regression_beyond_tolerance(tmp_path):
+    """最快一轮的耗时超过基线容差时视为性能回退，未记录的用例不参与比较"""
+    path = tmp_path / "baseline.json"
+    save_baseline(
+        path,
+        [
+            Result("hash", median=1.1, best=1.0, rounds=3),
+            Result("parse", median=0.6, best=0.5, rounds=3),
+        ],
+    )
+
+    comparisons = compare(
+        [
+            Result("hash", median=1.5, best=1.2, rounds=3),
+            Result("parse", median=0.9, best=0.8, rounds=3),
+            Result("new", median=1.0, best=1.0, rounds=3),
+        ],
+        load_baseline(path),
+        tolerance=0.25,
+    )
+
+    assert {c.name: c.regressed for c in comparisons} == {"hash": False, "parse": True}
+
+
+def test_fast_cases_loop_until_round_is_long_enough():
+    """单次调用很快的用例在一轮内重复调用，记录单次调用的平均耗时"""
+    calls: list[None] = []
+
+    result = run_case(Case("fast", lambda: calls.append(None), rounds=3))
+
+    assert result.loops > 1
+    assert result.best * result.loops >= MIN_ROUND_TIME * 0.5
+    assert len(calls) >= 1 + result.loops * 3
+
+
+def test_compare_uses_case_tolerance_and_absolute_floor(tmp_path):
+    """用例自己的容差优先于全局容差，耗时增长不足 MIN_REGRESSION_DELTA 时不视为回退"""
+    path = tmp_path / "baseline.json"
+    save_baseline(
+        path,
+        [
+            Result("tiny", median=0.0002, best=0.0002, rounds=5),
+            Result("noisy", median=1.0, best=1.0, rounds=5),
+        ],
+    )
+
+    comparisons = compare(
+        [
+            Result("tiny", median=0.0004, best=0.0004, rounds=5),
+            Result("noisy", median=1.4, best=1.4, rounds=5, tolerance=0.5),
+        ],
+        load_baseline(path),
+        tolerance=0.25,
+    )
+
+    assert {c.name: c.regressed for c in comparisons} == {"tiny": False, "noisy": False}
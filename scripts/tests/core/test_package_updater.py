@@ -0,0 +1,223 @@
+import hashlib
+import json
+import shutil
+from collections import Counter
+from unittest.mock import patch
+
+import pytest
+
+from benchmarks.end_to_end import prepare_standin, run_update, verify
+from benchmarks.local_server import LocalServer, NetworkConditions, SyntheticArtifact
+from core.package_updater import PackageUpdater, create_fetcher
+from core.version_check import (
+    ERROR,
+    EXIT_ERROR,
+    EXIT_OUTDATED,
+    EXIT_UP_TO_DATE,
+    OUTDATED,
+    UP_TO_DATE,
+    CheckResult,
+    exit_code,
+    render_json,
+)
+from updater.pkgbuild_editor import PKGBUILDEditor
+
+ARTIFACT_SIZE = 256 * 1024
+
+
+@pytest.mark.asyncio
+async def test_update_all_packages_against_standin(tmp_path):
+    """对本地模拟上游完整运行更新流程，中途断开的下载通过 Range 续传"""
+    standin = prepare_standin(tmp_path, ARTIFACT_SIZE)
+    standin.config.settings.download.base_delay = 0.01
+    standin.config.settings.metrics.report = str(tmp_path / "report.json")
+    flaky = NetworkConditions(disconnect_after=ARTIFACT_SIZE // 2)
+
+    with LocalServer(
+        standin.files, overrides=dict.fromkeys(standin.artifact_paths, flaky)
+    ) as server:
+        await run_update(standin, server, jobs=2)
+
+    assert verify(standin) == []
+    resumed = [request for request in server.requests if request.status == 206]
+    assert resumed and all(request.range for request in resumed)
+    # 续传不会重新传输已下载的部分
+    artifact_bytes = sum(
+        request.sent
+        for request in server.requests
+        if request.path in standin.artifact_paths
+    )
+    assert artifact_bytes == len(standin.artifact_paths) * ARTIFACT_SIZE
+
+    # 运行报告记录了每个架构的下载重试
+    report = json.loads((tmp_path / "report.json").read_text(encoding="utf-8"))
+    downloads = [
+        item
+        for package in report["packages"]
+        for item in package["spans"]
+        if item["name"] == "download.arch"
+    ]
+    assert len(downloads) == len(standin.artifact_paths)
+    assert all(item["attributes"]["retries"] >= 1 for item in downloads)
+
+
+@pytest.mark.asyncio
+async def test_check_packages_reports_outdated_without_downloading(tmp_path):
+    """--check 只请求版本页，不创建下载器，也不修改 PKGBUILD"""
+    standin = prepare_standin(tmp_path, ARTIFACT_SIZE)
+    pkgbuilds = {path: path.read_bytes() for path in standin.expected}
+
+    with LocalServer(standin.files) as server:
+        fetcher = create_fetcher(
+            standin.config.settings, rewrite_base_url=server.base_url
+        )
+        updater = PackageUpdater(config=standin.config, fetcher=fetcher)
+        try:
+            results = await updater.check_packages()
+        finally:
+            await fetcher.aclose()
+
+    assert results and all(result.status == OUTDATED for result in results)
+    assert all(result.current == "0" and result.upstream for result in results)
+    assert exit_code(results) == EXIT_OUTDATED
+    summary = json.loads(render_json(results))
+    assert summary["outdated"] == [result.package for result in results]
+
+    assert "downloader" not in updater.__dict__
+    assert not any(request.path in standin.artifact_paths for request in server.requests)
+    assert {path: path.read_bytes() for path in pkgbuilds} == pkgbuilds
+
+
+def test_check_exit_code():
+    """检查失败优先于需要更新"""
+    current = CheckResult("a", "1.0", "1.0", UP_TO_DATE)
+    outdated = CheckResult("b", "1.0", "2.0", OUTDATED)
+    failed = CheckResult("c", "1.0", None, ERROR, "无法获取版本信息")
+
+    assert exit_code([current]) == EXIT_UP_TO_DATE
+    assert exit_code([current, outdated]) == EXIT_OUTDATED
+    assert exit_code([outdated, failed]) == EXIT_ERROR
+
+
+@pytest.mark.asyncio
+async def test_check_packages_reports_exceptions_per_package(tmp_path):
+    """单个包检查时抛出异常，记录为该包失败，其余包照常检查"""
+    standin = prepare_standin(tmp_path, ARTIFACT_SIZE)
+    broken = next(iter(standin.config.packages))
+    standin.config.packages[broken].parser = "BrokenParser"
+
+    with LocalServer(standin.files) as server:
+        fetcher = create_fetcher(
+            standin.config.settings, rewrite_base_url=server.base_url
+        )
+        updater = PackageUpdater(config=standin.config, fetcher=fetcher)
+        updater.parsers.register("BrokenParser", "parsers.qq:QQParser")
+        parser = updater.parsers.get("BrokenParser")
+        with patch.object(parser, "parse_release", side_effect=ValueError("boom")):
+            try:
+                results = await updater.check_packages()
+            finally:
+                await fetcher.aclose()
+
+    by_name = {result.package: result for result in results}
+    assert len(by_name) > 1
+    assert by_name[broken].status == ERROR and "boom" in by_name[broken].error
+    assert all(
+        result.status == OUTDATED for name, result in by_name.items() if name != broken
+    )
+    assert exit_code(results) == EXIT_ERROR
+
+
+@pytest.mark.asyncio
+async def test_changed_artifacts_are_probed_once(tmp_path):
+    """版本未变但文件已变化时，元数据探测结果直接用于查找下载缓存，不再重复探测"""
+    standin = prepare_standin(tmp_path, ARTIFACT_SIZE)
+    standin.config.settings.download.base_delay = 0.01
+
+    with LocalServer(standin.files) as server:
+        await run_update(standin, server, jobs=2)
+        # 上游在版本号不变的情况下重新发布了文件
+        for seed, path in enumerate(standin.artifact_paths, start=100):
+            server.set_content(path, SyntheticArtifact(ARTIFACT_SIZE, seed=seed))
+        first_run = len(server.requests)
+        await run_update(standin, server, jobs=2)
+
+    probes = Counter(
+        request.path
+        for request in server.requests[first_run:]
+        if request.path in standin.artifact_paths
+        and (request.method == "HEAD" or request.range == "bytes=0-0")
+    )
+    assert probes == Counter(dict.fromkeys(standin.artifact_paths, 1))
+
+
+@pytest.mark.asyncio
+async def test_artifact_cache_hit_restores_downloaded_files(tmp_path):
+    """下载缓存位于缓存目录下，命中时不传输文件内容，并将缓存的文件放回下载目录"""
+    standin = prepare_standin(tmp_path, ARTIFACT_SIZE)
+    for package_config in standin.config.packages.values():
+        package_config.trust_ledger = False
+    downloads = tmp_path / "downloads"
+
+    with LocalServer(standin.files) as server:
+        await run_update(standin, server, jobs=2)
+        assert (tmp_path / ".cache" / "artifacts" / "index.json").exists()
+
+        # 清空下载目录，并让每个包重新走下载流程
+        shutil.rmtree(downloads)
+        for pkgbuild in standin.expected:
+            editor = PKGBUILDEditor(pkgbuild)
+            editor.update_pkgver("0")
+            editor.save()
+        first_run = len(server.requests)
+        await run_update(standin, server, jobs=2)
+
+    transferred = sum(
+        request.sent
+        for request in server.requests[first_run:]
+        if request.path in standin.artifact_paths
+    )
+    assert transferred <= len(standin.artifact_paths)
+    assert verify(standin) == []
+    restored = {
+        hashlib.sha512(path.read_bytes()).hexdigest() for path in downloads.iterdir()
+    }
+    expected = {
+        checksum
+        for checksums in standin.expected.values()
+        for checksum in checksums.values()
+    }
+    assert restored == expected
+
+
+@pytest.mark.asyncio
+async def test_local_changes_bypass_unchanged_fast_path(tmp_path):
+    """上游未变化但 PKGBUILD 或包配置已变化时，不跳过该包"""
+    standin = prepare_standin(tmp_path, ARTIFACT_SIZE)
+
+    def statuses(updater):
+        return {run.package: run.status for run in updater.runs}
+
+    with LocalServer(standin.files) as server:
+        await run_update(standin, server, jobs=2, http_cache=True)
+        updater = await run_update(standin, server, jobs=2, http_cache=True)
+        assert set(statuses(updater).values()) == {"unchanged"}
+
+        # 手动回退 PKGBUILD 的版本号
+        reverted = next(iter(standin.expected))
+        editor = PKGBUILDEditor(reverted)
+        editor.update_pkgver("0")
+        editor.save()
+        updater = await run_update(standin, server, jobs=2, http_cache=True)
+        assert statuses(updater)[reverted.parent.name] == "ok"
+        assert verify(standin) == []
+
+        # 修改包配置（如新增架构）
+        name, package_config = next(
+            (name, config)
+            for name, config in standin.config.packages.items()
+            if config.enable
+        )
+        package_config.trust_ledger = not package_config.trust_ledger
+        updater = await run_update(standin, server, jobs=2, http_cache=True)
+        assert statuses(updater)[name] == "ok"
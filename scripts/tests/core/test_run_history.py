@@ -0,0 +1,72 @@
+import time
+
+from core.run_history import (
+    RunHistory,
+    current_run,
+    phase,
+    print_history,
+    track_package,
+)
+from utils.artifact_metadata import RemoteMetadata
+
+
+def test_saved_run_records_phases_and_artifacts(tmp_path):
+    """track_package 期间记录的阶段耗时和文件信息由 save 写入数据库"""
+    history = RunHistory(tmp_path / "history.sqlite3")
+
+    with track_package("qq", "gh-1") as run:
+        with phase("fetch"):
+            time.sleep(0.01)
+        run.upstream_version = "3.2.23"
+        run.status = "ok"
+        current_run().record_artifact(
+            "x86_64",
+            "https://dldir1.qq.com/qq.deb",
+            metadata=RemoteMetadata(content_length=100, etag='"v1"'),
+            sha512="aa11",
+            source="download",
+            bytes_transferred=100,
+            transfer_time=0.5,
+        )
+
+    assert current_run() is None
+    assert run.wall_time >= 0.01
+    history.save(run)
+
+    rows = history.recent("qq")
+    assert len(rows) == 1
+    assert rows[0].upstream_version == "3.2.23"
+    assert rows[0].bytes_transferred == 100
+    assert rows[0].phases["fetch"] >= 0.01
+    assert history.host_throughput() == [("dldir1.qq.com", 1, 100, 200.0)]
+
+
+def test_recent_keeps_latest_runs_per_package(tmp_path, capsys):
+    """每个包只保留最近 limit 次，版本变化按首次出现时间列出"""
+    history = RunHistory(tmp_path / "history.sqlite3")
+    for index, version in enumerate(["1.0", "1.0", "1.1"]):
+        with track_package("qq", f"gh-{index}") as run:
+            run.started_at = 1_700_000_000 + index
+            run.upstream_version = version
+            run.status = "ok"
+        history.save(run)
+
+    rows = history.recent(limit=2)
+    assert [row.upstream_version for row in rows] == ["1.0", "1.1"]
+    assert [version for _, version, _ in history.version_changes()] == ["1.0", "1.1"]
+
+    print_history(history, limit=2)
+    assert "qq 最近 2 次运行" in capsys.readouterr().out
+
+
+def test_save_failure_only_warns(tmp_path, capsys):
+    """数据库无法写入时 save 只打印警告，不影响包的处理"""
+    path = tmp_path / "history.sqlite3"
+    path.mkdir()
+    history = RunHistory(path)
+
+    with track_package("qq", "gh-1") as run:
+        run.status = "ok"
+    history.save(run)
+
+    assert "警告: 写入运行历史失败" in capsys.readouterr().out
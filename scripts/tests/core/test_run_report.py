@@ -0,0 +1,31 @@
+import json
+
+from core.run_history import span, track_package
+from core.run_report import render_prometheus, write_json_report
+
+
+def test_exports_spans_and_download_metrics(tmp_path):
+    """JSON 报告包含计时 span，Prometheus 指标包含各架构的吞吐量和重试次数"""
+    with track_package("qq", "gh-1") as run:
+        with span("pkgbuild.read", phase="edit"):
+            pass
+        run.add_span(
+            "download.arch", run.origin, 2.0, arch="x86_64", bytes=1000, retries=1
+        )
+        run.status = "ok"
+
+    report_path = tmp_path / "report.json"
+    write_json_report(report_path, "gh-1", 1_700_000_000, [run])
+    report = json.loads(report_path.read_text(encoding="utf-8"))
+    spans = report["packages"][0]["spans"]
+    assert [item["name"] for item in spans] == ["pkgbuild.read", "download.arch"]
+    assert report["packages"][0]["phases"]["edit"] > 0
+
+    metrics = render_prometheus(1_700_000_000, [run])
+    assert "# TYPE aur_updater_download_throughput_bytes_per_second gauge" in metrics
+    assert (
+        'aur_updater_download_throughput_bytes_per_second{package="qq",arch="x86_64"} 500'
+        in metrics
+    )
+    assert 'aur_updater_download_retries{package="qq",arch="x86_64"} 1' in metrics
+    assert 'aur_updater_package_success{package="qq"} 1' in metrics
@@ -0,0 +1,43 @@
+import asyncio
+
+import pytest
+
+from core.scheduler import PackageScheduler
+
+
+@pytest.mark.asyncio
+async def test_run_limits_concurrency():
+    """同时运行的任务数不超过 max_jobs"""
+    running = 0
+    peak = 0
+
+    async def worker(name: str, delay: float) -> bool:
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(delay)
+        running -= 1
+        return name != "b"
+
+    scheduler = PackageScheduler(max_jobs=2)
+    results = await scheduler.run({"a": 0.02, "b": 0.01, "c": 0.01}, worker)
+
+    assert results == {"a": True, "b": False, "c": True}
+    assert peak == 2
+
+
+@pytest.mark.asyncio
+async def test_run_groups_output_per_package(capsys):
+    """并发模式下每个包的输出连续出现"""
+
+    async def worker(name: str, delay: float) -> bool:
+        print(f"{name}: start")
+        await asyncio.sleep(delay)
+        print(f"{name}: end")
+        return True
+
+    scheduler = PackageScheduler(max_jobs=2)
+    await scheduler.run({"a": 0.02, "b": 0.01}, worker)
+
+    lines = [line for line in capsys.readouterr().out.splitlines() if ": " in line]
+    assert lines == ["b: start", "b: end", "a: start", "a: end"]
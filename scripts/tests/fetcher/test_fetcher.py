@@ -1,6 +1,13 @@
+import asyncio
+import hashlib
+
 import pytest
 from unittest.mock import AsyncMock, patch
-from fetcher.fetcher import Fetcher
+from httpx import Limits, Request, Response, Timeout
+from benchmarks.local_server import LocalServer
+from fetcher.fetcher import STREAM_SCAN_OVERLAP, Fetcher
+from fetcher.http_cache import HttpCacheEntry, HttpMetadataCache
+from parsers.navicat import NavicatPremiumCSParser
 
 navicat_fech_url = "https://www.navicat.com.cn/products/navicat-premium-release-note#L"
 
@@ -27,3 +34,203 @@ async def test_fetch_text_failure():
         result = await fetcher.fetch_text("http://invalid.url")
 
     assert result is None
+
+
+@pytest.mark.asyncio
+async def test_fetch_text_conditional_not_modified(tmp_path):
+    """有缓存时发送条件请求头，304 时标记为未变化"""
+    cache = HttpMetadataCache(tmp_path / "http_cache.json")
+    cache.commit(
+        navicat_fech_url,
+        HttpCacheEntry(etag='"v1"', last_modified=None, fingerprint="abc"),
+    )
+    mock_get = AsyncMock(return_value=Response(304))
+
+    with patch("fetcher.fetcher.AsyncClient.get", mock_get):
+        fetcher = Fetcher(cache=cache)
+        result = await fetcher.fetch_text_conditional(navicat_fech_url)
+
+    assert result is not None and result.not_modified and result.unchanged
+    assert mock_get.call_args.kwargs["headers"] == {"If-None-Match": '"v1"'}
+
+
+@pytest.mark.asyncio
+async def test_fetch_text_conditional_fingerprint(tmp_path):
+    """响应体指纹与已提交的缓存一致时标记为未变化"""
+    cache = HttpMetadataCache(tmp_path / "http_cache.json")
+
+    with patch(
+        "fetcher.fetcher.AsyncClient.get",
+        AsyncMock(
+            return_value=Response(
+                200, text="hello", request=Request("GET", navicat_fech_url)
+            )
+        ),
+    ):
+        fetcher = Fetcher(cache=cache)
+        first = await fetcher.fetch_text_conditional(navicat_fech_url)
+        assert first is not None and not first.unchanged
+        fetcher.commit_fetch(navicat_fech_url, first)
+
+        second = await Fetcher(
+            cache=HttpMetadataCache(tmp_path / "http_cache.json")
+        ).fetch_text_conditional(navicat_fech_url)
+
+    assert second is not None and second.fingerprint_unchanged
+    assert second.text == "hello"
+
+
+@pytest.mark.asyncio
+async def test_packages_sharing_fetch_url_are_cached_separately(tmp_path):
+    """一个包提交缓存后，共用同一版本页的其他包仍会获取并处理版本页"""
+
+    async def get(url, headers=None, **kwargs):
+        if (headers or {}).get("If-None-Match") == '"v1"':
+            return Response(304)
+        return Response(
+            200,
+            text="hello",
+            headers={"etag": '"v1"'},
+            request=Request("GET", navicat_fech_url),
+        )
+
+    with patch("fetcher.fetcher.AsyncClient.get", AsyncMock(side_effect=get)):
+        fetcher = Fetcher(cache=HttpMetadataCache(tmp_path / "http_cache.json"))
+        first = await fetcher.fetch_text_conditional(navicat_fech_url, package="a")
+        assert first is not None and not first.unchanged
+        fetcher.commit_fetch(navicat_fech_url, first, "a")
+
+        other = await fetcher.fetch_text_conditional(navicat_fech_url, package="b")
+        again = await fetcher.fetch_text_conditional(navicat_fech_url, package="a")
+
+    assert other is not None and not other.unchanged and other.text == "hello"
+    assert again is not None and again.not_modified
+
+
+@pytest.mark.asyncio
+async def test_metadata_pool_separate_from_downloads():
+    """下载占满下载连接池时，版本页请求仍使用独立的连接池"""
+    files = {"/example.com/page": b"hello", "/example.com/big.bin": b"x" * 1024**2}
+    with LocalServer(files) as server:
+        fetcher = Fetcher(
+            timeout=Timeout(5, pool=0.5),
+            rewrite_base_url=server.base_url,
+            limits=Limits(max_connections=1),
+            download_limits=Limits(max_connections=1),
+        )
+        try:
+            async with fetcher.download_client.stream(
+                "GET", "https://example.com/big.bin"
+            ):
+                text = await fetcher.fetch_text("https://example.com/page")
+        finally:
+            await fetcher.aclose()
+
+    assert text == "hello"
+
+
+def test_http2_falls_back_without_h2(capsys):
+    """未安装 h2 时回退到 HTTP/1.1"""
+    with patch("fetcher.fetcher.http2_available", return_value=False):
+        Fetcher(http2=True)
+
+    assert "HTTP/2 已禁用" in capsys.readouterr().out
+
+
+@pytest.mark.asyncio
+async def test_concurrent_fetches_of_same_url_are_coalesced():
+    """多个包并发请求同一个版本页时只发送一次请求"""
+
+    async def slow_get(*args, **kwargs):
+        await asyncio.sleep(0.01)
+        return Response(200, text="hello", request=Request("GET", navicat_fech_url))
+
+    with patch("fetcher.fetcher.AsyncClient.get", AsyncMock(side_effect=slow_get)) as mock_get:
+        fetcher = Fetcher()
+        results = await asyncio.gather(
+            *(fetcher.fetch_text_conditional(navicat_fech_url) for _ in range(3))
+        )
+
+    assert mock_get.call_count == 1
+    assert results[0] is results[1] is results[2]
+
+
+@pytest.mark.asyncio
+async def test_streaming_fetches_with_different_end_markers_are_not_shared():
+    """共用版本页但结束标记不同的解析器各自读取所需的前缀，相同解析器仍共享请求"""
+    page = b"<p>alpha</p>" + b"<p>filler</p>" * 10_000 + b"<p>omega</p>"
+
+    class Parser:
+        def __init__(self, marker: str) -> None:
+            self.marker = marker
+
+        def find_end(self, text: str) -> int | None:
+            index = text.find(self.marker)
+            return index + len(self.marker) if index >= 0 else None
+
+    alpha, omega = Parser("alpha"), Parser("omega")
+    with LocalServer({"/example.com/release": page}) as server:
+        fetcher = Fetcher(rewrite_base_url=server.base_url)
+        try:
+            results = await asyncio.gather(
+                *(
+                    fetcher.fetch_text_conditional(
+                        "https://example.com/release", find_end=parser.find_end
+                    )
+                    for parser in (alpha, omega, alpha)
+                )
+            )
+        finally:
+            await fetcher.aclose()
+
+    assert all(result is not None for result in results)
+    assert results[0].text.endswith("alpha") and results[1].text.endswith("omega")
+    assert results[0] is results[2]
+    assert len(server.requests) == 2
+
+
+@pytest.mark.asyncio
+async def test_fetch_text_conditional_streaming_stops_early():
+    """流式获取在找到所需内容后关闭连接，指纹只覆盖该前缀"""
+    parser = NavicatPremiumCSParser()
+    header = b"<h1>Navicat Premium (Linux) version 17.3.9</h1>"
+    page = header + b"<p>older release history</p>" * 600_000
+    with LocalServer({"/www.navicat.com/release": page}) as server:
+        fetcher = Fetcher(rewrite_base_url=server.base_url)
+        try:
+            result = await fetcher.fetch_text_conditional(
+                "https://www.navicat.com/release", find_end=parser.find_release_end
+            )
+        finally:
+            await fetcher.aclose()
+
+    assert result is not None and result.partial
+    assert parser.parse_version(result.text) == "17.3.9"
+    assert server.bytes_sent() < len(page) // 2
+    assert result.entry is not None
+    assert result.entry.fingerprint == hashlib.sha256(result.text.encode()).hexdigest()
+
+
+@pytest.mark.asyncio
+async def test_read_prefix_scans_incrementally():
+    """每次只扫描新数据和一小段重叠，跨块的版本号仍能找到"""
+    parser = NavicatPremiumCSParser()
+    header = "<h1>Navicat Premium (Linux) version 17.3.9</h1>"
+    filler = "<p>older release history</p>" * 1000
+    chunks = [filler[:8192] for _ in range(20)] + [header[:30], header[30:], filler]
+    scanned: list[int] = []
+
+    def find_end(text: str) -> int | None:
+        scanned.append(len(text))
+        return parser.find_release_end(text)
+
+    class StubResponse:
+        async def aiter_text(self):
+            for chunk in chunks:
+                yield chunk
+
+    text, partial = await Fetcher._read_prefix(StubResponse(), find_end)
+
+    assert partial
+    assert text == "".join(chunks)[: len(text)] and text.endswith("17.3.9")
+    assert max(scanned) <= 8192 + STREAM_SCAN_OVERLAP
@@ -0,0 +1,74 @@
+from unittest.mock import patch
+
+import yaml
+
+from constants.constants import ArchEnum
+from loaders.config_loader import ConfigLoader
+
+CONFIG = """
+settings:
+  scheduler:
+    max_jobs: 2
+packages:
+  qq:
+    name: qq
+    source: qq
+    fetch_url: https://im.qq.com/linuxqq/index.shtml
+    upstream: https://im.qq.com
+    parser: QQParser
+    pkgbuild: packages/linuxqq/PKGBUILD
+    arch: [x86_64, riscv64, aarch64]
+"""
+
+
+def test_supported_archs_precomputed(tmp_path):
+    """架构列表在加载时转换，无法识别的架构被忽略"""
+    path = tmp_path / "config.yaml"
+    path.write_text(CONFIG, encoding="utf-8")
+    config = ConfigLoader.load_from_yaml(str(path), use_cache=False)
+
+    assert config.packages["qq"].get_supported_archs() == [
+        ArchEnum.X86_64,
+        ArchEnum.AARCH64,
+    ]
+
+
+def test_validated_config_cached_by_content(tmp_path):
+    """内容未变化时从缓存读取，跳过 YAML 解析；内容变化后重新解析"""
+    path = tmp_path / "config.yaml"
+    path.write_text(CONFIG, encoding="utf-8")
+    first = ConfigLoader.load_from_yaml(str(path))
+    assert (tmp_path / ".cache" / "config.json").exists()
+
+    with patch("loaders.config_loader.yaml.load") as load:
+        cached = ConfigLoader.load_from_yaml(str(path))
+    load.assert_not_called()
+    assert cached == first
+    assert cached.packages["qq"].get_supported_archs() == [
+        ArchEnum.X86_64,
+        ArchEnum.AARCH64,
+    ]
+
+    path.write_text(CONFIG.replace("max_jobs: 2", "max_jobs: 4"), encoding="utf-8")
+    assert ConfigLoader.load_from_yaml(str(path)).settings.scheduler.max_jobs == 4
+
+
+def test_invalid_cache_falls_back_to_yaml(tmp_path):
+    """缓存键不一致或内容无法通过校验时视为未命中，重新解析 YAML"""
+    path = tmp_path / "config.yaml"
+    path.write_text(CONFIG, encoding="utf-8")
+    ConfigLoader.load_from_yaml(str(path))
+    cache_path = tmp_path / ".cache" / "config.json"
+    key, content = cache_path.read_bytes().split(b"\n", 1)
+
+    for cached in (
+        b"stale-key\n" + content,
+        key + b"\n" + content.replace(b'"max_jobs":2', b'"max_jobs":"many"'),
+        # 缓存内容只被当作 JSON 数据校验，pickle 数据不会被反序列化
+        key + b"\n" + b"cos\nsystem\n(S'exit 1'\ntR.",
+    ):
+        cache_path.write_bytes(cached)
+        with patch("loaders.config_loader.yaml.load", wraps=yaml.load) as load:
+            config = ConfigLoader.load_from_yaml(str(path))
+        assert config.settings.scheduler.max_jobs == 2
+        load.assert_called_once()
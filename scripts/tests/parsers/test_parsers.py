@@ -0,0 +1,44 @@
+from pathlib import Path
+
+import pytest
+
+from constants.constants import ArchEnum, NAVICAT_URLS
+from parsers.navicat import NavicatPremiumCSParser
+from parsers.qq import QQParser
+
+SAMPLES_DIR = Path(__file__).parent.parent.parent / "benchmarks" / "samples"
+
+
+def test_qq_parse_release():
+    """一次解析得到版本号和所有架构的 URL，与逐个调用的结果一致"""
+    response_data = (SAMPLES_DIR / "qq_linuxConfig.js").read_text(encoding="utf-8")
+    parser = QQParser()
+    release = parser.parse_release(response_data)
+
+    assert release.version == "3.2.23_260108"
+    assert release.url(ArchEnum.X86_64).endswith("QQ_3.2.23_260108_amd64_01.deb")
+    assert release.url("loong64").endswith("loongarch64_01.deb")
+    assert parser.parse_version(response_data) == release.version
+    for arch in ArchEnum:
+        assert parser.parse_url(arch, response_data) == release.url(arch)
+
+    with pytest.raises(TypeError):
+        release.urls["x86_64"] = "https://example.com"  # type: ignore[index]
+
+
+def test_parse_release_without_match():
+    """无法解析时返回空的发布信息"""
+    release = QQParser().parse_release("<html></html>")
+    assert release.version is None and not release.urls
+
+
+def test_navicat_parse_release():
+    """Navicat 的 URL 来自预定义映射"""
+    response_data = (SAMPLES_DIR / "navicat_release_note.html").read_text(
+        encoding="utf-8"
+    )
+    release = NavicatPremiumCSParser().parse_release(response_data)
+
+    assert release.version is not None
+    assert release.url(ArchEnum.AARCH64) == NAVICAT_URLS[ArchEnum.AARCH64]
+    assert release.url(ArchEnum.LOONG64) is None
@@ -0,0 +1,32 @@
+from importlib.metadata import EntryPoint
+from unittest.mock import patch
+
+from parsers.qq import QQParser
+from parsers.registry import ENTRY_POINT_GROUP, ParserRegistry
+
+
+def test_builtin_parser_created_once():
+    """内置解析器在首次使用时创建，之后复用同一实例"""
+    registry = ParserRegistry(discover_entry_points=False)
+    parser = registry.get("QQParser")
+
+    assert isinstance(parser, QQParser)
+    assert registry.get("QQParser") is parser
+    assert registry.get("MissingParser") is None
+
+
+def test_entry_point_parser():
+    """未知名称时扫描入口点，无法加载的目标返回 None"""
+    discovered = [
+        EntryPoint("VendorParser", "parsers.qq:QQParser", ENTRY_POINT_GROUP),
+        EntryPoint("BrokenParser", "parsers.qq:Missing", ENTRY_POINT_GROUP),
+    ]
+    with patch("parsers.registry.entry_points", return_value=discovered) as scan:
+        registry = ParserRegistry()
+        assert isinstance(registry.get("QQParser"), QQParser)
+        scan.assert_not_called()
+
+        assert isinstance(registry.get("VendorParser"), QQParser)
+        assert registry.get("BrokenParser") is None
+        assert "VendorParser" in registry.names()
+        scan.assert_called_once_with(group=ENTRY_POINT_GROUP)
@@ -0,0 +1,46 @@
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from main import run_updates
+
+SCRIPTS_DIR = Path(__file__).parent.parent
+
+
+def test_list_does_not_import_update_dependencies():
+    """--list 只读取配置中的包名，不加载更新流程的重量级依赖"""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "main.py", "--list"],
+        cwd=SCRIPTS_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    imported = {
+        line.rsplit("|", 1)[1].strip()
+        for line in completed.stderr.splitlines()
+        if line.startswith("import time:")
+    }
+
+    assert "可用的包:" in completed.stdout
+    assert not imported & {"httpx", "rich", "pydantic", "asyncio", "core.package_updater"}
+
+
+@pytest.mark.asyncio
+async def test_run_updates_closes_clients_on_failure():
+    """更新过程中出现异常时也会关闭连接池和哈希线程池"""
+    updater = MagicMock()
+    updater.update_all_packages = AsyncMock(side_effect=RuntimeError("boom"))
+    updater.fetcher.aclose = AsyncMock()
+    args = argparse.Namespace(jobs=None, force=False, package=None)
+
+    with patch("core.package_updater.PackageUpdater", return_value=updater):
+        with pytest.raises(RuntimeError):
+            await run_updates(args, MagicMock())
+
+    updater.fetcher.aclose.assert_awaited_once()
+    updater.hash_executor.shutdown.assert_called_once()
@@ -0,0 +1,71 @@
+from updater.pkgbuild_editor import PKGBUILDEditor
+
+pkgbuild = """pkgname=demo
+pkgver=1.0.0
+pkgrel=3
+arch=('x86_64' 'aarch64')
+source_x86_64=(
+    'https://example.com/demo-1.0.0-x86_64.deb'  # amd64
+)
+sha512sums_x86_64=(
+    'aaa'
+)
+sha512sums_aarch64=('bbb')
+
+package() {
+    echo "pkgver=ignored"
+}
+"""
+
+
+def make_editor(tmp_path):
+    path = tmp_path / "PKGBUILD"
+    path.write_text(pkgbuild, encoding="utf-8")
+    return PKGBUILDEditor(path), path
+
+
+def test_reads_scalars_and_multiline_arrays(tmp_path):
+    """标量和跨多行的数组都能读取"""
+    editor, _ = make_editor(tmp_path)
+
+    assert editor.get_pkgver() == "1.0.0"
+    assert editor.get_pkgrel() == 3
+    assert editor.get_epoch() is None
+    assert editor.get_checksum("x86_64") == "aaa"
+    assert editor.get_checksum("aarch64") == "bbb"
+
+
+def test_update_all_applies_edits_in_one_pass(tmp_path):
+    """所有修改一次性写入，未涉及的内容保持不变"""
+    editor, path = make_editor(tmp_path)
+
+    editor.update_all(
+        "1.1.0",
+        {"x86_64": "ccc", "aarch64": "ddd"},
+        {"x86_64": "https://example.com/demo-1.1.0-x86_64.deb"},
+        new_epoch=2,
+    )
+    assert editor.get_pkgver() == "1.1.0"
+    assert editor.get_epoch() == 2
+    editor.save()
+
+    assert path.read_text(encoding="utf-8") == pkgbuild.replace(
+        "pkgver=1.0.0", "epoch=2\npkgver=1.1.0"
+    ).replace("pkgrel=3", "pkgrel=1").replace(
+        "source_x86_64=(\n    'https://example.com/demo-1.0.0-x86_64.deb'  # amd64\n)",
+        "source_x86_64=('https://example.com/demo-1.1.0-x86_64.deb')",
+    ).replace("sha512sums_x86_64=(\n    'aaa'\n)", "sha512sums_x86_64=('ccc')").replace(
+        "sha512sums_aarch64=('bbb')", "sha512sums_aarch64=('ddd')"
+    )
+
+
+def test_save_skips_unchanged_content(tmp_path):
+    """内容未变化时不写入文件"""
+    editor, path = make_editor(tmp_path)
+
+    editor.update_pkgrel(3)
+    assert not editor.has_changes
+    path.write_text("changed", encoding="utf-8")
+    editor.save()
+
+    assert path.read_text(encoding="utf-8") == "changed"
@@ -0,0 +1,62 @@
+from utils.artifact_cache import ArtifactCache
+from utils.artifact_metadata import RemoteMetadata
+
+
+def write_file(path, size):
+    path.write_bytes(b"x" * size)
+    return path
+
+
+def test_store_and_lookup(tmp_path):
+    """存入后可按 URL + 校验字段命中，校验字段变化则不命中"""
+    cache = ArtifactCache(tmp_path / "cache", max_bytes=1024)
+    metadata = RemoteMetadata(content_length=100, etag='"v1"')
+
+    cached_path = cache.store(
+        "https://example.com/a.deb", metadata, write_file(tmp_path / "a", 100), "aa11"
+    )
+
+    assert cached_path == tmp_path / "cache" / "objects" / "aa" / "aa11"
+    assert cache.lookup("https://example.com/a.deb", metadata) is not None
+    assert (
+        cache.lookup(
+            "https://example.com/a.deb", RemoteMetadata(content_length=100, etag='"v2"')
+        )
+        is None
+    )
+
+
+def test_evicts_least_recently_used(tmp_path):
+    """超出容量上限时淘汰最久未使用的内容"""
+    cache = ArtifactCache(tmp_path / "cache", max_bytes=250)
+    first = RemoteMetadata(content_length=100, etag='"a"')
+    second = RemoteMetadata(content_length=100, etag='"b"')
+    third = RemoteMetadata(content_length=100, etag='"c"')
+
+    cache.store("https://example.com/a", first, write_file(tmp_path / "a", 100), "aa")
+    cache.store("https://example.com/b", second, write_file(tmp_path / "b", 100), "bb")
+    assert cache.lookup("https://example.com/a", first) is not None
+    cache.store("https://example.com/c", third, write_file(tmp_path / "c", 100), "cc")
+    cache.save()
+
+    reloaded = ArtifactCache(tmp_path / "cache", max_bytes=250)
+    assert reloaded.lookup("https://example.com/a", first) is not None
+    assert reloaded.lookup("https://example.com/b", second) is None
+    assert not cache.object_path("bb").exists()
+
+
+def test_store_keeps_download_and_restore_links_object(tmp_path):
+    """存入后下载的文件保持原位，命中时将缓存的文件放回下载路径"""
+    cache = ArtifactCache(tmp_path / "cache", max_bytes=1024)
+    metadata = RemoteMetadata(content_length=100, etag='"v1"')
+    (tmp_path / "downloads").mkdir()
+    download = write_file(tmp_path / "downloads" / "a.deb", 100)
+
+    cache.store("https://example.com/a.deb", metadata, download, "aa11")
+    assert download.exists()
+
+    download.unlink()
+    entry = cache.lookup("https://example.com/a.deb", metadata)
+    assert entry is not None
+    cache.restore(entry, download)
+    assert download.read_bytes() == b"x" * 100
@@ -0,0 +1,45 @@
+from httpx import Headers
+
+from utils.artifact_metadata import RemoteMetadata
+
+qq_headers = {
+    "content-length": "1024",
+    "etag": '"abc"',
+    "last-modified": "Thu, 08 Jan 2026 08:00:00 GMT",
+    "x-cos-hash-crc64ecma": "123456789",
+}
+
+
+def test_from_headers_ranged_response():
+    """范围请求时从 Content-Range 解析完整大小"""
+    metadata = RemoteMetadata.from_headers(
+        Headers({"content-length": "1", "content-range": "bytes 0-0/1024", "etag": '"abc"'})
+    )
+
+    assert metadata.content_length == 1024
+    assert metadata.etag == '"abc"'
+
+
+def test_diff_unchanged():
+    """所有字段一致时无变化"""
+    stored = RemoteMetadata.from_headers(Headers(qq_headers))
+    probed = RemoteMetadata.from_headers(Headers(qq_headers))
+
+    assert stored.diff(probed) == []
+
+
+def test_diff_changed_or_missing():
+    """字段变化或缺失都视为变化"""
+    stored = RemoteMetadata.from_headers(Headers(qq_headers))
+    probed = RemoteMetadata.from_headers(
+        Headers({**qq_headers, "x-cos-hash-crc64ecma": "987654321", "etag": ""})
+    )
+
+    assert stored.diff(probed) == ["etag", "x-cos-hash-crc64ecma"]
+
+
+def test_diff_without_validators():
+    """没有任何校验字段时无法判断"""
+    stored = RemoteMetadata(content_length=1024)
+
+    assert stored.diff(RemoteMetadata(content_length=1024)) == ["validator"]
@@ -0,0 +1,70 @@
+from utils.artifact_metadata import RemoteMetadata
+from utils.checksum_ledger import ChecksumLedger
+
+URL = "https://example.com/QQ_3.2.23_260108_amd64_01.deb"
+
+
+def test_lookup_requires_matching_size_and_validator(tmp_path):
+    """大小和校验字段都一致才命中，重新加载后仍然有效"""
+    path = tmp_path / "checksum-ledger.json"
+    ledger = ChecksumLedger(path, run_id="gh-1")
+    metadata = RemoteMetadata(content_length=100, etag='"v1"')
+    ledger.record(URL, metadata, "aa11")
+    ledger.save()
+
+    reloaded = ChecksumLedger(path, run_id="gh-2")
+    entry = reloaded.lookup(URL, metadata)
+    assert entry is not None
+    assert (entry.sha512, entry.run) == ("aa11", "gh-1")
+    assert reloaded.lookup(URL, RemoteMetadata(content_length=101, etag='"v1"')) is None
+    assert reloaded.lookup(URL, RemoteMetadata(content_length=100, etag='"v2"')) is None
+    # 每个 URL 占一行
+    assert len(path.read_text(encoding="utf-8").splitlines()) == 3
+
+
+def test_record_keeps_run_when_unchanged(tmp_path):
+    """重复验证同一文件时不改写运行标识，也不写入文件"""
+    path = tmp_path / "checksum-ledger.json"
+    metadata = RemoteMetadata(content_length=100, last_modified="Mon, 01 Jan 2024")
+    first = ChecksumLedger(path, run_id="gh-1")
+    first.record(URL, metadata, "aa11")
+    first.save()
+    mtime = path.stat().st_mtime_ns
+
+    second = ChecksumLedger(path, run_id="gh-2")
+    second.record(URL, metadata, "aa11")
+    second.save()
+    assert path.stat().st_mtime_ns == mtime
+
+    second.record(URL, metadata, "bb22")
+    assert second.get(URL).run == "gh-2"
+
+
+def test_record_skips_metadata_without_validator(tmp_path):
+    """缺少校验字段的文件无法比对，不记录"""
+    ledger = ChecksumLedger(tmp_path / "checksum-ledger.json", run_id="gh-1")
+    ledger.record(URL, RemoteMetadata(content_length=100, etag='W/"weak"'), "aa11")
+    assert ledger.get(URL) is None
+
+
+def test_ledger_keeps_latest_url_per_package_arch(tmp_path):
+    """同一包同一架构只保留最新 URL；已删除的包的条目在清理时移除"""
+    path = tmp_path / "checksum-ledger.json"
+    metadata = RemoteMetadata(content_length=100, etag='"v1"')
+    new_url = "https://example.com/QQ_3.2.24_260201_amd64_01.deb"
+    arm_url = URL.replace("amd64", "arm64")
+    removed_url = "https://example.com/old.AppImage"
+    ledger = ChecksumLedger(path, run_id="gh-1")
+    ledger.record(URL, metadata, "aa11", package="qq", arch="x86_64")
+    ledger.record(arm_url, metadata, "bb22", package="qq", arch="aarch64")
+    ledger.record(removed_url, metadata, "cc33", package="old", arch="x86_64")
+
+    ledger.record(new_url, metadata, "dd44", package="qq", arch="x86_64")
+    ledger.prune({"qq"})
+    ledger.save()
+
+    reloaded = ChecksumLedger(path, run_id="gh-2")
+    assert reloaded.get(URL) is None
+    assert reloaded.get(new_url) is not None
+    assert reloaded.get(arm_url) is not None
+    assert reloaded.get(removed_url) is None
@@ -0,0 +1,123 @@
+import asyncio
+import hashlib
+
+import pytest
+from httpx import AsyncClient, MockTransport, ReadError, Request, Response
+
+from utils.downloader import Downloader
+
+payload = bytes(range(256)) * 4096
+
+
+def handler(request: Request) -> Response:
+    return Response(200, content=payload, headers={"etag": '"v1"'})
+
+
+@pytest.mark.asyncio
+async def test_download_file_computes_digests(tmp_path):
+    """下载过程中同时计算 SHA512"""
+    async with AsyncClient(transport=MockTransport(handler)) as client:
+        downloader = Downloader(client, show_progress=False)
+        result = await downloader.download_file(
+            "https://example.com/qq.deb", tmp_path / "qq.deb", arch="x86_64"
+        )
+
+    assert result.success
+    assert result.downloaded_size == len(payload)
+    assert result.digests["sha512"] == hashlib.sha512(payload).hexdigest()
+    assert (tmp_path / "qq.deb").read_bytes() == payload
+    assert result.metadata is not None and result.metadata.etag == '"v1"'
+
+
+@pytest.mark.asyncio
+async def test_download_file_resumes_with_range(tmp_path):
+    """连接中断后使用 Range + If-Range 只下载缺失部分，哈希保持正确"""
+    half = len(payload) // 2
+    requests: list[Request] = []
+
+    async def broken_stream():
+        yield payload[:half]
+        raise ReadError("connection reset")
+
+    def flaky_handler(request: Request) -> Response:
+        requests.append(request)
+        if len(requests) == 1:
+            return Response(200, content=broken_stream(), headers={"etag": '"v1"'})
+        assert request.headers["range"] == f"bytes={half}-"
+        assert request.headers["if-range"] == '"v1"'
+        return Response(
+            206,
+            content=payload[half:],
+            headers={
+                "etag": '"v1"',
+                "content-range": f"bytes {half}-{len(payload) - 1}/{len(payload)}",
+            },
+        )
+
+    async with AsyncClient(transport=MockTransport(flaky_handler)) as client:
+        downloader = Downloader(client, show_progress=False, base_delay=0)
+        result = await downloader.download_file(
+            "https://example.com/qq.deb", tmp_path / "qq.deb", arch="x86_64"
+        )
+
+    assert result.success and result.retry_count == 1
+    assert result.resumed_from == half
+    assert result.digests["sha512"] == hashlib.sha512(payload).hexdigest()
+    assert (tmp_path / "qq.deb").read_bytes() == payload
+    assert not (tmp_path / "qq.deb.part").exists()
+
+
+def ranged_handler(request: Request) -> Response:
+    """支持 HEAD 和 Range 的服务器"""
+    headers = {"etag": '"v1"', "accept-ranges": "bytes"}
+    if request.method == "HEAD":
+        return Response(200, headers={**headers, "content-length": str(len(payload))})
+    start, end = request.headers["range"].removeprefix("bytes=").split("-")
+    body = payload[int(start) : int(end) + 1]
+    headers["content-range"] = f"bytes {start}-{end}/{len(payload)}"
+    return Response(206, content=body, headers=headers)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("handler", [ranged_handler, handler])
+async def test_download_file_segmented(tmp_path, handler):
+    """分段并行下载结果正确；服务器不支持范围请求时回退为单连接下载"""
+    async with AsyncClient(transport=MockTransport(handler)) as client:
+        downloader = Downloader(
+            client, show_progress=False, segments=4, segment_threshold=1024
+        )
+        result = await downloader.download_file(
+            "https://example.com/navicat.AppImage", tmp_path / "navicat.AppImage"
+        )
+
+    assert result.success
+    assert result.digests["sha512"] == hashlib.sha512(payload).hexdigest()
+    assert (tmp_path / "navicat.AppImage").read_bytes() == payload
+
+
+@pytest.mark.asyncio
+async def test_concurrent_downloads_of_same_url_share_transfer(tmp_path):
+    """多个包同时下载同一 URL 时只传输一次"""
+    requests: list[Request] = []
+
+    def counting_handler(request: Request) -> Response:
+        requests.append(request)
+        return handler(request)
+
+    async with AsyncClient(transport=MockTransport(counting_handler)) as client:
+        downloader = Downloader(client, show_progress=False)
+        first, second = await asyncio.gather(
+            downloader.download_file(
+                "https://example.com/qq.deb", tmp_path / "qq_1_x86_64.deb", arch="x86_64"
+            ),
+            downloader.download_file(
+                "https://example.com/qq.deb", tmp_path / "qq-beta_1_x86_64.deb"
+            ),
+        )
+
+    assert len(requests) == 1
+    assert first.success and second.success
+    assert second.file_path == tmp_path / "qq-beta_1_x86_64.deb"
+    assert second.file_path.read_bytes() == payload
+    assert second.digests == first.digests
+    assert second.downloaded_size - second.resumed_from == 0
@@ -0,0 +1,47 @@
+import hashlib
+
+import pytest
+
+from utils.hash import (
+    calculate_file_hash,
+    calculate_file_hash_async,
+    calculate_hashes,
+    calculate_multiple_hashes_async,
+)
+
+data = bytes(range(256)) * 5000
+
+
+def test_calculate_hashes_single_pass(tmp_path):
+    """单次读取同时得到多种摘要，读取块大小不影响结果"""
+    file_path = tmp_path / "sample.bin"
+    file_path.write_bytes(data)
+
+    result = calculate_hashes(file_path, ["sha256", "sha512"], read_size=4000)
+
+    assert result == {
+        "sha256": hashlib.sha256(data).hexdigest(),
+        "sha512": hashlib.sha512(data).hexdigest(),
+    }
+
+
+@pytest.mark.asyncio
+async def test_async_hashes_pass_read_size(tmp_path):
+    """异步接口将 read_size 传给线程池中的计算"""
+    file_path = tmp_path / "sample.bin"
+    file_path.write_bytes(data)
+
+    digest = await calculate_file_hash_async(file_path, "sha256", read_size=4000)
+    digests = await calculate_multiple_hashes_async(file_path, read_size=4000)
+
+    assert digest == hashlib.sha256(data).hexdigest()
+    assert digests["sha512"] == hashlib.sha512(data).hexdigest()
+
+
+def test_calculate_file_hash_unsupported_algorithm(tmp_path):
+    """不支持的算法抛出 ValueError"""
+    file_path = tmp_path / "sample.bin"
+    file_path.write_bytes(data)
+
+    with pytest.raises(ValueError):
+        calculate_file_hash(file_path, "md5")
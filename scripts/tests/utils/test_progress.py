@@ -0,0 +1,76 @@
+import io
+
+import pytest
+from httpx import AsyncClient, MockTransport, Request, Response
+
+from constants.constants import ProgressModeEnum
+from utils.downloader import Downloader
+from utils.progress import LogProgress, ThrottledCounter
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_throttled_counter_aggregates_chunks():
+    """间隔内的数据块累计后一次上报，flush 上报剩余部分"""
+    clock = FakeClock()
+    reports: list[int] = []
+    counter = ThrottledCounter(reports.append, 0.1, clock=clock)
+
+    for _ in range(100):
+        counter.add(8192)
+    clock.now = 0.1
+    counter.add(8192)
+    counter.add(8192)
+    counter.flush()
+
+    assert reports == [101 * 8192, 8192]
+
+
+def test_log_progress_reports_interval_speed_and_completion():
+    """每隔 interval 输出一行区间速度，完成时输出平均速度"""
+    clock = FakeClock()
+    output = io.StringIO()
+    progress = LogProgress(output, interval=5.0, clock=clock)
+    task_id = progress.add_task("[qq] x86_64")
+    progress.update(task_id, total=100 * 1024**2, completed=0)
+
+    clock.now = 1.0
+    progress.update(task_id, advance=10 * 1024**2)
+    clock.now = 5.0
+    progress.update(task_id, advance=40 * 1024**2)
+    clock.now = 10.0
+    progress.update(task_id, advance=50 * 1024**2)
+    progress.update(task_id, advance=0)
+
+    assert output.getvalue().splitlines() == [
+        "    [qq] x86_64: 50.0 MB / 100.0 MB (50.0%)，10.0 MB/s",
+        "    [qq] x86_64: 下载完成 100.0 MB，用时 10.0 秒，平均 10.0 MB/s",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_download_all_log_mode(tmp_path, capsys):
+    """log 模式下不创建 Rich 进度条，输出下载完成的日志行"""
+    payload = b"x" * (1024 * 1024)
+
+    def handler(request: Request) -> Response:
+        return Response(200, content=payload, headers={"etag": '"v1"'})
+
+    async with AsyncClient(transport=MockTransport(handler)) as client:
+        downloader = Downloader(
+            client, progress_mode=ProgressModeEnum.LOG, chunk_size=1024
+        )
+        results = await downloader.download_all(
+            {"x86_64": ("https://example.com/qq.deb", tmp_path / "qq.deb")}, "qq"
+        )
+
+    assert results["x86_64"].success
+    lines = capsys.readouterr().out.splitlines()
+    assert len(lines) == 1
+    assert lines[0].startswith("    [qq] x86_64: 下载完成 1.0 MB")
@@ -0,0 +1,41 @@
+import asyncio
+
+import pytest
+
+from utils.single_flight import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_result():
+    """同一键的并发调用只执行一次，完成后再次调用会重新执行"""
+    flight: SingleFlight[str, int] = SingleFlight()
+    calls = 0
+
+    async def work() -> int:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return calls
+
+    results = await asyncio.gather(*(flight.do("url", work) for _ in range(3)))
+    assert calls == 1
+    assert [value for value, _ in results] == [1, 1, 1]
+    assert [shared for _, shared in results] == [False, True, True]
+    assert "url" not in flight
+
+    assert await flight.do("url", work) == (2, False)
+
+
+@pytest.mark.asyncio
+async def test_exception_propagates_to_all_callers():
+    """调用失败时所有等待者都收到异常"""
+    flight: SingleFlight[str, int] = SingleFlight()
+
+    async def fail() -> int:
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    results = await asyncio.gather(
+        flight.do("url", fail), flight.do("url", fail), return_exceptions=True
+    )
+    assert all(isinstance(result, ValueError) for result in results)
@@ -0,0 +1,198 @@
+import asyncio
+import hashlib
+import json
+
+import pytest
+from httpx import AsyncClient, MockTransport, ReadError, Request, Response
+
+from utils.downloader import Downloader
+from utils.write_buffer import AdaptiveChunkSize, WriteBuffer
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_adaptive_chunk_size_follows_throughput():
+    """快速链路上块大小逐步加倍到上限，变慢后逐步减半到下限"""
+    clock = FakeClock()
+    chunk_size = AdaptiveChunkSize(64 * 1024, 1024 * 1024, clock=clock)
+
+    for _ in range(10):
+        clock.now += 0.001
+        chunk_size.observe(chunk_size.size)
+    assert chunk_size.size == 1024 * 1024
+
+    for _ in range(10):
+        clock.now += 1.0
+        chunk_size.observe(chunk_size.size)
+    assert chunk_size.size == 64 * 1024
+
+
+def test_write_buffer_coalesces_small_chunks():
+    """小数据块攒满块大小后才交给 sink，flush 交出剩余部分"""
+    blocks: list[bytes] = []
+    clock = FakeClock()
+    buffer = WriteBuffer(
+        lambda block: blocks.append(bytes(block)),
+        AdaptiveChunkSize(1024, 1024, clock=clock),
+    )
+    data = bytes(range(256)) * 10
+
+    for start in range(0, len(data), 100):
+        buffer.write(data[start : start + 100])
+    buffer.flush()
+
+    assert [len(block) for block in blocks] == [1024, 1024, 512]
+    assert b"".join(blocks) == data
+
+
+@pytest.mark.asyncio
+async def test_interrupted_download_truncates_preallocated_part(tmp_path):
+    """预分配的 .part 文件在下载中断后截断到已写入的位置，可从该位置续传"""
+    payload = bytes(range(256)) * 4096
+    half = len(payload) // 2
+
+    async def broken_stream():
+        yield payload[:half]
+        raise ReadError("connection reset")
+
+    def handler(request: Request) -> Response:
+        return Response(
+            200,
+            content=broken_stream(),
+            headers={"etag": '"v1"', "content-length": str(len(payload))},
+        )
+
+    async with AsyncClient(transport=MockTransport(handler)) as client:
+        downloader = Downloader(client, show_progress=False, max_retries=0)
+        result = await downloader.download_file(
+            "https://example.com/qq.deb", tmp_path / "qq.deb", arch="x86_64"
+        )
+
+    assert not result.success
+    part_path = tmp_path / "qq.deb.part"
+    assert part_path.read_bytes() == payload[:half]
+
+
+@pytest.mark.asyncio
+async def test_resume_after_killed_run_with_preallocation(tmp_path, monkeypatch):
+    """进程被强制结束时 .part 文件保持预分配的大小，下次运行按记录的字节数截断后续传"""
+    monkeypatch.setattr("utils.downloader.PROGRESS_SAVE_INTERVAL", 0)
+    payload = bytes(range(256)) * 4096
+    half = len(payload) // 2
+    received_half = asyncio.Event()
+    release = asyncio.Event()
+    requests: list[Request] = []
+
+    async def stalled_stream():
+        yield payload[:half]
+        received_half.set()
+        await release.wait()
+        raise ReadError("connection reset")
+
+    def handler(request: Request) -> Response:
+        requests.append(request)
+        if len(requests) == 1:
+            return Response(
+                200,
+                content=stalled_stream(),
+                headers={"etag": '"v1"', "content-length": str(len(payload))},
+            )
+        start = int(request.headers["range"].removeprefix("bytes=").rstrip("-"))
+        return Response(
+            206,
+            content=payload[start:],
+            headers={
+                "etag": '"v1"',
+                "content-range": f"bytes {start}-{len(payload) - 1}/{len(payload)}",
+            },
+        )
+
+    file_path = tmp_path / "qq.deb"
+    part_path = tmp_path / "qq.deb.part"
+    state_path = tmp_path / "qq.deb.part.json"
+    async with AsyncClient(transport=MockTransport(handler)) as client:
+        task = asyncio.create_task(
+            Downloader(client, show_progress=False, max_retries=0).download_file(
+                "https://example.com/qq.deb", file_path
+            )
+        )
+        await received_half.wait()
+        # 模拟进程在此时被强制结束：保留此刻的 .part 文件和状态
+        killed_part = part_path.read_bytes()
+        killed_state = state_path.read_text(encoding="utf-8")
+        release.set()
+        assert not (await task).success
+        part_path.write_bytes(killed_part)
+        state_path.write_text(killed_state, encoding="utf-8")
+
+        written = json.loads(killed_state)["offset"]
+        assert 0 < written <= half and len(killed_part) == len(payload)
+
+        result = await Downloader(client, show_progress=False).download_file(
+            "https://example.com/qq.deb", file_path
+        )
+
+    assert result.success and result.resumed_from == written
+    assert requests[-1].headers["range"] == f"bytes={written}-"
+    assert file_path.read_bytes() == payload
+    assert result.digests["sha512"] == hashlib.sha512(payload).hexdigest()
+
+
+@pytest.mark.asyncio
+async def test_killed_before_first_progress_save_restarts_from_zero(tmp_path):
+    """首次保存进度前被强制结束时，预分配的空白区域不会被当作已下载的数据"""
+    payload = bytes(range(256)) * 4096
+    half = len(payload) // 2
+    received_half = asyncio.Event()
+    release = asyncio.Event()
+    requests: list[Request] = []
+
+    async def stalled_stream():
+        yield payload[:half]
+        received_half.set()
+        await release.wait()
+        raise ReadError("connection reset")
+
+    def handler(request: Request) -> Response:
+        requests.append(request)
+        headers = {"etag": '"v1"', "content-length": str(len(payload))}
+        if len(requests) == 1:
+            return Response(200, content=stalled_stream(), headers=headers)
+        if "range" in request.headers:
+            return Response(416)
+        return Response(200, content=payload, headers=headers)
+
+    file_path = tmp_path / "qq.deb"
+    part_path = tmp_path / "qq.deb.part"
+    state_path = tmp_path / "qq.deb.part.json"
+    async with AsyncClient(transport=MockTransport(handler)) as client:
+        task = asyncio.create_task(
+            Downloader(client, show_progress=False, max_retries=0).download_file(
+                "https://example.com/qq.deb", file_path
+            )
+        )
+        await received_half.wait()
+        killed_part = part_path.read_bytes()
+        killed_state = state_path.read_text(encoding="utf-8")
+        release.set()
+        assert not (await task).success
+        part_path.write_bytes(killed_part)
+        state_path.write_text(killed_state, encoding="utf-8")
+
+        assert json.loads(killed_state)["offset"] == 0
+        assert len(killed_part) == len(payload)
+
+        result = await Downloader(
+            client, show_progress=False, max_retries=0
+        ).download_file("https://example.com/qq.deb", file_path)
+
+    assert result.success and result.resumed_from == 0
+    assert "range" not in requests[-1].headers
+    assert file_path.read_bytes() == payload
+    assert result.digests["sha512"] == hashlib.sha512(payload).hexdigest()
@@ -1,66 +1,252 @@
 """PKGBUILD 文件编辑器模块"""
 
 import re
+import shlex
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Union
 
 from constants.constants import HashAlgorithmEnum
 from utils.hash import calculate_file_hash, verify_file_hash
 
+# 行首的变量赋值（name=...）
+_ASSIGNMENT_PATTERN = re.compile(r"^([A-Za-z_][A-Za-z0-9_]*)=", re.MULTILINE)
+
+
+@dataclass(frozen=True)
+class Assignment:
+    """PKGBUILD 中的一处变量赋值"""
+
+    name: str
+    # 赋值语句在文件中的字符区间 [start, end)，不含行尾换行符
+    start: int
+    end: int
+    # 等号之后的原始文本（数组包含括号）
+    value: str
+    is_array: bool
+
+    @property
+    def items(self) -> list[str]:
+        """数组元素（已去除引号）；标量返回单个元素"""
+        if not self.is_array:
+            return [self.value]
+        try:
+            return shlex.split(self.value[1:-1], comments=True)
+        except ValueError:
+            return []
+
+
+def _find_array_end(content: str, pos: int) -> int:
+    """
+    查找数组赋值的结束位置
+
+    Args:
+        content: 文件内容
+        pos: 左括号的位置
+
+    Returns:
+        匹配的右括号之后的位置；找不到时返回行尾
+    """
+    depth = 0
+    quote: str | None = None
+    index = pos
+    length = len(content)
+    while index < length:
+        char = content[index]
+        if quote:
+            if char == "\\" and quote == '"':
+                index += 1
+            elif char == quote:
+                quote = None
+        elif char == "\\":
+            index += 1
+        elif char in ("'", '"'):
+            quote = char
+        elif char == "#" and (index == pos or content[index - 1] in " \t\n"):
+            # 注释直到行尾
+            newline = content.find("\n", index)
+            index = length if newline == -1 else newline
+            continue
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+            if depth == 0:
+                return index + 1
+        index += 1
+
+    newline = content.find("\n", pos)
+    return length if newline == -1 else newline
+
+
+def index_assignments(content: str) -> dict[str, list[Assignment]]:
+    """
+    单次扫描 PKGBUILD 内容，建立变量赋值索引
+
+    支持标量（到行尾）和数组（包括跨多行的数组），同名变量按出现顺序保存
+    """
+    index: dict[str, list[Assignment]] = {}
+    scanned_to = 0
+    for matched in _ASSIGNMENT_PATTERN.finditer(content):
+        start = matched.start()
+        if start < scanned_to:
+            # 位于上一个多行数组内部
+            continue
+
+        value_start = matched.end()
+        is_array = content.startswith("(", value_start)
+        if is_array:
+            end = _find_array_end(content, value_start)
+        else:
+            newline = content.find("\n", value_start)
+            end = len(content) if newline == -1 else newline
+
+        index.setdefault(matched.group(1), []).append(
+            Assignment(
+                name=matched.group(1),
+                start=start,
+                end=end,
+                value=content[value_start:end],
+                is_array=is_array,
+            )
+        )
+        scanned_to = end
+    return index
+
 
 class PKGBUILDEditor:
-    """PKGBUILD 文件编辑器"""
+    """
+    PKGBUILD 文件编辑器
+
+    加载时扫描一次文件建立赋值索引，读取字段为 O(1) 查找；
+    所有修改先记录为待应用的编辑，读取 content 或保存时一次性拼接生成新内容。
+    """
 
     def __init__(self, pkgbuild_path: Path) -> None:
         self.pkgbuild_path = pkgbuild_path
-        self.content = ""
+        self._original = ""
+        self._index: dict[str, list[Assignment]] = {}
+        # 待应用的修改：{变量名: 新的赋值值}
+        self._edits: dict[str, str] = {}
+        # 待插入的新赋值：{插入位置之前的变量名: [赋值语句]}
+        self._insertions: dict[str, list[str]] = {}
+        self._rendered: str | None = None
         self._load_content()
 
+    @property
+    def content(self) -> str:
+        """应用所有待定修改后的文件内容"""
+        if self._rendered is None:
+            self._rendered = self._render()
+        return self._rendered
+
+    @content.setter
+    def content(self, value: str) -> None:
+        self._set_base_content(value)
+
+    def _set_base_content(self, content: str) -> None:
+        """设置基准内容并重建索引，清空待定修改"""
+        self._original = content
+        self._index = index_assignments(content)
+        self._edits.clear()
+        self._insertions.clear()
+        self._rendered = None
+
     def _load_content(self) -> None:
         """加载 PKGBUILD 文件内容"""
         with open(self.pkgbuild_path, "r", encoding="utf-8") as f:
-            self.content = f.read()
+            self._set_base_content(f.read())
 
     def _save_content(self) -> None:
         """保存 PKGBUILD 文件内容"""
         with open(self.pkgbuild_path, "w", encoding="utf-8") as f:
             f.write(self.content)
 
+    def _render(self) -> str:
+        """按文件顺序一次性拼接所有修改"""
+        if not self._edits and not self._insertions:
+            return self._original
+
+        assignments = sorted(
+            (
+                assignment
+                for name, assignments in self._index.items()
+                if name in self._edits or name in self._insertions
+                for assignment in assignments
+            ),
+            key=lambda assignment: assignment.start,
+        )
+
+        parts: list[str] = []
+        cursor = 0
+        inserted: set[str] = set()
+        for assignment in assignments:
+            parts.append(self._original[cursor : assignment.start])
+            if assignment.name in self._insertions and assignment.name not in inserted:
+                parts.extend(f"{line}\n" for line in self._insertions[assignment.name])
+                inserted.add(assignment.name)
+            if assignment.name in self._edits:
+                parts.append(f"{assignment.name}={self._edits[assignment.name]}")
+            else:
+                parts.append(self._original[assignment.start : assignment.end])
+            cursor = assignment.end
+        parts.append(self._original[cursor:])
+        return "".join(parts)
+
+    def _get(self, name: str) -> Assignment | None:
+        """获取变量的当前赋值（包含待定修改）"""
+        if name in self._edits:
+            value = self._edits[name]
+            return Assignment(
+                name=name, start=-1, end=-1, value=value, is_array=value.startswith("(")
+            )
+        for lines in self._insertions.values():
+            for line in lines:
+                if line.startswith(f"{name}="):
+                    value = line[len(name) + 1 :]
+                    return Assignment(
+                        name=name,
+                        start=-1,
+                        end=-1,
+                        value=value,
+                        is_array=value.startswith("("),
+                    )
+        assignments = self._index.get(name)
+        return assignments[0] if assignments else None
+
+    def _set(self, name: str, value: str) -> None:
+        """修改已存在的变量（不存在时忽略）"""
+        if name not in self._index:
+            return
+        self._edits[name] = value
+        self._rendered = None
+
+    def _set_array(self, name: str, item: str) -> None:
+        """将已存在的数组变量修改为单元素数组"""
+        self._set(name, f"('{item}')")
+
     def update_pkgver(self, new_version: str) -> None:
         """更新 pkgver 字段"""
-        pattern = r"^pkgver=.*$"
-        replacement = f"pkgver={new_version}"
-        self.content = re.sub(pattern, replacement, self.content, flags=re.MULTILINE)
+        self._set("pkgver", new_version)
 
     def update_pkgrel(self, new_pkgrel: int = 1) -> None:
         """更新 pkgrel 字段"""
-        pattern = r"^pkgrel=.*$"
-        replacement = f"pkgrel={new_pkgrel}"
-        self.content = re.sub(pattern, replacement, self.content, flags=re.MULTILINE)
+        self._set("pkgrel", str(new_pkgrel))
 
     def update_epoch(self, new_epoch: int | None = None) -> None:
         """更新或添加 epoch 字段"""
         if new_epoch is None:
             return
 
-        if re.search(r"^epoch=.*$", self.content, flags=re.MULTILINE):
-            pattern = r"^epoch=.*$"
-            replacement = f"epoch={new_epoch}"
-            self.content = re.sub(
-                pattern, replacement, self.content, flags=re.MULTILINE
-            )
-        else:
-            pattern = r"^(pkgver=.*)$"
-            replacement = f"epoch={new_epoch}\n\1"
-            self.content = re.sub(
-                pattern, replacement, self.content, flags=re.MULTILINE
-            )
+        if "epoch" in self._index:
+            self._set("epoch", str(new_epoch))
+        elif "pkgver" in self._index:
+            self._insertions["pkgver"] = [f"epoch={new_epoch}"]
+            self._rendered = None
 
     def update_sha512sums(self, new_checksum: str) -> None:
         """更新通用 sha512sums 字段"""
-        pattern = r"^sha512sums=\(.*\)$"
-        replacement = f"sha512sums=('{new_checksum}')"
-        self.content = re.sub(pattern, replacement, self.content, flags=re.MULTILINE)
+        self._set_array(f"{HashAlgorithmEnum.SHA512.value}sums", new_checksum)
 
     def update_arch_checksum(
         self,
@@ -69,40 +255,38 @@ class PKGBUILDEditor:
         hash_algorithm: str = HashAlgorithmEnum.SHA512.value,
     ) -> None:
         """更新特定架构的校验和字段"""
-        pattern = f"^{hash_algorithm}sums_{arch}=\\(.*\\)$"
-        replacement = f"{hash_algorithm}sums_{arch}=('{new_checksum}')"
-        self.content = re.sub(pattern, replacement, self.content, flags=re.MULTILINE)
+        self._set_array(f"{hash_algorithm}sums_{arch}", new_checksum)
 
     def update_source_url(self, arch: str, new_url: str) -> None:
         """更新特定架构的 source URL"""
-        pattern = f"^source_{arch}=\\(.*\\)$"
-        replacement = f"source_{arch}=('{new_url}')"
-        self.content = re.sub(pattern, replacement, self.content, flags=re.MULTILINE)
+        self._set_array(f"source_{arch}", new_url)
 
     def get_pkgver(self) -> str:
         """获取当前 pkgver 值"""
-        match = re.search(r"^pkgver=(.*)$", self.content, flags=re.MULTILINE)
-        return match.group(1) if match else ""
+        assignment = self._get("pkgver")
+        return assignment.value if assignment else ""
 
     def get_pkgrel(self) -> int:
         """获取当前 pkgrel 值"""
-        match = re.search(r"^pkgrel=(.*)$", self.content, flags=re.MULTILINE)
-        return int(match.group(1)) if match else 1
+        assignment = self._get("pkgrel")
+        return int(assignment.value) if assignment else 1
 
     def get_epoch(self) -> int | None:
         """获取当前 epoch 值"""
-        match = re.search(r"^epoch=(.*)$", self.content, flags=re.MULTILINE)
-        return int(match.group(1)) if match else None
+        assignment = self._get("epoch")
+        return int(assignment.value) if assignment else None
 
     def get_checksum(self, arch: str | None = None) -> str:
-        """获取当前校验和值"""
+        """获取当前校验和值（数组的第一个元素）"""
+        name = f"{HashAlgorithmEnum.SHA512.value}sums"
         if arch:
-            pattern = f"^sha512sums_{arch}=\\('(.*)'\\)$"
-        else:
-            pattern = r"^sha512sums=\(\'(.*)\'\)$"
+            name = f"{name}_{arch}"
 
-        match = re.search(pattern, self.content, flags=re.MULTILINE)
-        return match.group(1) if match else ""
+        assignment = self._get(name)
+        if assignment is None or not assignment.is_array:
+            return ""
+        items = assignment.items
+        return items[0] if items else ""
 
     def update_all(
         self,
@@ -122,14 +306,7 @@ class PKGBUILDEditor:
             self.update_epoch(new_epoch)
 
         if generic_checksum:
-            if hash_algorithm == HashAlgorithmEnum.SHA512.value:
-                self.update_sha512sums(generic_checksum)
-            else:
-                pattern = f"^{hash_algorithm}sums=\\(.*\\)$"
-                replacement = f"{hash_algorithm}sums=('{generic_checksum}')"
-                self.content = re.sub(
-                    pattern, replacement, self.content, flags=re.MULTILINE
-                )
+            self._set_array(f"{hash_algorithm}sums", generic_checksum)
 
         for arch, checksum in new_checksums.items():
             self.update_arch_checksum(arch, checksum, hash_algorithm)
@@ -137,9 +314,17 @@ class PKGBUILDEditor:
         for arch, url in new_urls.items():
             self.update_source_url(arch, url)
 
+    @property
+    def has_changes(self) -> bool:
+        """是否存在未保存的修改"""
+        return self.content != self._original
+
     def save(self) -> None:
-        """保存所有更改到文件"""
+        """保存所有更改到文件（内容未变化时不写入）"""
+        if not self.has_changes:
+            return
         self._save_content()
+        self._set_base_content(self.content)
 
     def reload(self) -> None:
         """重新加载文件内容，放弃未保存的更改"""
@@ -155,23 +340,9 @@ class PKGBUILDEditor:
         checksum = calculate_file_hash(file_path, hash_algorithm)
 
         if arch:
-            if hash_algorithm == HashAlgorithmEnum.SHA512.value:
-                self.update_arch_checksum(arch, checksum)
-            else:
-                pattern = f"^{hash_algorithm}sums_{arch}=\\(.*\\)$"
-                replacement = f"{hash_algorithm}sums_{arch}=('{checksum}')"
-                self.content = re.sub(
-                    pattern, replacement, self.content, flags=re.MULTILINE
-                )
+            self.update_arch_checksum(arch, checksum, hash_algorithm)
         else:
-            if hash_algorithm == HashAlgorithmEnum.SHA512.value:
-                self.update_sha512sums(checksum)
-            else:
-                pattern = f"^{hash_algorithm}sums=\\(.*\\)$"
-                replacement = f"{hash_algorithm}sums=('{checksum}')"
-                self.content = re.sub(
-                    pattern, replacement, self.content, flags=re.MULTILINE
-                )
+            self._set_array(f"{hash_algorithm}sums", checksum)
 
     def verify_existing_checksum(
         self,
@@ -0,0 +1,178 @@
+"""
+内容寻址的下载缓存模块
+
+缓存条目以 URL + 校验字段（强 ETag 或 Last-Modified）+ 文件大小为键，
+文件内容按 SHA512 存放于 objects/ 目录下，并按最近使用时间（LRU）在
+配置的容量上限内淘汰。存入和命中时都通过硬链接（不支持时复制）与下载目录中的文件共享内容。
+"""
+
+import json
+import os
+import shutil
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+from utils.artifact_metadata import RemoteMetadata
+
+INDEX_FILE = "index.json"
+OBJECTS_DIR = "objects"
+
+
+def link_or_copy(source: Path, destination: Path) -> None:
+    """将文件硬链接到目标路径，不支持硬链接时复制"""
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    destination.unlink(missing_ok=True)
+    try:
+        os.link(source, destination)
+    except OSError:
+        shutil.copyfile(source, destination)
+
+
+@dataclass
+class CacheEntry:
+    """缓存条目"""
+
+    url: str
+    validator: str
+    size: int
+    sha512: str
+    last_used: float
+
+
+def cache_key(url: str, metadata: RemoteMetadata | None) -> str | None:
+    """
+    生成缓存键
+
+    需要同时具备文件大小和 ETag / Last-Modified，否则无法判断缓存是否有效，返回 None
+    """
+    if metadata is None or metadata.content_length is None or not metadata.validator:
+        return None
+    return f"{url}\n{metadata.validator}\n{metadata.content_length}"
+
+
+class ArtifactCache:
+    """基于 SHA512 内容寻址、按 LRU 淘汰的下载缓存"""
+
+    def __init__(self, root: Path, max_bytes: int) -> None:
+        self.root = root
+        self.max_bytes = max_bytes
+        self._entries: dict[str, CacheEntry] | None = None
+
+    @property
+    def index_path(self) -> Path:
+        return self.root / INDEX_FILE
+
+    def object_path(self, sha512: str) -> Path:
+        """内容文件路径"""
+        return self.root / OBJECTS_DIR / sha512[:2] / sha512
+
+    def _load(self) -> dict[str, CacheEntry]:
+        """懒加载索引文件，文件损坏时视为空缓存"""
+        if self._entries is not None:
+            return self._entries
+
+        self._entries = {}
+        if self.index_path.exists():
+            try:
+                data: dict[str, dict[str, Any]] = json.loads(
+                    self.index_path.read_text(encoding="utf-8")
+                )
+                for key, entry in data.items():
+                    self._entries[key] = CacheEntry(**entry)
+            except (OSError, ValueError, TypeError) as e:
+                print(f"  警告: 读取下载缓存索引失败，已忽略: {e}")
+        return self._entries
+
+    def lookup(self, url: str, metadata: RemoteMetadata | None) -> CacheEntry | None:
+        """查找缓存，命中时更新最近使用时间"""
+        key = cache_key(url, metadata)
+        if key is None:
+            return None
+
+        entries = self._load()
+        entry = entries.get(key)
+        if entry is None:
+            return None
+
+        object_path = self.object_path(entry.sha512)
+        if not object_path.exists() or object_path.stat().st_size != entry.size:
+            # 内容文件丢失或不完整，移除失效条目
+            del entries[key]
+            return None
+
+        entry.last_used = time.time()
+        return entry
+
+    def restore(self, entry: CacheEntry, destination: Path) -> None:
+        """将缓存的文件放到下载路径（硬链接，不支持时复制）"""
+        link_or_copy(self.object_path(entry.sha512), destination)
+
+    def store(
+        self,
+        url: str,
+        metadata: RemoteMetadata | None,
+        file_path: Path,
+        sha512: str,
+    ) -> Path | None:
+        """
+        将已下载并校验的文件加入缓存（下载的文件保持原位）
+
+        Returns:
+            缓存中的文件路径；无法生成缓存键或文件超过容量上限时返回 None
+        """
+        key = cache_key(url, metadata)
+        if key is None:
+            return None
+
+        size = file_path.stat().st_size
+        if size > self.max_bytes:
+            return None
+
+        object_path = self.object_path(sha512)
+        if not object_path.exists():
+            link_or_copy(file_path, object_path)
+
+        self._load()[key] = CacheEntry(
+            url=url,
+            validator=key.split("\n")[1],
+            size=size,
+            sha512=sha512,
+            last_used=time.time(),
+        )
+        self._evict()
+        return object_path
+
+    def _evict(self) -> None:
+        """按最近使用时间淘汰条目，直到内容文件总大小不超过上限"""
+        entries = self._load()
+        # 同一内容可能被多个键引用，按内容文件统计大小和最近使用时间
+        objects: dict[str, tuple[int, float]] = {}
+        for entry in entries.values():
+            _, last_used = objects.get(entry.sha512, (entry.size, 0.0))
+            objects[entry.sha512] = (entry.size, max(last_used, entry.last_used))
+
+        total = sum(size for size, _ in objects.values())
+        for sha512, (size, _) in sorted(objects.items(), key=lambda item: item[1][1]):
+            if total <= self.max_bytes:
+                break
+            for key in [k for k, e in entries.items() if e.sha512 == sha512]:
+                del entries[key]
+            self.object_path(sha512).unlink(missing_ok=True)
+            total -= size
+
+    def save(self) -> None:
+        """原子地写入索引文件"""
+        entries = self._load()
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.index_path.with_suffix(".json.tmp")
+        tmp_path.write_text(
+            json.dumps(
+                {key: asdict(entry) for key, entry in entries.items()},
+                ensure_ascii=False,
+                indent=2,
+            ),
+            encoding="utf-8",
+        )
+        os.replace(tmp_path, self.index_path)
@@ -0,0 +1,173 @@
+"""
+远端文件元数据模块
+
+记录下载文件的 Content-Length、ETag、Last-Modified 以及 CDN 提供的内容哈希头，
+用于在不下载文件的情况下判断远端文件是否发生变化。
+"""
+
+import json
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from httpx import Headers
+
+# CDN / 对象存储返回的内容哈希响应头（小写）
+CONTENT_HASH_HEADERS: tuple[str, ...] = (
+    "x-cos-hash-crc64ecma",  # 腾讯云 COS
+    "x-oss-hash-crc64ecma",  # 阿里云 OSS
+    "x-goog-hash",  # Google Cloud Storage
+    "x-amz-checksum-sha256",  # Amazon S3
+    "content-md5",
+)
+
+
+def _total_length(headers: Headers) -> int | None:
+    """获取文件完整大小（范围请求时从 Content-Range 中解析）"""
+    content_range: str | None = headers.get("content-range")
+    if content_range and "/" in content_range:
+        total = content_range.rsplit("/", 1)[1].strip()
+        return int(total) if total.isdigit() else None
+
+    content_length: str | None = headers.get("content-length")
+    if content_length and content_length.isdigit():
+        return int(content_length)
+    return None
+
+
+@dataclass(frozen=True)
+class RemoteMetadata:
+    """远端文件元数据"""
+
+    content_length: int | None = None
+    etag: str | None = None
+    last_modified: str | None = None
+    content_hashes: dict[str, str] = field(default_factory=dict)
+
+    @classmethod
+    def from_headers(cls, headers: Headers) -> "RemoteMetadata":
+        """从响应头构建元数据"""
+        return cls(
+            content_length=_total_length(headers),
+            etag=headers.get("etag"),
+            last_modified=headers.get("last-modified"),
+            content_hashes={
+                name: headers[name] for name in CONTENT_HASH_HEADERS if name in headers
+            },
+        )
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "RemoteMetadata":
+        """从 JSON 数据构建元数据"""
+        return cls(
+            content_length=data.get("content_length"),
+            etag=data.get("etag"),
+            last_modified=data.get("last_modified"),
+            content_hashes=dict(data.get("content_hashes") or {}),
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        """转换为可序列化的字典"""
+        return {
+            "content_length": self.content_length,
+            "etag": self.etag,
+            "last_modified": self.last_modified,
+            "content_hashes": dict(self.content_hashes),
+        }
+
+    @property
+    def validator(self) -> str | None:
+        """可用于 If-Range 和缓存键的校验字段（强 ETag 优先，其次 Last-Modified）"""
+        if self.etag and not self.etag.startswith("W/"):
+            return self.etag
+        return self.last_modified
+
+    @property
+    def has_validator(self) -> bool:
+        """是否包含至少一个可用于比较的校验字段"""
+        return bool(self.etag or self.last_modified or self.content_hashes)
+
+    def diff(self, other: "RemoteMetadata") -> list[str]:
+        """
+        比较两份元数据，返回不一致（或缺失）的字段名
+
+        以 self 为基准：self 中存在的字段在 other 中缺失也视为变化；
+        两者都没有任何校验字段时无法判断，返回 ["validator"]。
+        """
+        if not self.has_validator or not other.has_validator:
+            return ["validator"]
+
+        changed: list[str] = []
+        if self.content_length is None or self.content_length != other.content_length:
+            changed.append("content-length")
+        if self.etag and self.etag != other.etag:
+            changed.append("etag")
+        if self.last_modified and self.last_modified != other.last_modified:
+            changed.append("last-modified")
+        for name, value in self.content_hashes.items():
+            if other.content_hashes.get(name) != value:
+                changed.append(name)
+        return changed
+
+
+@dataclass(frozen=True)
+class ArtifactRecord:
+    """已验证文件的元数据和校验和"""
+
+    metadata: RemoteMetadata
+    sha512: str
+
+
+class ArtifactMetadataStore:
+    """按 URL 持久化记录已验证文件的远端元数据和 SHA512"""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._records: dict[str, ArtifactRecord] | None = None
+
+    def _load(self) -> dict[str, ArtifactRecord]:
+        """懒加载记录文件，文件损坏时视为空"""
+        if self._records is not None:
+            return self._records
+
+        self._records = {}
+        if self.path.exists():
+            try:
+                data: dict[str, dict[str, Any]] = json.loads(
+                    self.path.read_text(encoding="utf-8")
+                )
+                for url, record in data.items():
+                    self._records[url] = ArtifactRecord(
+                        metadata=RemoteMetadata.from_dict(record["metadata"]),
+                        sha512=record["sha512"],
+                    )
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                print(f"  警告: 读取文件元数据记录失败，已忽略: {e}")
+        return self._records
+
+    def get(self, url: str) -> ArtifactRecord | None:
+        """获取 URL 的记录"""
+        return self._load().get(url)
+
+    def record(self, url: str, metadata: RemoteMetadata, sha512: str) -> None:
+        """记录 URL 的元数据和校验和（需调用 save 写入磁盘）"""
+        self._load()[url] = ArtifactRecord(metadata=metadata, sha512=sha512)
+
+    def save(self) -> None:
+        """原子地写入记录文件"""
+        records = self._load()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp_path.write_text(
+            json.dumps(
+                {
+                    url: {"metadata": record.metadata.to_dict(), "sha512": record.sha512}
+                    for url, record in records.items()
+                },
+                ensure_ascii=False,
+                indent=2,
+            ),
+            encoding="utf-8",
+        )
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,164 @@
+"""
+校验和账本模块
+
+账本随仓库提交（与 config.yaml 同目录），按 URL 记录已验证文件的大小、
+校验字段（强 ETag 或 Last-Modified）、SHA512 以及完成验证的运行标识。
+每个包的每个架构只保留最新 URL 的条目，已从配置中删除的包的条目在保存前清除，账本不会随版本无限增长。
+启用 trust_ledger 的包在 URL、大小和校验字段均与账本一致时直接使用记录的
+SHA512，无需传输文件内容。
+"""
+
+import json
+import os
+import time
+from collections.abc import Collection
+from dataclasses import asdict, dataclass, replace
+from pathlib import Path
+from typing import Any
+
+from utils.artifact_metadata import RemoteMetadata
+
+
+def current_run_id() -> str:
+    """当前运行的标识（GitHub Actions 中为 run id，本地运行为时间戳）"""
+    run_id = os.environ.get("GITHUB_RUN_ID")
+    if run_id:
+        return f"gh-{run_id}"
+    return time.strftime("local-%Y%m%dT%H%M%SZ", time.gmtime())
+
+
+@dataclass(frozen=True)
+class LedgerEntry:
+    """账本条目"""
+
+    size: int
+    validator: str
+    sha512: str
+    run: str
+    # 使用该 URL 的包和架构（旧版本的账本条目没有这两个字段）
+    package: str | None = None
+    arch: str | None = None
+
+    def matches(self, metadata: RemoteMetadata | None) -> bool:
+        """远端元数据的大小和校验字段是否与记录一致"""
+        return (
+            metadata is not None
+            and metadata.content_length == self.size
+            and metadata.validator == self.validator
+        )
+
+
+class ChecksumLedger:
+    """按 URL 记录已验证校验和的账本"""
+
+    def __init__(self, path: Path, run_id: str | None = None) -> None:
+        self.path = path
+        self.run_id = run_id or current_run_id()
+        self._entries: dict[str, LedgerEntry] | None = None
+        self._dirty = False
+
+    def _load(self) -> dict[str, LedgerEntry]:
+        """懒加载账本文件，文件损坏时视为空账本"""
+        if self._entries is not None:
+            return self._entries
+
+        self._entries = {}
+        if self.path.exists():
+            try:
+                data: dict[str, dict[str, Any]] = json.loads(
+                    self.path.read_text(encoding="utf-8")
+                )
+                for url, entry in data.items():
+                    self._entries[url] = LedgerEntry(**entry)
+            except (OSError, ValueError, TypeError) as e:
+                print(f"  警告: 读取校验和账本失败，已忽略: {e}")
+        return self._entries
+
+    def get(self, url: str) -> LedgerEntry | None:
+        """获取 URL 的账本条目"""
+        return self._load().get(url)
+
+    def lookup(self, url: str, metadata: RemoteMetadata | None) -> LedgerEntry | None:
+        """查找与远端元数据一致的账本条目"""
+        entry = self.get(url)
+        if entry is not None and entry.matches(metadata):
+            return entry
+        return None
+
+    def record(
+        self,
+        url: str,
+        metadata: RemoteMetadata | None,
+        sha512: str,
+        *,
+        package: str | None = None,
+        arch: str | None = None,
+    ) -> None:
+        """
+        记录已验证的校验和（需调用 save 写入磁盘）
+
+        缺少文件大小或校验字段时无法在之后比对，不记录；
+        与已有条目完全一致时保留原运行标识，避免账本无意义的变动。
+        指定包和架构时，删除该包该架构其他 URL（旧版本）的条目。
+        """
+        if metadata is None or metadata.content_length is None or not metadata.validator:
+            return
+
+        entries = self._load()
+        existing = entries.get(url)
+        if (
+            existing is not None
+            and existing.matches(metadata)
+            and existing.sha512 == sha512
+        ):
+            # 多个包共用同一 URL 时保留最初记录的包，避免每次运行来回改写
+            entry = replace(
+                existing,
+                package=existing.package or package,
+                arch=existing.arch or arch,
+            )
+        else:
+            entry = LedgerEntry(
+                size=metadata.content_length,
+                validator=metadata.validator,
+                sha512=sha512,
+                run=self.run_id,
+                package=package,
+                arch=arch,
+            )
+        if entry != existing:
+            entries[url] = entry
+            self._dirty = True
+
+        if package is not None and arch is not None:
+            for other_url, other in list(entries.items()):
+                if other_url != url and (other.package, other.arch) == (package, arch):
+                    del entries[other_url]
+                    self._dirty = True
+
+    def prune(self, packages: Collection[str]) -> None:
+        """删除已不在配置中的包的条目（需调用 save 写入磁盘）"""
+        entries = self._load()
+        for url, entry in list(entries.items()):
+            if entry.package is not None and entry.package not in packages:
+                del entries[url]
+                self._dirty = True
+
+    def save(self) -> None:
+        """原子地写入账本文件（无变化时不写入）"""
+        if not self._dirty:
+            return
+
+        entries = self._load()
+        # 每个 URL 一行并按 URL 排序，便于在提交中审阅差异
+        lines = [
+            f"  {json.dumps(url)}: {json.dumps(asdict(entry), ensure_ascii=False)}"
+            for url, entry in sorted(entries.items())
+        ]
+        content = "{\n" + ",\n".join(lines) + "\n}\n" if lines else "{}\n"
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp_path.write_text(content, encoding="utf-8")
+        os.replace(tmp_path, self.path)
+        self._dirty = False
@@ -1,13 +1,19 @@
 """异步文件下载器模块"""
 
 import asyncio
+import hashlib
+import json
+import os
 import time
-from collections.abc import Coroutine
-from dataclasses import dataclass
+from collections.abc import AsyncIterator, Callable, Coroutine
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field, replace
 from pathlib import Path
 from typing import Any
 
-from httpx import AsyncClient
+from httpx import AsyncClient, Headers
+from rich.console import Console
 from rich.progress import (
     BarColumn,
     DownloadColumn,
@@ -18,6 +24,21 @@ from rich.progress import (
     TransferSpeedColumn,
 )
 
+from constants.constants import HashAlgorithmEnum, ProgressModeEnum
+from utils.artifact_cache import link_or_copy
+from utils.artifact_metadata import RemoteMetadata
+from utils.hash import calculate_multiple_hashes_async
+from utils.output import is_grouping, real_stdout, set_live_console
+from utils.progress import LogProgress, ThrottledCounter
+from utils.single_flight import SingleFlight
+from utils.write_buffer import AdaptiveChunkSize, WriteBuffer, preallocate
+
+# 恢复 .part 文件时重建哈希的读取块大小
+RESUME_READ_SIZE = 1024 * 1024
+
+# 预分配的 .part 文件记录已写入字节数的最小间隔（秒）
+PROGRESS_SAVE_INTERVAL = 1.0
+
 
 @dataclass(frozen=True)
 class DownloadResult:
@@ -30,6 +51,121 @@ class DownloadResult:
     retry_count: int = 0
     download_time: float = 0.0
     downloaded_size: int = 0
+    metadata: RemoteMetadata | None = None
+    # 下载过程中计算的摘要 {算法: 十六进制摘要}
+    digests: dict[str, str] = field(default_factory=dict)
+    # 断点续传时已有数据的字节数（0 表示从头下载）
+    resumed_from: int = 0
+
+
+class _RangeNotSupportedError(Exception):
+    """服务器未按请求返回指定字节范围"""
+
+
+class _PartialDownload:
+    """
+    未完成下载的状态
+
+    .part 文件保存已下载的数据，.part.json 记录来源 URL 和校验字段，
+    哈希对象与已写入的字节数始终保持一致，续传时无需重新计算。
+    .part 文件预分配后大小不再等于已写入的数据量，.part.json 同时记录已写入的字节数，
+    进程被强制结束时，下次运行据此截掉预分配的空间。
+    """
+
+    def __init__(self, file_path: Path, url: str, hash_algorithms: tuple[str, ...]) -> None:
+        self.file_path = file_path
+        self.url = url
+        self.hash_algorithms = hash_algorithms
+        self.part_path = file_path.with_name(file_path.name + ".part")
+        self.state_path = file_path.with_name(file_path.name + ".part.json")
+        self.validator: str | None = None
+        self.offset: int = 0
+        self.hashers: dict[str, hashlib._Hash] = {}
+        self.reset()
+
+    def reset(self) -> None:
+        """丢弃已有数据，从头开始"""
+        self.offset = 0
+        self.validator = None
+        self.hashers = {
+            algorithm: hashlib.new(algorithm) for algorithm in self.hash_algorithms
+        }
+
+    def restore(self) -> None:
+        """从上次运行遗留的 .part 文件恢复状态（读取已有数据重建哈希）"""
+        if not self.part_path.exists() or not self.state_path.exists():
+            return
+        try:
+            state: dict[str, str | int | None] = json.loads(
+                self.state_path.read_text(encoding="utf-8")
+            )
+        except (OSError, ValueError):
+            return
+        validator = state.get("validator")
+        if state.get("url") != self.url or not isinstance(validator, str):
+            return
+
+        with self.part_path.open("r+b") as f:
+            written = state.get("offset")
+            if isinstance(written, int) and written < self.part_path.stat().st_size:
+                f.truncate(written)
+            while block := f.read(RESUME_READ_SIZE):
+                self.update(block)
+        self.validator = validator
+
+    def range_headers(self) -> dict[str, str]:
+        """续传请求头（没有可续传的数据时为空）"""
+        if self.offset == 0 or not self.validator:
+            return {}
+        return {"Range": f"bytes={self.offset}-", "If-Range": self.validator}
+
+    def accept(self, status_code: int, headers: Headers) -> bool:
+        """检查响应是否从当前偏移处续传"""
+        if self.offset == 0:
+            return True
+        if status_code != 206:
+            return False
+        content_range: str = headers.get("content-range", "")
+        return content_range.startswith(f"bytes {self.offset}-")
+
+    def save_state(self, metadata: RemoteMetadata) -> None:
+        """记录校验字段，供重试和下次运行续传时使用 If-Range"""
+        if self.offset > 0:
+            return
+        # 弱 ETag 不能用于 If-Range
+        self.validator = metadata.validator
+        if self.validator:
+            self._write_state()
+        else:
+            self.state_path.unlink(missing_ok=True)
+
+    def save_progress(self) -> None:
+        """记录已写入 .part 文件的字节数（调用前需先 flush 文件）"""
+        if self.validator:
+            self._write_state(offset=self.offset)
+
+    def _write_state(self, **extra: int) -> None:
+        """原子地写入 .part.json"""
+        tmp_path = self.state_path.with_name(self.state_path.name + ".tmp")
+        tmp_path.write_text(
+            json.dumps({"url": self.url, "validator": self.validator, **extra}),
+            encoding="utf-8",
+        )
+        os.replace(tmp_path, self.state_path)
+
+    def update(self, chunk: bytes | memoryview) -> None:
+        """记录已写入的数据块"""
+        for hasher in self.hashers.values():
+            hasher.update(chunk)
+        self.offset += len(chunk)
+
+    def digests(self) -> dict[str, str]:
+        return {algorithm: hasher.hexdigest() for algorithm, hasher in self.hashers.items()}
+
+    def finish(self) -> None:
+        """下载完成，将 .part 文件重命名为目标文件"""
+        os.replace(self.part_path, self.file_path)
+        self.state_path.unlink(missing_ok=True)
 
 
 class Downloader:
@@ -39,8 +175,12 @@ class Downloader:
     特性：
     - 异步并发下载（asyncio + httpx）
     - 智能重试（指数退避）
-    - 流式下载（内存高效）
-    - Rich 进度条（实时显示速度、进度、剩余时间）
+    - 流式下载（内存高效），下载同时计算哈希；数据经复用的缓冲区按自适应块大小写入，
+      已知文件大小时用 posix_fallocate 预分配
+    - 大文件可选分段并行下载（多个 Range 请求同时写入预分配文件）
+    - 多个包同时下载同一 URL 时只传输一次，其余调用者得到该文件的硬链接（或副本）
+    - Rich 进度条（实时显示速度、进度、剩余时间），无终端时定期输出进度日志；
+      进度按时间间隔汇总更新，不随数据块数量增加
     """
 
     def __init__(
@@ -50,16 +190,43 @@ class Downloader:
         max_concurrent: int = 3,
         max_retries: int = 3,
         base_delay: float = 1.0,
-        chunk_size: int = 8192,
+        chunk_size: int = 64 * 1024,
+        max_chunk_size: int = 4 * 1024 * 1024,
+        preallocate: bool = True,
         show_progress: bool = True,
+        progress_mode: ProgressModeEnum = ProgressModeEnum.AUTO,
+        progress_interval: float = 0.1,
+        log_interval: float = 5.0,
+        hash_algorithms: tuple[str, ...] = (HashAlgorithmEnum.SHA512.value,),
+        segments: int = 1,
+        segment_threshold: int = 64 * 1024 * 1024,
+        hash_executor: ThreadPoolExecutor | None = None,
     ) -> None:
         self.client = client
         self.max_concurrent = max_concurrent
         self.max_retries = max_retries
         self.base_delay = base_delay
+        # 写入块大小按吞吐量在 [chunk_size, max_chunk_size] 之间调整
         self.chunk_size = chunk_size
+        self.max_chunk_size = max_chunk_size
+        self.preallocate = preallocate
         self.show_progress = show_progress
+        self.progress_mode = progress_mode
+        # 进度更新间隔（秒）和 log 模式下输出进度行的间隔（秒）
+        self.progress_interval = progress_interval
+        self.log_interval = log_interval
+        self.hash_algorithms = hash_algorithms
+        # segments > 1 时，不小于 segment_threshold 字节的文件分段并行下载
+        self.segments = segments
+        self.segment_threshold = segment_threshold
+        # 整文件哈希计算使用的线程池（None 表示使用事件循环默认线程池）
+        self.hash_executor = hash_executor
         self._semaphore = asyncio.Semaphore(max_concurrent)
+        # 多个包并发下载时共享同一个进度条显示（Rich 同一时间只允许一个实时显示）
+        self._progress: Progress | LogProgress | None = None
+        self._progress_users: int = 0
+        # 进行中的下载（按 URL 合并）
+        self._inflight: SingleFlight[str, DownloadResult] = SingleFlight()
 
     async def download_file(
         self,
@@ -69,88 +236,207 @@ class Downloader:
         arch: str = "unknown",
     ) -> DownloadResult:
         """下载单个文件（支持智能重试）"""
-        for attempt in range(self.max_retries + 1):
-            try:
-                if attempt > 0:
-                    delay: float = self.base_delay * (2 ** (attempt - 1))
-                    await asyncio.sleep(delay)
-
-                start_time: float = time.perf_counter()
-                file_path.parent.mkdir(parents=True, exist_ok=True)
+        return await self._download(url, file_path, arch=arch)
 
-                async with self._semaphore, self.client.stream("GET", url) as response:
-                    response.raise_for_status()
+    async def probe(self, url: str) -> RemoteMetadata | None:
+        """
+        探测远端文件元数据（不下载文件内容）
 
-                    downloaded_size: int = 0
-                    with file_path.open("wb") as f:
-                        async for chunk in response.aiter_bytes(chunk_size=self.chunk_size):
-                            f.write(chunk)
-                            downloaded_size += len(chunk)
+        优先使用 HEAD 请求；服务器不支持 HEAD 或未返回任何校验字段时，
+        改用只请求首字节的范围 GET 请求。
+        """
+        try:
+            response = await self.client.head(url, follow_redirects=True)
+            if response.is_success:
+                metadata = RemoteMetadata.from_headers(response.headers)
+                if metadata.has_validator and metadata.content_length is not None:
+                    return metadata
+        except Exception:
+            pass
+
+        try:
+            async with self.client.stream(
+                "GET", url, headers={"Range": "bytes=0-0"}, follow_redirects=True
+            ) as response:
+                response.raise_for_status()
+                return RemoteMetadata.from_headers(response.headers)
+        except Exception as e:
+            print(f"  警告: 探测 {url} 的元数据失败: {e}")
+            return None
 
-                download_time: float = time.perf_counter() - start_time
+    async def download_file_with_progress(
+        self,
+        url: str,
+        file_path: Path,
+        progress: Progress | LogProgress,
+        task_id: TaskID,
+        *,
+        arch: str = "unknown",
+    ) -> DownloadResult:
+        """下载单个文件（带进度更新，每 progress_interval 秒最多更新一次）"""
+        counter = ThrottledCounter(
+            lambda size: progress.update(task_id, advance=size),
+            self.progress_interval,
+        )
 
-                return DownloadResult(
-                    arch=arch,
-                    success=True,
-                    file_path=file_path,
-                    retry_count=attempt,
-                    download_time=download_time,
-                    downloaded_size=downloaded_size,
-                )
+        def on_start(total_size: int | None, completed: int) -> None:
+            # 重试或续传时按已完成的字节数重新计数
+            counter.discard()
+            progress.update(task_id, total=total_size, completed=completed)
+            if total_size:
+                progress.start_task(task_id)
+
+        try:
+            return await self._download(
+                url, file_path, arch=arch, on_start=on_start, on_chunk=counter.add
+            )
+        finally:
+            counter.flush()
+
+    async def _download(
+        self,
+        url: str,
+        file_path: Path,
+        *,
+        arch: str,
+        on_start: Callable[[int | None, int], None] | None = None,
+        on_chunk: Callable[[int], None] | None = None,
+    ) -> DownloadResult:
+        """
+        下载单个文件，同一 URL 正在下载时等待并共享其结果
 
-            except Exception as e:
-                if attempt == self.max_retries:
-                    return DownloadResult(
-                        arch=arch,
-                        success=False,
-                        error=str(e),
-                        retry_count=attempt,
-                    )
+        共享的结果中文件被链接到本次请求的路径，传输字节数计为 0（resumed_from 等于文件大小）。
+        """
+        result, shared = await self._inflight.do(
+            url,
+            lambda: self._transfer(
+                url, file_path, arch=arch, on_start=on_start, on_chunk=on_chunk
+            ),
+        )
+        if not shared or not result.success or result.file_path is None:
+            return replace(result, arch=arch)
 
-        return DownloadResult(
+        if result.file_path != file_path:
+            try:
+                link_or_copy(result.file_path, file_path)
+            except OSError:
+                # 共享的文件已被删除或移走，自行下载
+                return await self._transfer(
+                    url, file_path, arch=arch, on_start=on_start, on_chunk=on_chunk
+                )
+        if on_start is not None:
+            on_start(result.downloaded_size, result.downloaded_size)
+        return replace(
+            result,
             arch=arch,
-            success=False,
-            error="Max retries exceeded",
-            retry_count=self.max_retries,
+            file_path=file_path,
+            retry_count=0,
+            resumed_from=result.downloaded_size,
         )
 
-    async def download_file_with_progress(
+    async def _transfer(
         self,
         url: str,
         file_path: Path,
-        progress: Progress,
-        task_id: TaskID,
         *,
-        arch: str = "unknown",
+        arch: str,
+        on_start: Callable[[int | None, int], None] | None = None,
+        on_chunk: Callable[[int], None] | None = None,
     ) -> DownloadResult:
-        """下载单个文件（带实时进度更新）"""
+        """
+        下载单个文件（支持智能重试和断点续传）
+
+        写入文件的同时逐块更新哈希对象，下载完成即得到校验和，无需再次读取文件。
+        数据先写入 .part 文件；重试或下次运行发现 .part 文件时，使用
+        Range + If-Range 请求只下载缺失部分，服务器不支持或文件已变化时从头下载。
+        """
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        partial = _PartialDownload(file_path, url, self.hash_algorithms)
+        await asyncio.get_running_loop().run_in_executor(
+            self.hash_executor, partial.restore
+        )
+        resumed_from: int = 0
+        start_time: float = time.perf_counter()
+
+        if self.segments > 1 and partial.offset == 0:
+            segmented_result = await self._download_segmented(
+                url, file_path, arch=arch, on_start=on_start, on_chunk=on_chunk
+            )
+            if segmented_result is not None:
+                return segmented_result
+
         for attempt in range(self.max_retries + 1):
             try:
                 if attempt > 0:
                     delay: float = self.base_delay * (2 ** (attempt - 1))
                     await asyncio.sleep(delay)
 
-                start_time: float = time.perf_counter()
-                file_path.parent.mkdir(parents=True, exist_ok=True)
-
-                async with self._semaphore, self.client.stream("GET", url) as response:
+                async with self._semaphore, self.client.stream(
+                    "GET", url, headers=partial.range_headers()
+                ) as response:
+                    if response.status_code == 416:
+                        # 已有数据与远端文件不匹配，丢弃后重试
+                        partial.reset()
                     response.raise_for_status()
-
-                    content_length: str | None = response.headers.get("content-length")
-                    total_size: int | None = int(content_length) if content_length else None
-
-                    if total_size:
-                        progress.update(task_id, total=total_size)
-                        progress.start_task(task_id)
-
-                    downloaded_size: int = 0
-                    with file_path.open("wb") as f:
-                        async for chunk in response.aiter_bytes(chunk_size=self.chunk_size):
-                            f.write(chunk)
-                            downloaded_size += len(chunk)
-                            progress.update(task_id, advance=len(chunk), refresh=True)
+                    metadata = RemoteMetadata.from_headers(response.headers)
+
+                    if not partial.accept(response.status_code, response.headers):
+                        # 服务器忽略了范围请求或文件已变化，从头下载
+                        partial.reset()
+                    resumed_from = partial.offset
+                    partial.save_state(metadata)
+
+                    if on_start is not None:
+                        on_start(metadata.content_length, partial.offset)
+
+                    with partial.part_path.open("r+b" if partial.offset else "wb") as f:
+                        f.seek(partial.offset)
+                        f.truncate()
+                        # content_length 是完整文件大小（续传时来自 Content-Range）
+                        if self.preallocate and metadata.content_length:
+                            # 预分配前先记录已写入的字节数，进程在首次保存进度前被结束时，
+                            # 下次运行也不会把预分配的空白区域当作已下载的数据
+                            partial.save_progress()
+                        preallocated = bool(
+                            self.preallocate
+                            and metadata.content_length
+                            and preallocate(
+                                f,
+                                partial.offset,
+                                metadata.content_length - partial.offset,
+                            )
+                        )
+                        saved_at = time.monotonic()
+
+                        def write_block(block: memoryview) -> None:
+                            nonlocal saved_at
+                            f.write(block)
+                            partial.update(block)
+                            if on_chunk is not None:
+                                on_chunk(len(block))
+                            if (
+                                preallocated
+                                and time.monotonic() - saved_at >= PROGRESS_SAVE_INTERVAL
+                            ):
+                                f.flush()
+                                partial.save_progress()
+                                saved_at = time.monotonic()
+
+                        buffer = WriteBuffer(write_block, self._chunk_size())
+                        try:
+                            async for chunk in response.aiter_bytes():
+                                buffer.write(chunk)
+                        finally:
+                            # 中断时也写入已收到的数据，并截掉预分配的多余空间，
+                            # 使 .part 文件大小与续传偏移一致
+                            buffer.flush()
+                            f.truncate(partial.offset)
+                            if preallocated:
+                                f.flush()
+                                partial.save_progress()
 
                 download_time: float = time.perf_counter() - start_time
+                partial.finish()
 
                 return DownloadResult(
                     arch=arch,
@@ -158,7 +444,10 @@ class Downloader:
                     file_path=file_path,
                     retry_count=attempt,
                     download_time=download_time,
-                    downloaded_size=downloaded_size,
+                    downloaded_size=partial.offset,
+                    metadata=metadata,
+                    digests=partial.digests(),
+                    resumed_from=resumed_from,
                 )
 
             except Exception as e:
@@ -177,6 +466,130 @@ class Downloader:
             retry_count=self.max_retries,
         )
 
+    async def _download_segmented(
+        self,
+        url: str,
+        file_path: Path,
+        *,
+        arch: str,
+        on_start: Callable[[int | None, int], None] | None = None,
+        on_chunk: Callable[[int], None] | None = None,
+    ) -> DownloadResult | None:
+        """
+        分段并行下载单个大文件
+
+        将文件按字节范围分为 segments 段，通过共享的 AsyncClient 并发请求，
+        每段写入预分配文件的对应偏移处；单段失败时从该段已下载的位置重试。
+        全部完成后一次性计算哈希（分段乱序到达，无法边下载边计算）。
+
+        Returns:
+            下载结果；文件小于阈值、缺少校验字段或服务器不支持范围请求时返回 None，
+            由调用方回退为单连接流式下载
+        """
+        metadata = await self.probe(url)
+        if metadata is None or metadata.content_length is None:
+            return None
+        total_size: int = metadata.content_length
+        validator = metadata.validator
+        if total_size < self.segment_threshold or not validator:
+            return None
+
+        part_path = file_path.with_name(file_path.name + ".part")
+        segment_size: int = -(-total_size // self.segments)
+        ranges: list[tuple[int, int]] = [
+            (start, min(start + segment_size, total_size) - 1)
+            for start in range(0, total_size, segment_size)
+        ]
+        start_time: float = time.perf_counter()
+        retry_counts: list[int] = [0] * len(ranges)
+
+        async def fetch_segment(index: int, start: int, end: int) -> None:
+            position: int = start
+            for attempt in range(self.max_retries + 1):
+                try:
+                    if attempt > 0:
+                        retry_counts[index] = attempt
+                        await asyncio.sleep(self.base_delay * (2 ** (attempt - 1)))
+
+                    headers = {"Range": f"bytes={position}-{end}", "If-Range": validator}
+                    async with self.client.stream("GET", url, headers=headers) as response:
+                        response.raise_for_status()
+                        content_range: str = response.headers.get("content-range", "")
+                        if response.status_code != 206 or not content_range.startswith(
+                            f"bytes {position}-"
+                        ):
+                            raise _RangeNotSupportedError(url)
+
+                        with part_path.open("r+b") as f:
+                            f.seek(position)
+
+                            def write_block(block: memoryview) -> None:
+                                nonlocal position
+                                f.write(block)
+                                position += len(block)
+                                if on_chunk is not None:
+                                    on_chunk(len(block))
+
+                            buffer = WriteBuffer(write_block, self._chunk_size())
+                            try:
+                                async for chunk in response.aiter_bytes():
+                                    buffer.write(chunk)
+                            finally:
+                                buffer.flush()
+
+                    if position != end + 1:
+                        raise OSError(f"分段 {start}-{end} 数据不完整")
+                    return
+                except _RangeNotSupportedError:
+                    raise
+                except Exception:
+                    if attempt == self.max_retries:
+                        raise
+
+        try:
+            async with self._semaphore:
+                with part_path.open("wb") as f:
+                    if not (self.preallocate and preallocate(f, 0, total_size)):
+                        f.truncate(total_size)
+                if on_start is not None:
+                    on_start(total_size, 0)
+
+                async with asyncio.TaskGroup() as tg:
+                    for index, (start, end) in enumerate(ranges):
+                        tg.create_task(fetch_segment(index, start, end))
+
+            digests = await calculate_multiple_hashes_async(
+                part_path, list(self.hash_algorithms), executor=self.hash_executor
+            )
+            os.replace(part_path, file_path)
+        except Exception as e:
+            part_path.unlink(missing_ok=True)
+            if isinstance(e, ExceptionGroup):
+                if e.subgroup(_RangeNotSupportedError) is not None:
+                    return None
+                e = e.exceptions[0]
+            return DownloadResult(
+                arch=arch,
+                success=False,
+                error=str(e),
+                retry_count=max(retry_counts),
+            )
+
+        return DownloadResult(
+            arch=arch,
+            success=True,
+            file_path=file_path,
+            retry_count=max(retry_counts),
+            download_time=time.perf_counter() - start_time,
+            downloaded_size=total_size,
+            metadata=metadata,
+            digests=digests,
+        )
+
+    def _chunk_size(self) -> AdaptiveChunkSize:
+        """每个传输独立调整块大小"""
+        return AdaptiveChunkSize(self.chunk_size, self.max_chunk_size)
+
     async def download_all(
         self,
         downloads: dict[str, tuple[str, Path]],
@@ -197,7 +610,7 @@ class Downloader:
 
         results: dict[str, DownloadResult] = {}
 
-        if not self.show_progress:
+        if self._resolve_progress_mode() == ProgressModeEnum.NONE:
             tasks: list[Coroutine[Any, Any, DownloadResult]] = [
                 self.download_file(url, file_path, arch=arch)
                 for arch, (url, file_path) in downloads.items()
@@ -209,20 +622,7 @@ class Downloader:
 
             return results
 
-        progress: Progress = Progress(
-            TextColumn("[bold blue]{task.description}", justify="right"),
-            BarColumn(bar_width=None),
-            "[progress.percentage]{task.percentage:>3.1f}%",
-            "•",
-            DownloadColumn(),
-            "•",
-            TransferSpeedColumn(),
-            "•",
-            TimeRemainingColumn(),
-            refresh_per_second=10,
-        )
-
-        with progress:
+        async with self._shared_progress() as progress:
             tasks: list[Coroutine[Any, Any, DownloadResult]] = []
             for arch, (url, file_path) in downloads.items():
                 task_id: TaskID = progress.add_task(
@@ -241,3 +641,49 @@ class Downloader:
                 results[arch] = result
 
         return results
+
+    def _resolve_progress_mode(self) -> ProgressModeEnum:
+        """实际使用的进度显示方式（auto 按 stdout 是否为终端选择）"""
+        if not self.show_progress:
+            return ProgressModeEnum.NONE
+        if self.progress_mode != ProgressModeEnum.AUTO:
+            return self.progress_mode
+        return ProgressModeEnum.RICH if real_stdout().isatty() else ProgressModeEnum.LOG
+
+    @asynccontextmanager
+    async def _shared_progress(self) -> AsyncIterator[Progress | LogProgress]:
+        """获取共享进度条，最后一个使用者退出时关闭显示"""
+        if self._progress is None and self._resolve_progress_mode() == ProgressModeEnum.LOG:
+            # 进度行直接写入真实 stdout，不进入按任务分组的缓冲区
+            self._progress = LogProgress(real_stdout(), self.log_interval)
+        elif self._progress is None:
+            # 分组输出模式下进度条直接写入真实终端，print 输出由任务缓冲负责
+            console = Console(file=real_stdout())
+            self._progress = Progress(
+                TextColumn("[bold blue]{task.description}", justify="right"),
+                BarColumn(bar_width=None),
+                "[progress.percentage]{task.percentage:>3.1f}%",
+                "•",
+                DownloadColumn(),
+                "•",
+                TransferSpeedColumn(),
+                "•",
+                TimeRemainingColumn(),
+                console=console,
+                refresh_per_second=10,
+                redirect_stdout=not is_grouping(),
+            )
+            self._progress.start()
+            set_live_console(console)
+
+        progress = self._progress
+        self._progress_users += 1
+        try:
+            yield progress
+        finally:
+            self._progress_users -= 1
+            if self._progress_users == 0:
+                if isinstance(progress, Progress):
+                    set_live_console(None)
+                    progress.stop()
+                self._progress = None
@@ -1,56 +1,143 @@
 """哈希计算工具模块"""
 
+import asyncio
+import functools
 import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Callable
 
 from constants.constants import HashAlgorithmEnum
 
 
-def calculate_file_hash(
-    file_path: str | Path, hash_algorithm: str = HashAlgorithmEnum.SHA512.value
-) -> str:
+# 默认读取块大小：足够大以减少 Python 层循环次数，并让 hashlib 释放 GIL
+DEFAULT_READ_SIZE = 1024 * 1024
+
+SUPPORTED_ALGORITHMS: dict[str, Callable[[], "hashlib._Hash"]] = {
+    HashAlgorithmEnum.SHA256.value: hashlib.sha256,
+    HashAlgorithmEnum.SHA512.value: hashlib.sha512,
+}
+
+
+def _new_hasher(hash_algorithm: str) -> "hashlib._Hash":
+    """创建哈希对象，不支持的算法抛出 ValueError"""
+    algorithm = hash_algorithm.lower()
+    if algorithm not in SUPPORTED_ALGORITHMS:
+        raise ValueError(
+            f"不支持的哈希算法: {hash_algorithm}，支持的算法: {list(SUPPORTED_ALGORITHMS.keys())}"
+        )
+    return SUPPORTED_ALGORITHMS[algorithm]()
+
+
+def calculate_hashes(
+    file_path: str | Path,
+    algorithms: list[str],
+    *,
+    read_size: int = DEFAULT_READ_SIZE,
+) -> dict[str, str]:
     """
-    计算文件哈希值
+    单次读取文件，同时计算多种哈希值
 
-    支持 SHA256 和 SHA512 算法，分块读取大文件避免内存占用过高
+    每个数据块只读取一次，依次交给所有哈希对象。使用可复用缓冲区
+    （readinto + memoryview）按 read_size 读取，避免每块分配新的 bytes。
+
+    Returns:
+        {算法: 十六进制摘要} 字典，键与 algorithms 中的写法一致
     """
     file_path = Path(file_path)
 
     if not file_path.exists():
         raise FileNotFoundError(f"文件不存在: {file_path}")
 
-    supported_algorithms: dict[str, Callable[[], hashlib._Hash]] = {
-        HashAlgorithmEnum.SHA256.value: hashlib.sha256,
-        HashAlgorithmEnum.SHA512.value: hashlib.sha512,
+    hashers: dict[str, hashlib._Hash] = {
+        algorithm: _new_hasher(algorithm) for algorithm in algorithms
     }
+    updaters = [hasher.update for hasher in hashers.values()]
 
-    if hash_algorithm.lower() not in supported_algorithms:
-        raise ValueError(
-            f"不支持的哈希算法: {hash_algorithm}，支持的算法: {list(supported_algorithms.keys())}"
-        )
+    buffer = bytearray(read_size)
+    with open(file_path, "rb", buffering=0) as f, memoryview(buffer) as view:
+        while read_count := f.readinto(buffer):
+            block = view[:read_count]
+            for update in updaters:
+                update(block)
+            block.release()
 
-    hash_func: hashlib._Hash = supported_algorithms[hash_algorithm.lower()]()
+    return {algorithm: hasher.hexdigest() for algorithm, hasher in hashers.items()}
 
-    with open(file_path, "rb") as f:
-        for chunk in iter(lambda: f.read(4096), b""):
-            hash_func.update(chunk)
 
-    return hash_func.hexdigest()
+def calculate_file_hash(
+    file_path: str | Path,
+    hash_algorithm: str = HashAlgorithmEnum.SHA512.value,
+    *,
+    read_size: int = DEFAULT_READ_SIZE,
+) -> str:
+    """
+    计算文件哈希值
+
+    支持 SHA256 和 SHA512 算法，分块读取大文件避免内存占用过高
+    """
+    return calculate_hashes(file_path, [hash_algorithm], read_size=read_size)[
+        hash_algorithm
+    ]
 
 
 def calculate_multiple_hashes(
-    file_path: str | Path, algorithms: list[str] | None = None
+    file_path: str | Path,
+    algorithms: list[str] | None = None,
+    *,
+    read_size: int = DEFAULT_READ_SIZE,
 ) -> dict[str, str]:
-    """一次性计算文件的多种哈希值"""
+    """一次性计算文件的多种哈希值（单次读取文件）"""
     if algorithms is None:
         algorithms = [HashAlgorithmEnum.SHA256.value, HashAlgorithmEnum.SHA512.value]
 
-    results: dict[str, str] = {}
-    for algorithm in algorithms:
-        results[algorithm] = calculate_file_hash(file_path, algorithm)
+    return calculate_hashes(file_path, algorithms, read_size=read_size)
+
 
-    return results
+def create_hash_executor(max_workers: int | None = None) -> ThreadPoolExecutor:
+    """
+    创建哈希计算线程池
+
+    hashlib 处理大块数据时会释放 GIL，多个文件可在多核上并行计算；
+    未指定线程数时按 CPU 核心数确定。
+    """
+    workers = max_workers or os.cpu_count() or 1
+    return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="hash")
+
+
+async def calculate_file_hash_async(
+    file_path: str | Path,
+    hash_algorithm: str = HashAlgorithmEnum.SHA512.value,
+    *,
+    executor: ThreadPoolExecutor | None = None,
+    read_size: int = DEFAULT_READ_SIZE,
+) -> str:
+    """在线程池中计算文件哈希值，不阻塞事件循环"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        executor,
+        functools.partial(
+            calculate_file_hash, file_path, hash_algorithm, read_size=read_size
+        ),
+    )
+
+
+async def calculate_multiple_hashes_async(
+    file_path: str | Path,
+    algorithms: list[str] | None = None,
+    *,
+    executor: ThreadPoolExecutor | None = None,
+    read_size: int = DEFAULT_READ_SIZE,
+) -> dict[str, str]:
+    """在线程池中计算文件的多种哈希值，不阻塞事件循环"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        executor,
+        functools.partial(
+            calculate_multiple_hashes, file_path, algorithms, read_size=read_size
+        ),
+    )
 
 
 def verify_file_hash(
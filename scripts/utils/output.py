@@ -0,0 +1,104 @@
+"""
+按任务分组的终端输出模块
+
+并发处理多个包时，每个包的 print 输出先写入该任务自己的缓冲区，
+处理结束后再整体输出，避免不同包的日志相互穿插。
+"""
+
+import io
+import sys
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import TextIO
+
+from rich.console import Console
+
+# 当前任务的输出缓冲区（None 表示直接写入真实 stdout）
+_output_buffer: ContextVar[io.StringIO | None] = ContextVar(
+    "_output_buffer", default=None
+)
+
+# 正在显示实时进度条的 Console（存在时整体输出需经由它打印，避免破坏进度条）
+_live_console: Console | None = None
+
+
+class TaskLocalStdout(io.TextIOBase):
+    """按 asyncio 任务分流的 stdout 代理"""
+
+    def __init__(self, target: TextIO) -> None:
+        super().__init__()
+        self.target = target
+
+    def write(self, text: str) -> int:
+        buffer = _output_buffer.get()
+        if buffer is not None:
+            return buffer.write(text)
+        return self.target.write(text)
+
+    def flush(self) -> None:
+        if _output_buffer.get() is None:
+            self.target.flush()
+
+    def isatty(self) -> bool:
+        return self.target.isatty()
+
+    def fileno(self) -> int:
+        return self.target.fileno()
+
+    @property
+    def encoding(self) -> str:  # type: ignore[override]
+        return getattr(self.target, "encoding", "utf-8")
+
+
+def real_stdout() -> TextIO:
+    """获取未被任务缓冲代理的 stdout"""
+    stdout = sys.stdout
+    if isinstance(stdout, TaskLocalStdout):
+        return stdout.target
+    return stdout
+
+
+def is_grouping() -> bool:
+    """当前是否处于按任务分组输出模式"""
+    return isinstance(sys.stdout, TaskLocalStdout)
+
+
+@contextmanager
+def grouped_stdout() -> Iterator[None]:
+    """安装按任务分流的 stdout 代理"""
+    original_stdout = sys.stdout
+    sys.stdout = TaskLocalStdout(original_stdout)
+    try:
+        yield
+    finally:
+        sys.stdout = original_stdout
+
+
+@contextmanager
+def capture_task_output() -> Iterator[io.StringIO]:
+    """在当前任务内捕获 print 输出"""
+    buffer = io.StringIO()
+    token = _output_buffer.set(buffer)
+    try:
+        yield buffer
+    finally:
+        _output_buffer.reset(token)
+
+
+def set_live_console(console: Console | None) -> None:
+    """登记（或清除）正在显示实时进度条的 Console"""
+    global _live_console
+    _live_console = console
+
+
+def emit(text: str) -> None:
+    """直接输出到终端，绕过任务缓冲；进度条显示期间经由其 Console 输出"""
+    if not text:
+        return
+    if _live_console is not None:
+        _live_console.print(text, end="", markup=False, highlight=False, soft_wrap=True)
+        return
+    stdout = real_stdout()
+    stdout.write(text)
+    stdout.flush()
@@ -0,0 +1,142 @@
+"""
+下载进度报告模块
+
+下载循环每收到一个数据块就会报告一次进度，数据块越小、链路越快，报告越频繁。
+ThrottledCounter 将数据块的字节数累计起来，按固定时间间隔上报，与数据块大小无关；
+LogProgress 在没有终端（如 CI）时代替 Rich 进度条，定期输出每个文件的下载量和速度。
+"""
+
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import TextIO
+
+from rich.progress import TaskID
+
+
+def _format_size(size: float) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+class ThrottledCounter:
+    """累计字节数，距上次上报超过 interval 秒时才调用 report"""
+
+    def __init__(
+        self,
+        report: Callable[[int], None],
+        interval: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.report = report
+        self.interval = interval
+        self.clock = clock
+        self._pending: int = 0
+        self._last: float = clock()
+
+    def add(self, size: int) -> None:
+        """记录一个数据块"""
+        self._pending += size
+        now = self.clock()
+        if now - self._last >= self.interval:
+            self._last = now
+            self.flush()
+
+    def flush(self) -> None:
+        """立即上报累计的字节数"""
+        if self._pending:
+            pending, self._pending = self._pending, 0
+            self.report(pending)
+
+    def discard(self) -> None:
+        """丢弃未上报的字节数（重试时已完成字节数会被重新设置）"""
+        self._pending = 0
+
+
+@dataclass
+class _LogTask:
+    description: str
+    total: int | None = None
+    completed: int = 0
+    started_at: float = 0.0
+    # 上一次输出时的时间和已完成字节数（用于计算区间速度）
+    logged_at: float = 0.0
+    logged_completed: int = 0
+    finished: bool = False
+
+
+class LogProgress:
+    """
+    无终端时的进度报告
+
+    提供与 Rich Progress 相同的 add_task / start_task / update 接口，
+    每个文件每隔 interval 秒输出一行下载量和区间速度，完成时输出总用时和平均速度。
+    """
+
+    def __init__(
+        self,
+        file: TextIO,
+        interval: float = 5.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.file = file
+        self.interval = interval
+        self.clock = clock
+        self._tasks: list[_LogTask] = []
+
+    def add_task(self, description: str, total: int | None = None) -> TaskID:
+        now = self.clock()
+        self._tasks.append(
+            _LogTask(description, total=total, started_at=now, logged_at=now)
+        )
+        return TaskID(len(self._tasks) - 1)
+
+    def start_task(self, task_id: TaskID) -> None:
+        pass
+
+    def update(
+        self,
+        task_id: TaskID,
+        *,
+        total: int | None = None,
+        completed: int | None = None,
+        advance: int | None = None,
+    ) -> None:
+        task = self._tasks[task_id]
+        now = self.clock()
+        if total is not None:
+            task.total = total
+        if completed is not None:
+            # 重试或续传时重新计数，区间速度从此处开始计算
+            task.completed = task.logged_completed = completed
+            task.logged_at = now
+        if advance is not None:
+            task.completed += advance
+
+        if task.finished:
+            return
+        if task.total is not None and task.completed >= task.total:
+            task.finished = True
+            elapsed = max(now - task.started_at, 1e-9)
+            self._write(
+                f"{task.description}: 下载完成 {_format_size(task.completed)}，"
+                f"用时 {elapsed:.1f} 秒，平均 {_format_size(task.completed / elapsed)}/s"
+            )
+        elif now - task.logged_at >= self.interval:
+            speed = (task.completed - task.logged_completed) / (now - task.logged_at)
+            task.logged_at, task.logged_completed = now, task.completed
+            if task.total:
+                size = (
+                    f"{_format_size(task.completed)} / {_format_size(task.total)} "
+                    f"({task.completed / task.total:.1%})"
+                )
+            else:
+                size = _format_size(task.completed)
+            self._write(f"{task.description}: {size}，{_format_size(speed)}/s")
+
+    def _write(self, line: str) -> None:
+        self.file.write(f"    {line}\n")
+        self.file.flush()
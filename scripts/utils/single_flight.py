@@ -0,0 +1,40 @@
+"""
+请求合并模块
+
+多个包共用同一个 fetch_url 或下载 URL 并发处理时，同一 URL 同时只发起一次请求，
+其余调用者等待并共享该请求的结果。只合并进行中的调用，完成后的调用不会被缓存。
+"""
+
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+
+
+class SingleFlight[K: Hashable, V]:
+    """按键合并并发调用"""
+
+    def __init__(self) -> None:
+        self._inflight: dict[K, asyncio.Task[V]] = {}
+
+    def __contains__(self, key: K) -> bool:
+        return key in self._inflight
+
+    async def do(self, key: K, func: Callable[[], Awaitable[V]]) -> tuple[V, bool]:
+        """
+        执行 func，或加入同一键正在进行的调用
+
+        调用在独立的任务中执行，单个调用者被取消不会中断其他调用者等待的请求。
+
+        Returns:
+            (结果, 是否共享了其他调用者发起的调用)
+        """
+        task = self._inflight.get(key)
+        shared = task is not None
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        return await asyncio.shield(task), shared
+
+    def _forget(self, key: K, task: asyncio.Task[V]) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]